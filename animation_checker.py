@@ -1,14 +1,85 @@
-import aspose.slides as slides
-import aspose.slides.animation as anim
 import pandas as pd
+from pptx.enum.shapes import MSO_SHAPE_TYPE, PP_MEDIA_TYPE
+from deck_model import as_deck, source_path
+from animation_timeline import effects_by_shape
 
-TRIGGER_TYPE_MAP = {
-    anim.EffectTriggerType.AFTER_PREVIOUS: "After Previous",
-    anim.EffectTriggerType.WITH_PREVIOUS: "With Previous",
-    anim.EffectTriggerType.ON_CLICK: "On Click"
+WIPE_LABELS = {
+    "Left": "Wipe Left to Right",
+    "Right": "Wipe Right to Left",
+    "Top": "Wipe Bottom to Top",
+    "Bottom": "Wipe Top to Bottom",
 }
 
+def is_video(shape):
+    if shape.shape_type != MSO_SHAPE_TYPE.MEDIA:
+        return False
+    return getattr(shape, "media_type", None) == PP_MEDIA_TYPE.MOVIE
+
 def get_animation_type(effect, shape):
+    # If shape is a video, label it as Play
+    if is_video(shape):
+        return "Play"
+
+    if effect.effect_type == "Fade":
+        return "Fade"
+    elif effect.effect_type == "Wipe":
+        return WIPE_LABELS.get(effect.direction, "Wipe")
+    return "Unknown"
+
+def run_animation_qc(source, engine="native"):
+    """
+    engine="native" reads effects from each slide's p:timing XML on the shared
+    DeckModel; engine="aspose" keeps the previous Aspose.Slides implementation.
+    """
+    if engine == "aspose":
+        return run_animation_qc_aspose(source_path(source))
+    if engine != "native":
+        raise ValueError(f"Unknown animation engine: {engine}")
+
+    deck = as_deck(source)
+    data = []
+
+    for slide in deck.slides:
+        slide_effects = effects_by_shape(slide.timeline)
+        for shape in slide.shapes:
+            shape_name = shape.name if shape.name else "Unnamed Shape"
+            text = ""
+            if shape.has_text_frame and shape.text_frame.text:
+                text = shape.text_frame.text.strip()
+            else:
+                text = "No Text"
+
+            effects = slide_effects.get(shape.shape_id, [])
+
+            if effects:
+                for effect in effects:
+                    data.append({
+                        "Slide": slide.number,
+                        "Shape Name / Table Cell": shape_name,
+                        "Text": text,
+                        "Animation Type": get_animation_type(effect, shape),
+                        "Delay (sec)": round(effect.delay, 2),
+                        "Trigger Type": effect.trigger
+                    })
+            else:
+                # If no effect, check if it's a video to label as Play
+                anim_type = "Play" if is_video(shape) else "None"
+                data.append({
+                    "Slide": slide.number,
+                    "Shape Name / Table Cell": shape_name,
+                    "Text": text,
+                    "Animation Type": anim_type,
+                    "Delay (sec)": "",
+                    "Trigger Type": ""
+                })
+
+    return pd.DataFrame(data)
+
+# === ASPOSE ENGINE ===
+def get_aspose_animation_type(effect, shape):
+    import aspose.slides as slides
+    import aspose.slides.animation as anim
+
     # If shape is a video and effect is None, label it as Play
     if isinstance(shape, slides.VideoFrame):
         return "Play"
@@ -29,7 +100,16 @@ def get_animation_type(effect, shape):
             return "Wipe"
     return "Unknown"
 
-def run_animation_qc(pptx_path):
+def run_animation_qc_aspose(pptx_path):
+    import aspose.slides as slides
+    import aspose.slides.animation as anim
+
+    trigger_type_map = {
+        anim.EffectTriggerType.AFTER_PREVIOUS: "After Previous",
+        anim.EffectTriggerType.WITH_PREVIOUS: "With Previous",
+        anim.EffectTriggerType.ON_CLICK: "On Click"
+    }
+
     pres = slides.Presentation(pptx_path)
     data = []
 
@@ -46,9 +126,9 @@ def run_animation_qc(pptx_path):
 
             if effects:
                 for effect in effects:
-                    anim_type = get_animation_type(effect, shape)
+                    anim_type = get_aspose_animation_type(effect, shape)
                     delay = round(effect.timing.trigger_delay_time, 2)
-                    trigger_type = TRIGGER_TYPE_MAP.get(effect.timing.trigger_type, "Unknown")
+                    trigger_type = trigger_type_map.get(effect.timing.trigger_type, "Unknown")
                     data.append({
                         "Slide": slide.slide_number,
                         "Shape Name / Table Cell": shape_name,
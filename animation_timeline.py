@@ -0,0 +1,121 @@
+from dataclasses import dataclass
+
+NS = {"p": "http://schemas.openxmlformats.org/presentationml/2006/main"}
+
+TRIGGER_MAP = {
+    "clickEffect": "On Click",
+    "withEffect": "With Previous",
+    "afterEffect": "After Previous",
+}
+
+# presetID -> effect name for entrance/exit effects (the two classes share IDs)
+ENTR_EXIT_PRESETS = {
+    1: "Appear", 2: "Fly", 3: "Blinds", 4: "Box", 5: "Checkerboard", 6: "Circle",
+    7: "Crawl", 8: "Diamond", 9: "Dissolve", 10: "Fade", 11: "Flash Once",
+    12: "Peek", 13: "Plus", 14: "Random Bars", 15: "Spiral", 16: "Split",
+    17: "Stretch", 18: "Strips", 19: "Swivel", 20: "Wedge", 21: "Wheel",
+    22: "Wipe", 23: "Zoom", 24: "Random Effects", 25: "Boomerang", 26: "Bounce",
+    37: "Rise Up", 42: "Ascend", 47: "Descend", 53: "Grow & Turn", 55: "Float",
+}
+EMPH_PRESETS = {
+    1: "Change Fill Color", 3: "Change Font", 6: "Grow/Shrink", 8: "Spin",
+    9: "Transparency", 26: "Teeter", 27: "Pulse", 32: "Flicker",
+}
+MEDIA_PRESETS = {1: "Play", 2: "Pause", 3: "Stop"}
+
+# presetSubtype direction flags used by Wipe, Fly, Peek, etc.
+DIRECTION_SUBTYPES = {1: "Top", 2: "Right", 4: "Bottom", 8: "Left"}
+
+
+@dataclass
+class TimelineEffect:
+    slide_number: int
+    order: int  # build order within the slide's main sequence, from 1
+    shape_id: int
+    effect_type: str
+    preset_id: int
+    preset_class: str
+    preset_subtype: int
+    trigger: str
+    delay: float  # seconds
+    paragraph: int = None  # set for by-paragraph builds
+
+    @property
+    def direction(self):
+        return DIRECTION_SUBTYPES.get(self.preset_subtype, "")
+
+
+def _int_attr(el, name, default=0):
+    try:
+        return int(el.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _effect_name(preset_class, preset_id):
+    if preset_class in ("entr", "exit"):
+        return ENTR_EXIT_PRESETS.get(preset_id, "Unknown")
+    if preset_class == "emph":
+        return EMPH_PRESETS.get(preset_id, "Unknown")
+    if preset_class == "mediacall":
+        return MEDIA_PRESETS.get(preset_id, "Unknown")
+    if preset_class == "path":
+        return "Motion Path"
+    return "Unknown"
+
+
+def _delay_seconds(ctn):
+    cond = ctn.find("p:stCondLst/p:cond", NS)
+    if cond is None:
+        return 0.0
+    delay = cond.get("delay", "0")
+    if delay == "indefinite":
+        return 0.0
+    try:
+        return int(delay) / 1000
+    except ValueError:
+        return 0.0
+
+
+def read_slide_timeline(sld, slide_number=0):
+    """
+    Reads the main animation sequence of a <p:sld> element straight from its
+    p:timing XML. Returns TimelineEffects in build order.
+    """
+    main_seq = sld.find("p:timing//p:cTn[@nodeType='mainSeq']", NS)
+    if main_seq is None:
+        return []
+
+    effects = []
+    for ctn in main_seq.iterfind(".//p:cTn[@presetClass]", NS):
+        target = ctn.find(".//p:tgtEl/p:spTgt", NS)
+        if target is None:
+            continue
+        paragraph = target.find("p:txEl/p:pRg", NS)
+        preset_class = ctn.get("presetClass", "")
+        preset_id = _int_attr(ctn, "presetID")
+        effects.append(TimelineEffect(
+            slide_number=slide_number,
+            order=len(effects) + 1,
+            shape_id=_int_attr(target, "spid"),
+            effect_type=_effect_name(preset_class, preset_id),
+            preset_id=preset_id,
+            preset_class=preset_class,
+            preset_subtype=_int_attr(ctn, "presetSubtype"),
+            trigger=TRIGGER_MAP.get(ctn.get("nodeType"), "Unknown"),
+            delay=_delay_seconds(ctn),
+            paragraph=_int_attr(paragraph, "st") if paragraph is not None else None,
+        ))
+    return effects
+
+
+def read_deck_timeline(deck):
+    """Maps slide number -> main-sequence effects for every slide of a DeckModel."""
+    return {slide.number: slide.timeline for slide in deck.slides}
+
+
+def effects_by_shape(effects):
+    grouped = {}
+    for effect in effects:
+        grouped.setdefault(effect.shape_id, []).append(effect)
+    return grouped
@@ -1,207 +1,166 @@
-from ungroup_util import ungroup_shapes_in_ppt
-from flask import Flask, render_template, request, send_file
+from flask import Flask, Response, jsonify, render_template, request, send_file, url_for
+import json
 import os
-import pandas as pd
-from werkzeug.utils import secure_filename
-from openpyxl import load_workbook
-from openpyxl.styles import PatternFill
-from animation_checker import run_animation_qc
-from chunking_by_animation_win32 import run_chunking_qc_with_animation
-from notes_validator import run_notes_validation
-from text_rules_validator import run_text_rules_validation
-from qc_points_generator import generate_qc_summary  # New import
+import threading
+from qc_pipeline import report_filename, run_qc_pipeline, run_qc_results
+from qc_results import results_to_json, stream_qc_results
+from job_queue import DONE, JobQueue
+from model_provider import MODEL_NAME, is_ready, warm_up
+from metrics import registry
+from workspace import MAX_UPLOAD_BYTES, UploadTooLarge, WorkspaceCleaner, WorkspaceManager
+from style_profiles import UnknownProfile, available_profiles, get_profile
 
 app = Flask(__name__)
-UPLOAD_FOLDER = 'uploads'
-OUTPUT_FOLDER = 'outputs'
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-os.makedirs(OUTPUT_FOLDER, exist_ok=True)
-
-def clean_illegal_excel_chars(df):
-    def clean_text(value):
-        if isinstance(value, str):
-            return ''.join([c for c in value if 32 <= ord(c) <= 126 or ord(c) in (9, 10, 13)])
-        return value
-    return df.applymap(clean_text)
-
-def update_font_validation_with_fallback(excel_path):
-    DEFAULT_STYLE_MAP = {
-        ("Text Placeholder 2", "PLACEHOLDER (14)"): ("Queens Medium", 35),
-        ("Text Placeholder 3", "PLACEHOLDER (14)"): ("HelveticaNowDisplay Medium", 27),
-        ("Text Placeholder 14", "PLACEHOLDER (14)"): ("HelveticaNowDisplay Medium", 27),
-    }
-
-    allowed_fonts = {
-        "HelveticaNowDisplay Medium": (24, 27),
-        "Queens Medium": (35, 35),
-        "HelveticaNowDisplay Black": (75, 92.5),
-        "Consolas": (24, 35),
-        "Cambria math": (24, 35),
-    }
-
-    allowed_font_colors = {"#000000", "#FFFFFF", "#F26722"}
-
-    wb = load_workbook(excel_path)
-    if "Quality Check" not in wb.sheetnames:
-        return "Quality Check sheet not found."
-
-    ws = wb["Quality Check"]
-    header = [cell.value for cell in next(ws.iter_rows(min_row=1, max_row=1))]
-    col_map = {name: idx for idx, name in enumerate(header)}
-
-    required_cols = ["Font Name", "Font Size", "Shape Name / Table Cell", "Shape Type", "Extracted Text", "Font Color Hex"]
-    if not all(col in col_map for col in required_cols):
-        return "Missing required columns."
-
-    red_fill = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
-    orange_fill = PatternFill(start_color="FFD966", end_color="FFD966", fill_type="solid")
-    yellow_fill = PatternFill(start_color="FFFF00", end_color="FFFF00", fill_type="solid")
-
-    for row in ws.iter_rows(min_row=2):
-        font_cell = row[col_map["Font Name"]]
-        size_cell = row[col_map["Font Size"]]
-        shape_name = str(row[col_map["Shape Name / Table Cell"]].value or "").strip()
-        shape_type = str(row[col_map["Shape Type"]].value or "").strip()
-        extracted_text = str(row[col_map["Extracted Text"]].value or "").strip()
-        font_color_cell = row[col_map["Font Color Hex"]]
-
-        if not extracted_text:
-            continue
-
-        font = str(font_cell.value or "").strip()
-        size_val = size_cell.value
-
-        if not font:
-            key = (shape_name, shape_type)
-            fallback = DEFAULT_STYLE_MAP.get(key)
-            if not fallback and shape_type == "TEXT_BOX (17)" and shape_name.lower().startswith("textbox"):
-                fallback = ("HelveticaNowDisplay Medium", 27)
-            if fallback:
-                font, fallback_size = fallback
-                font_cell.value = font
-                if not size_val:
-                    size_cell.value = fallback_size
-
-        if font not in allowed_fonts:
-            if font:
-                font_cell.fill = orange_fill
-            size_cell.fill = red_fill
-        else:
-            try:
-                size = float(size_cell.value)
-                min_size, max_size = allowed_fonts[font]
-                if not (min_size <= size <= max_size):
-                    size_cell.fill = red_fill
-            except (TypeError, ValueError):
-                size_cell.fill = red_fill
-
-        font_color = str(font_color_cell.value or "").strip().upper()
-        if font_color and font_color not in allowed_font_colors:
-            font_color_cell.fill = yellow_fill
-
-    wb.save(excel_path)
-    return "Validation updated successfully."
-
-def color_slide_point_comments(excel_path):
-    comment_color_map = {
-        "Perfect match (copied)": "ff0000",
-        "Chunked properly": "87E179",
-        "No strong match": "FF9999",
-        "Partially matching": "9ADFE6",
-        "No VO content": "8B0000"
-    }
-    wb = load_workbook(excel_path)
-    if "Slide Point Analysis" not in wb.sheetnames:
-        return
-
-    ws = wb["Slide Point Analysis"]
-    header = [cell.value for cell in next(ws.iter_rows(min_row=1, max_row=1))]
-    if "Comment" not in header:
-        return
-
-    comment_col_idx = header.index("Comment") + 1
-    for row in ws.iter_rows(min_row=2, min_col=comment_col_idx, max_col=comment_col_idx):
-        cell = row[0]
-        comment = str(cell.value).strip() if cell.value else ""
-        if comment in comment_color_map:
-            cell.fill = PatternFill(start_color=comment_color_map[comment], end_color=comment_color_map[comment], fill_type="solid")
-
-    wb.save(excel_path)
-
-def highlight_animations(excel_path):
-    wb = load_workbook(excel_path)
-    if "Animation QC" not in wb.sheetnames:
-        return
-
-    ws = wb["Animation QC"]
-    header = [cell.value for cell in next(ws.iter_rows(min_row=1, max_row=1))]
-    if "Animation Type" not in header:
-        return
-
-    anim_col_idx = header.index("Animation Type") + 1
-    for row in ws.iter_rows(min_row=2):
-        cell = row[anim_col_idx - 1]
-        value = str(cell.value).lower().strip() if cell.value else ""
-        if "fade" in value or "wipe" in value:
-            cell.fill = PatternFill(start_color="CCFFCC", end_color="CCFFCC", fill_type="solid")
-        elif value == "unknown":
-            cell.fill = PatternFill(start_color="FFCCCC", end_color="FFCCCC", fill_type="solid")
-
-    wb.save(excel_path)
+# Two decks plus form overhead; anything bigger is refused before it is read
+app.config["MAX_CONTENT_LENGTH"] = 2 * MAX_UPLOAD_BYTES + 1024 * 1024
+workspaces = WorkspaceManager()
+
+# Load the similarity model off the request path; set QC_WARM_UP_MODEL=0 to load on first use
+if os.environ.get("QC_WARM_UP_MODEL", "1") == "1":
+    threading.Thread(target=warm_up, name="model-warm-up", daemon=True).start()
+
+# Background workers for /jobs; state lives in a local SQLite file and survives restarts
+job_queue = JobQueue(run_qc_pipeline).start()
+
+# Each request gets its own workspace; old or excess workspaces and uploads are evicted in the background.
+# Requests in progress mark their workspace busy on disk, so no worker process's cleaner removes it.
+workspace_cleaner = WorkspaceCleaner(workspaces, is_active=job_queue.is_active).start()
+
+
+def save_uploads(workspace):
+    return [workspace.add_upload(request.files[field]) for field in ("file_a", "file_b")]
+
+def requested_profile():
+    # Optional "profile" form field picks a brand style profile; unknown names are a 400
+    return get_profile(request.form.get("profile") or None)
+
+@app.errorhandler(UploadTooLarge)
+@app.errorhandler(413)
+def upload_too_large(e):
+    return jsonify({"error": f"Each deck must be at most {MAX_UPLOAD_BYTES / (1024 * 1024):g} MB"}), 413
+
+@app.errorhandler(UnknownProfile)
+def unknown_profile(e):
+    return jsonify({"error": str(e), "profiles": available_profiles()}), 400
 
 @app.route('/')
 def index():
     return render_template('index.html')
 
+@app.route('/ready')
+def ready():
+    status = {"ready": is_ready(), "model": MODEL_NAME}
+    return jsonify(status), (200 if status["ready"] else 503)
+
+@app.route('/metrics')
+def metrics():
+    # Prometheus text format: per-stage wall/CPU totals, counters, memory and queue depth
+    gauges = {"model_ready": int(is_ready())}
+    for status, total in job_queue.store.counts().items():
+        gauges[f"jobs_{status}"] = total
+    return Response(registry.render(gauges), mimetype="text/plain; version=0.0.4")
+
 @app.route('/process', methods=['POST'])
 def process_files():
-    file_a = request.files['file_a']
-    file_b = request.files['file_b']
-    filename_a = secure_filename(file_a.filename)
-    filename_b = secure_filename(file_b.filename)
-    path_a = os.path.join(UPLOAD_FOLDER, filename_a)
-    path_b = os.path.join(UPLOAD_FOLDER, filename_b)
-    file_a.save(path_a)
-    file_b.save(path_b)
-
-    ungrouped_path_b = os.path.join(UPLOAD_FOLDER, "ungrouped_" + filename_b)
-    ungroup_shapes_in_ppt(path_b, ungrouped_path_b)
-
-    output_filename = f"{os.path.splitext(filename_b)[0]}_QC_Report.xlsx"
-    output_path = os.path.join(OUTPUT_FOLDER, output_filename)
-
-    df_animation = run_animation_qc(ungrouped_path_b)
-    df_slide_point, df_summary = run_chunking_qc_with_animation(ungrouped_path_b)
-    df_notes_a, df_notes_b, df_cmp, df_qc = run_notes_validation(path_a, ungrouped_path_b)
-    df_text_rules = run_text_rules_validation(df_qc)
-
-    df_slide_point = clean_illegal_excel_chars(df_slide_point)
-    df_summary = clean_illegal_excel_chars(df_summary)
-    df_animation = clean_illegal_excel_chars(df_animation)
-    df_notes_a = clean_illegal_excel_chars(df_notes_a)
-    df_notes_b = clean_illegal_excel_chars(df_notes_b)
-    df_cmp = clean_illegal_excel_chars(df_cmp)
-    df_qc = clean_illegal_excel_chars(df_qc)
-    df_text_rules = clean_illegal_excel_chars(df_text_rules)
-
-    with pd.ExcelWriter(output_path, engine="openpyxl") as writer:
-        df_slide_point.to_excel(writer, sheet_name="Slide Point Analysis", index=False)
-        df_summary.to_excel(writer, sheet_name="Summary Review", index=False)
-        df_animation.to_excel(writer, sheet_name="Animation QC", index=False)
-        df_notes_a.to_excel(writer, sheet_name="File A Notes", index=False)
-        df_notes_b.to_excel(writer, sheet_name="File B Notes", index=False)
-        df_cmp.to_excel(writer, sheet_name="Comparison Results", index=False)
-        df_qc.to_excel(writer, sheet_name="Quality Check", index=False)
-        df_text_rules.to_excel(writer, sheet_name="Text Rules Check", index=False)
-
-    color_slide_point_comments(output_path)
-    highlight_animations(output_path)
-    update_font_validation_with_fallback(output_path)
-
-    #  Add new sheet summarizing all QC issues
-    generate_qc_summary(output_path)
-
+    profile = requested_profile()
+    workspace = workspaces.create()
+    workspaces.mark_busy(workspace)
+    try:
+        path_a, path_b = save_uploads(workspace)
+        output_path = workspace.output_path(report_filename(path_b))
+        run_qc_pipeline(path_a, path_b, output_path, work_dir=workspace.dir, profile=profile)
+    finally:
+        workspaces.release(workspace)
     return send_file(output_path, as_attachment=True)
 
+def release_workspace(workspace):
+    workspaces.release(workspace)
+    workspace.remove()
+
+def ndjson_events(events, workspace):
+    try:
+        for event in events:
+            yield json.dumps(event, ensure_ascii=False) + "\n"
+    except Exception as e:
+        # Headers are already sent, so a failure is reported in-band as the last line
+        yield json.dumps({"type": "error", "error": f"{type(e).__name__}: {e}"}) + "\n"
+    finally:
+        release_workspace(workspace)
+
+@app.route('/api/process', methods=['POST'])
+def process_files_api():
+    # The report's results as JSON with no workbook written; ?format=ndjson streams them slide by slide
+    ndjson = request.args.get("format") == "ndjson" or request.accept_mimetypes.best == "application/x-ndjson"
+    profile = requested_profile()
+    workspace = workspaces.create()
+    workspaces.mark_busy(workspace)
+    streaming = False
+    try:
+        path_a, path_b = save_uploads(workspace)
+        if ndjson:
+            streaming = True  # The stream releases the workspace once it has finished
+            events = stream_qc_results(path_a, path_b, workspace.dir, profile=profile)
+            return Response(ndjson_events(events, workspace), mimetype="application/x-ndjson")
+        sheets = run_qc_results(path_a, path_b, work_dir=workspace.dir, profile=profile)
+        return jsonify({
+            "file_a": os.path.basename(path_a),
+            "file_b": os.path.basename(path_b),
+            "profile": profile.name,
+            "results": results_to_json(sheets),
+        })
+    finally:
+        if not streaming:
+            release_workspace(workspace)
+
+@app.route('/jobs', methods=['POST'])
+def submit_job():
+    # Checked before the upload is stored, so an unknown profile is a 400 like on /process
+    profile = requested_profile()
+    workspace = workspaces.create()
+    job_id = workspace.job_id
+    workspaces.mark_busy(workspace)
+    try:
+        path_a, path_b = save_uploads(workspace)
+        job_queue.submit(
+            path_a, path_b, workspace.dir, workspace.output_path(report_filename(path_b)),
+            job_id=job_id, profile=profile.name,
+        )
+    except Exception:
+        workspace.remove()
+        raise
+    finally:
+        # From here the job queue's is_active protects the workspace
+        workspaces.release(workspace)
+    return jsonify({
+        "job_id": job_id,
+        "profile": profile.name,
+        "status_url": url_for("job_status", job_id=job_id),
+        "download_url": url_for("download_job", job_id=job_id),
+    }), 202
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    job = job_queue.status(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job"}), 404
+    fields = (
+        "status", "stage", "progress", "error", "queue_position", "profile", "created_at", "started_at", "finished_at",
+    )
+    status = {"job_id": job_id, **{key: job.get(key) for key in fields}}
+    if job["status"] == DONE:
+        status["download_url"] = url_for("download_job", job_id=job_id)
+    return jsonify(status)
+
+@app.route('/jobs/<job_id>/download')
+def download_job(job_id):
+    job = job_queue.status(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job"}), 404
+    if job["status"] != DONE:
+        return jsonify({"error": f"Job is {job['status']}", "status": job["status"]}), 409
+    if not os.path.exists(job["output_path"]):
+        return jsonify({"error": "Report has expired"}), 410
+    return send_file(job["output_path"], as_attachment=True)
+
 if __name__ == '__main__':
     app.run(debug=True)
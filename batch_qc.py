@@ -0,0 +1,231 @@
+"""
+Batch QC for whole releases.
+
+    python batch_qc.py decks/ --out qc_out
+    python batch_qc.py manifest.csv --out qc_out --workers 4
+
+The input is either a manifest CSV with "script" and "final" columns (plus an
+optional "name"), or a directory with script/ and final/ subfolders whose
+decks are paired by file name. Each pair gets its own report in
+<out>/reports/, batch_index.xlsx lists every pair with its status and issue
+counts, and batch_progress.jsonl records each finished pair so that an
+interrupted batch picks up where it stopped. With --export parquet (or arrow)
+each pair's result frames are also written to <out>/results/<pair>/.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import pandas as pd
+
+PROGRESS_FILE = "batch_progress.jsonl"
+INDEX_FILE = "batch_index.xlsx"
+DECK_EXTENSIONS = (".pptx",)
+
+
+# === INPUT ===
+def _decks_by_stem(folder):
+    decks = {}
+    for name in sorted(os.listdir(folder)):
+        stem, ext = os.path.splitext(name)
+        if ext.lower() in DECK_EXTENSIONS and not name.startswith("~$"):
+            decks[stem.lower()] = os.path.join(folder, name)
+    return decks
+
+
+def pairs_from_directory(root):
+    script_dir = os.path.join(root, "script")
+    final_dir = os.path.join(root, "final")
+    if not (os.path.isdir(script_dir) and os.path.isdir(final_dir)):
+        raise SystemExit(f"{root} needs script/ and final/ subfolders")
+    scripts = _decks_by_stem(script_dir)
+    finals = _decks_by_stem(final_dir)
+    for stem in sorted(finals.keys() - scripts.keys()):
+        print(f"[Batch] No script deck for {finals[stem]}, skipping")
+    return [
+        {"name": os.path.splitext(os.path.basename(finals[stem]))[0], "script": scripts[stem], "final": finals[stem]}
+        for stem in sorted(finals.keys() & scripts.keys())
+    ]
+
+
+def pairs_from_manifest(path):
+    base = os.path.dirname(os.path.abspath(path))
+    pairs = []
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        for row in csv.DictReader(f):
+            row = {key.strip().lower(): (value or "").strip() for key, value in row.items() if key}
+            if not row.get("script") or not row.get("final"):
+                continue
+            script = os.path.join(base, row["script"])
+            final = os.path.join(base, row["final"])
+            name = row.get("name") or os.path.splitext(os.path.basename(final))[0]
+            pairs.append({"name": name, "script": script, "final": final})
+    return pairs
+
+
+def load_pairs(source):
+    pairs = pairs_from_directory(source) if os.path.isdir(source) else pairs_from_manifest(source)
+    # Report names must be unique even when two finals share a file name
+    seen = {}
+    for pair in pairs:
+        key = "".join(c if c.isalnum() or c in "-_." else "_" for c in pair["name"])
+        seen[key] = seen.get(key, 0) + 1
+        pair["key"] = key if seen[key] == 1 else f"{key}_{seen[key]}"
+    return pairs
+
+
+# === PROGRESS ===
+def read_progress(out_dir):
+    done = {}
+    path = os.path.join(out_dir, PROGRESS_FILE)
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # Half-written last line from an interrupted run
+                done[record["key"]] = record
+    return done
+
+
+def append_progress(out_dir, record):
+    with open(os.path.join(out_dir, PROGRESS_FILE), "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+# === WORKERS ===
+def init_worker():
+    # Each worker process loads the similarity model once and reuses it for every deck
+    from model_provider import warm_up
+    warm_up()
+
+
+def issue_counts(report_path):
+    try:
+        df = pd.read_excel(report_path, sheet_name="QC Points")
+    except Exception:
+        return {}
+    if "Issue Type" not in df.columns:
+        return {}
+    return {str(k): int(v) for k, v in df["Issue Type"].value_counts().items()}
+
+
+def qc_pair(pair, out_dir, export_format=None, profile=None):
+    from qc_pipeline import run_qc_pipeline
+
+    work_dir = os.path.join(out_dir, "work", pair["key"])
+    os.makedirs(work_dir, exist_ok=True)
+    report_path = os.path.join(out_dir, "reports", f"{pair['key']}_QC_Report.xlsx")
+    # Columnar copies of the result frames, for loading into analytics tools without openpyxl
+    export_dir = os.path.join(out_dir, "results", pair["key"]) if export_format else None
+    started = time.time()
+    record = {"key": pair["key"], "name": pair["name"], "script": pair["script"], "final": pair["final"]}
+    try:
+        run_qc_pipeline(pair["script"], pair["final"], report_path, work_dir=work_dir,
+                        export_dir=export_dir, export_format=export_format or "parquet", profile=profile)
+        record.update(status="done", report=report_path, issues=issue_counts(report_path))
+    except Exception as e:
+        traceback.print_exc()
+        record.update(status="failed", error=f"{type(e).__name__}: {e}")
+    record["seconds"] = round(time.time() - started, 2)
+    return record
+
+
+# === INDEX ===
+def write_index(out_dir, pairs, records):
+    from report_writer import write_report
+
+    rows = []
+    for pair in pairs:
+        record = records.get(pair["key"], {})
+        row = {
+            "Deck": pair["name"],
+            "Script Deck": pair["script"],
+            "Final Deck": pair["final"],
+            "Status": record.get("status", "pending"),
+            "Report": os.path.relpath(record["report"], out_dir) if record.get("report") else "",
+            "Seconds": record.get("seconds"),
+            "Error": record.get("error", ""),
+        }
+        issues = record.get("issues", {})
+        row["Total Issues"] = sum(issues.values()) if record.get("status") == "done" else None
+        for issue_type, count in sorted(issues.items()):
+            row[issue_type] = count
+        rows.append(row)
+    df = pd.DataFrame(rows)
+    path = os.path.join(out_dir, INDEX_FILE)
+    write_report(path, [("Batch Index", df)], fill_rules={})
+    return path
+
+
+# === MAIN ===
+def run_batch(source, out_dir, workers=None, resume=True, retry_failed=False, export_format=None, profile=None):
+    pairs = load_pairs(source)
+    if profile:
+        from style_profiles import get_profile
+        get_profile(profile)  # An unknown profile fails here, before any worker starts
+    out_dir = os.path.abspath(out_dir)
+    os.makedirs(os.path.join(out_dir, "reports"), exist_ok=True)
+    records = read_progress(out_dir) if resume else {}
+    if not resume and os.path.exists(os.path.join(out_dir, PROGRESS_FILE)):
+        os.remove(os.path.join(out_dir, PROGRESS_FILE))
+
+    def finished(key):
+        record = records.get(key)
+        if not record:
+            return False
+        if record["status"] == "done":
+            return os.path.exists(record.get("report", ""))
+        return not retry_failed
+
+    todo = [pair for pair in pairs if not finished(pair["key"])]
+    print(f"[Batch] {len(pairs)} pair(s), {len(pairs) - len(todo)} already done, {len(todo)} to run")
+
+    if todo:
+        workers = workers or max(1, min(len(todo), (os.cpu_count() or 2) // 2))
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as pool:
+            futures = {pool.submit(qc_pair, pair, out_dir, export_format, profile): pair for pair in todo}
+            for n, future in enumerate(as_completed(futures), start=1):
+                pair = futures[future]
+                try:
+                    record = future.result()
+                except Exception as e:
+                    # The worker process itself died; record it so the batch keeps going
+                    record = {"key": pair["key"], "name": pair["name"], "script": pair["script"],
+                              "final": pair["final"], "status": "failed", "error": f"{type(e).__name__}: {e}"}
+                records[pair["key"]] = record
+                append_progress(out_dir, record)
+                print(f"[Batch] {n}/{len(todo)} {pair['name']}: {record['status']} ({record.get('seconds', '-')}s)")
+
+    index_path = write_index(out_dir, pairs, records)
+    failed = sum(1 for pair in pairs if records.get(pair["key"], {}).get("status") != "done")
+    print(f"[Batch] Index written to {index_path}; {failed} pair(s) not done")
+    return failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="QC many (script deck, final deck) pairs in one run.")
+    parser.add_argument("source", help="Manifest CSV (script,final[,name]) or a directory with script/ and final/")
+    parser.add_argument("--out", default="batch_output", help="Directory for reports, index and progress")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: half the CPUs)")
+    parser.add_argument("--no-resume", action="store_true", help="Ignore previous progress and redo every pair")
+    parser.add_argument("--retry-failed", action="store_true", help="Re-run pairs that failed last time")
+    parser.add_argument("--export", choices=("parquet", "arrow"), default=None,
+                        help="Also write each pair's result frames to <out>/results/<pair>/ in this format")
+    parser.add_argument("--profile", default=None, help="Style profile from style_profiles/ (default: QC_STYLE_PROFILE)")
+    args = parser.parse_args(argv)
+    failed = run_batch(args.source, args.out, workers=args.workers,
+                       resume=not args.no_resume, retry_failed=args.retry_failed, export_format=args.export,
+                       profile=args.profile)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,289 @@
+"""
+Benchmarks for every checker and the end-to-end /process flow on synthetic decks.
+
+    python -m benchmarks.run_benchmarks --stub-model
+    python -m benchmarks.run_benchmarks --stub-model --axes slides --repeat 5
+    python -m benchmarks.run_benchmarks --stub-model --update-baseline
+
+Each axis (slide count, shapes per slide, group nesting, animations per slide,
+VO length) is swept on its own with the other dimensions held at DeckSpec's
+defaults, and every benchmark is timed at each point (best of --repeat). The
+scaling table shows seconds per point and the log-log slope, so ~1 is linear
+and ~2 quadratic.
+
+Times are divided by a fixed calibration workload before they are compared
+with benchmarks/baseline.json, which keeps the baseline usable across
+machines of different speed. A benchmark regresses when it is more than
+--tolerance slower than its baseline and also slower by more than the noise
+floor; any regression makes the run exit with status 1.
+"""
+import argparse
+import json
+import math
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.synthetic_deck import DeckSpec, build_pair  # noqa: E402
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_TOLERANCE = 0.25
+# Differences below this many seconds are treated as timer noise, whatever the ratio
+NOISE_FLOOR_SECONDS = 0.05
+
+AXES = {
+    "slides": [5, 10, 20, 40],
+    "shapes_per_slide": [2, 6, 12, 24],
+    "group_depth": [0, 1, 2, 4],
+    "animations_per_slide": [0, 4, 8, 16],
+    "vo_words": [30, 60, 120, 480],
+}
+
+
+_scratch = None
+
+
+def prepare_environment():
+    """
+    Points the app's workspace, job store and results history at a scratch
+    directory and turns off the model warm-up, job workers and slide cache.
+    Must run before any QC module is imported, as they read their config at
+    import time.
+    """
+    global _scratch
+    _scratch = tempfile.mkdtemp(prefix="qc_bench_")
+    os.environ.setdefault("QC_WARM_UP_MODEL", "0")
+    os.environ.setdefault("QC_JOB_WORKERS", "0")
+    # Every repeat would otherwise be served from the cache
+    os.environ.setdefault("QC_SLIDE_CACHE_ENABLED", "0")
+    os.environ.setdefault("QC_WORKSPACE", os.path.join(_scratch, "workspace"))
+    os.environ.setdefault("QC_JOB_DB", os.path.join(_scratch, "jobs.sqlite3"))
+    os.environ.setdefault("QC_HISTORY", os.path.join(_scratch, "history"))
+    return _scratch
+
+
+# === CALIBRATION ===
+def calibrate(repeat=7):
+    """Seconds for a fixed mix of interpreter and numpy work, used to normalise timings."""
+    import numpy as np
+    rng = np.random.default_rng(0)
+    matrix = rng.random((200, 200))
+    words = [f"word{i % 997}" for i in range(500000)]
+
+    def workload():
+        counts = {}
+        for word in words:
+            counts[word] = counts.get(word, 0) + 1
+        sorted(words)
+        for _ in range(50):
+            matrix @ matrix
+
+    return _best_of(workload, repeat)
+
+
+def _best_of(func, repeat):
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+# === BENCHMARKS ===
+def _benchmarks(path_a, path_b, work_dir):
+    """{name: zero-argument callable}; the checkers get pre-parsed decks, as the pipeline gives them."""
+    from ungroup_util import ungroup_shapes_in_ppt
+    from deck_model import load_deck
+    from animation_checker import run_animation_qc
+    from chunking_by_animation_win32 import run_chunking_qc_with_animation
+    from notes_validator import run_notes_validation
+    from text_rules_validator import run_text_rules_validation
+    from text_qc_checker import scan_text_issues
+    from qc_pipeline import build_results
+    from report_writer import write_report
+
+    ungrouped = os.path.join(work_dir, "ungrouped_" + os.path.basename(path_b))
+    ungroup_shapes_in_ppt(path_b, ungrouped)
+    deck_a = load_deck(path_a)
+    deck_b = load_deck(ungrouped)
+    notes = run_notes_validation(deck_a, deck_b)
+    chunking = run_chunking_qc_with_animation(deck_b)
+    df_animation = run_animation_qc(deck_b)
+    df_text_rules = run_text_rules_validation(notes[3])
+
+    def report():
+        sheets = build_results(df_animation, chunking, notes, df_text_rules)
+        write_report(os.path.join(work_dir, "bench_report.xlsx"), sheets)
+
+    return {
+        "ungroup": lambda: ungroup_shapes_in_ppt(path_b, ungrouped),
+        "load_deck": lambda: load_deck(ungrouped),
+        "animation": lambda: run_animation_qc(deck_b),
+        "chunking": lambda: run_chunking_qc_with_animation(deck_b),
+        "notes": lambda: run_notes_validation(deck_a, deck_b),
+        "text_rules": lambda: run_text_rules_validation(notes[3]),
+        "us2uk_scan": lambda: scan_text_issues(deck_b),
+        "report": report,
+        "process_files": lambda: _post_process(path_a, path_b),
+    }
+
+
+_client = None
+
+
+def _post_process(path_a, path_b):
+    """The whole /process request through Flask's test client: upload, pipeline, report download."""
+    global _client
+    if _client is None:
+        from app import app
+        _client = app.test_client()
+    with open(path_a, "rb") as file_a, open(path_b, "rb") as file_b:
+        response = _client.post("/process", data={
+            "file_a": (file_a, os.path.basename(path_a)),
+            "file_b": (file_b, os.path.basename(path_b)),
+        }, content_type="multipart/form-data")
+    body = response.get_data()
+    response.close()
+    if response.status_code != 200:
+        raise RuntimeError(f"/process returned {response.status_code}: {body[:200]!r}")
+
+
+def run_point(spec, repeat, only=None):
+    with tempfile.TemporaryDirectory(dir=_scratch) as work_dir:
+        path_a, path_b = build_pair(work_dir, spec)
+        timings = {}
+        for name, func in _benchmarks(path_a, path_b, work_dir).items():
+            if only and name not in only:
+                continue
+            func()  # Untimed first call pays for imports, dictionary loads and the like
+            timings[name] = _best_of(func, repeat)
+        return timings
+
+
+# === REPORTING ===
+def loglog_slope(xs, ys):
+    """Least-squares slope of log(y) against log(x), ignoring non-positive points."""
+    points = [(math.log(x), math.log(y)) for x, y in zip(xs, ys) if x > 0 and y > 0]
+    if len(points) < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    var_x = sum((x - mean_x) ** 2 for x, _ in points)
+    if var_x == 0:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / var_x
+
+
+def print_scaling(axis, values, results):
+    names = list(results[values[0]])
+    header = f"{'benchmark':<14}" + "".join(f"{v:>10}" for v in values) + f"{'slope':>8}"
+    print(f"\n[Bench] Seconds by {axis}")
+    print(header)
+    print("-" * len(header))
+    for name in names:
+        seconds = [results[v][name] for v in values]
+        slope = loglog_slope(values, seconds)
+        print(f"{name:<14}" + "".join(f"{s:>10.4f}" for s in seconds) + (f"{slope:>8.2f}" if slope is not None else f"{'-':>8}"))
+
+
+def compare_to_baseline(current, baseline, calibration, tolerance, noise_floor=NOISE_FLOOR_SECONDS):
+    """Returns (key, baseline seconds, current seconds, ratio) for every regression."""
+    regressions = []
+    for key, entry in current.items():
+        reference = baseline.get("results", {}).get(key)
+        if reference is None:
+            continue
+        # Baseline time rescaled to this machine's speed
+        expected = reference["normalised"] * calibration
+        actual = entry["seconds"]
+        if actual > expected * (1 + tolerance) and actual - expected > noise_floor:
+            regressions.append((key, expected, actual, actual / expected))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the QC checkers on synthetic decks")
+    parser.add_argument("--axes", nargs="+", choices=sorted(AXES), default=sorted(AXES))
+    parser.add_argument("--only", nargs="+", help="benchmark names to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per point; the best is kept")
+    parser.add_argument("--stub-model", action="store_true", help="use an offline hashing model instead of the real one")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="allowed slowdown, e.g. 0.25 for 25%%")
+    parser.add_argument("--out", help="write this run's results as JSON")
+    args = parser.parse_args(argv)
+
+    scratch = prepare_environment()
+    try:
+        return _run(args)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+def _run(args):
+    if args.stub_model:
+        from benchmarks.stub_model import install_stub_model
+        install_stub_model()
+
+    calibration = calibrate()
+    print(f"[Bench] Calibration workload: {calibration:.4f}s")
+
+    current = {}
+    for axis in args.axes:
+        results = {}
+        for value in AXES[axis]:
+            spec = DeckSpec(**{axis: value})
+            results[value] = run_point(spec, args.repeat, args.only)
+            for name, seconds in results[value].items():
+                current[f"{axis}={value}/{name}"] = {"seconds": seconds, "normalised": seconds / calibration}
+        print_scaling(axis, AXES[axis], results)
+
+    run = {
+        "calibration_seconds": calibration,
+        "stub_model": args.stub_model,
+        "repeat": args.repeat,
+        "results": current,
+    }
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(run, f, indent=2, sort_keys=True)
+
+    if args.update_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding="utf-8") as f:
+                baseline = json.load(f)
+        # Merge, so a partial run (--axes/--only) only refreshes what it measured
+        run["results"] = {**baseline.get("results", {}), **current}
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(run, f, indent=2, sort_keys=True)
+        print(f"[Bench] Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"[Bench] No baseline at {args.baseline}; run with --update-baseline to create one")
+        return 0
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline.get("stub_model") != args.stub_model:
+        print("[Bench] Warning: baseline and this run use different models; comparisons are not like for like")
+
+    regressions = compare_to_baseline(current, baseline, calibration, args.tolerance)
+    if not regressions:
+        print(f"\n[Bench] No regressions beyond {args.tolerance:.0%} against {args.baseline}")
+        return 0
+    print(f"\n[Bench] {len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+    for key, expected, actual, ratio in sorted(regressions, key=lambda r: -r[3]):
+        print(f"  {key}: {actual:.4f}s vs {expected:.4f}s expected ({ratio:.2f}x)")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,39 @@
+import hashlib
+import re
+import numpy as np
+
+TOKEN_RE = re.compile(r"\w+")
+
+
+class HashingModel:
+    """
+    Offline stand-in for SentenceTransformer.encode: a hashed bag of words.
+    Similar sentences still score close, so the matching code takes the same
+    paths, but nothing is downloaded and inference costs next to nothing.
+    """
+
+    def __init__(self, dim=384):
+        self.dim = dim
+
+    def _vector(self, text):
+        vec = np.zeros(self.dim, dtype=np.float32)
+        for token in TOKEN_RE.findall(text.lower()):
+            digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+            vec[int.from_bytes(digest, "little") % self.dim] += 1.0
+        return vec
+
+    def encode(self, sentences, batch_size=32, convert_to_numpy=True, convert_to_tensor=False,
+               normalize_embeddings=False, show_progress_bar=False, **kwargs):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        embeddings = np.stack([self._vector(text) for text in texts]) if texts else np.zeros((0, self.dim), np.float32)
+        if normalize_embeddings and len(texts):
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings = embeddings / np.where(norms == 0, 1, norms)
+        return embeddings[0] if single else embeddings
+
+
+def install_stub_model():
+    """Makes every checker use the hashing model, bypassing the embedding cache so timings stay comparable."""
+    from model_provider import set_model
+    set_model(HashingModel(), cached=False)
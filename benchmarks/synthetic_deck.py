@@ -0,0 +1,136 @@
+import os
+import random
+from dataclasses import dataclass
+from lxml import etree
+from pptx import Presentation
+from pptx.util import Emu, Pt
+
+P_NS = "http://schemas.openxmlformats.org/presentationml/2006/main"
+
+WORDS = (
+    "colour organise learner practise centre behaviour analyse programme travelled "
+    "market value growth energy system number process model result lesson chapter "
+    "example question answer method theory evidence source figure table graph "
+    "increase decrease compare describe explain identify measure record observe"
+).split()
+
+# (presetID, presetClass, presetSubtype): Fade, Wipe from left, Fly in from bottom, Appear
+EFFECTS = [(10, "entr", 0), (22, "entr", 8), (2, "entr", 4), (1, "entr", 0)]
+NODE_TYPES = ["clickEffect", "withEffect", "afterEffect"]
+FONTS = [("HelveticaNowDisplay Medium", 27), ("Queens Medium", 35), ("Arial", 18)]
+
+
+@dataclass
+class DeckSpec:
+    slides: int = 20
+    shapes_per_slide: int = 6
+    group_depth: int = 1
+    animations_per_slide: int = 4
+    vo_words: int = 60
+    seed: int = 0
+
+
+def _sentence(rng, words):
+    text = " ".join(rng.choice(WORDS) for _ in range(words))
+    return text[0].upper() + text[1:] + "."
+
+
+def _timing_xml(shape_ids, rng):
+    """A main sequence with one click group per effect, like PowerPoint writes it."""
+    ids = iter(range(3, 100000))
+
+    def ctn(parent, **attrs):
+        el = etree.SubElement(parent, f"{{{P_NS}}}cTn", {k: str(v) for k, v in attrs.items()})
+        return el
+
+    timing = etree.Element(f"{{{P_NS}}}timing", nsmap={"p": P_NS})
+    root = ctn(etree.SubElement(etree.SubElement(timing, f"{{{P_NS}}}tnLst"), f"{{{P_NS}}}par"),
+               id=1, dur="indefinite", restart="never", nodeType="tmRoot")
+    seq = etree.SubElement(etree.SubElement(root, f"{{{P_NS}}}childTnLst"), f"{{{P_NS}}}seq",
+                           concurrent="1", nextAc="seek")
+    main = ctn(seq, id=2, dur="indefinite", nodeType="mainSeq")
+    groups = etree.SubElement(main, f"{{{P_NS}}}childTnLst")
+
+    for spid in shape_ids:
+        click = ctn(etree.SubElement(groups, f"{{{P_NS}}}par"), id=next(ids), fill="hold")
+        etree.SubElement(etree.SubElement(click, f"{{{P_NS}}}stCondLst"), f"{{{P_NS}}}cond", delay="indefinite")
+        inner = ctn(etree.SubElement(etree.SubElement(click, f"{{{P_NS}}}childTnLst"), f"{{{P_NS}}}par"),
+                    id=next(ids), fill="hold")
+        etree.SubElement(etree.SubElement(inner, f"{{{P_NS}}}stCondLst"), f"{{{P_NS}}}cond", delay="0")
+        preset_id, preset_class, subtype = rng.choice(EFFECTS)
+        effect = ctn(etree.SubElement(etree.SubElement(inner, f"{{{P_NS}}}childTnLst"), f"{{{P_NS}}}par"),
+                     id=next(ids), presetID=preset_id, presetClass=preset_class, presetSubtype=subtype,
+                     fill="hold", nodeType=rng.choice(NODE_TYPES))
+        etree.SubElement(etree.SubElement(effect, f"{{{P_NS}}}stCondLst"), f"{{{P_NS}}}cond",
+                         delay=str(rng.choice([0, 250, 500])))
+        behaviour = etree.SubElement(etree.SubElement(etree.SubElement(effect, f"{{{P_NS}}}childTnLst"),
+                                                      f"{{{P_NS}}}set"), f"{{{P_NS}}}cBhvr")
+        ctn(behaviour, id=next(ids), dur=1, fill="hold")
+        etree.SubElement(etree.SubElement(behaviour, f"{{{P_NS}}}tgtEl"), f"{{{P_NS}}}spTgt", spid=str(spid))
+    return timing
+
+
+def _add_textbox(shapes, rng, index, text):
+    box = shapes.add_textbox(Emu(300000 + 200000 * index), Emu(1200000 + 350000 * index), Emu(4000000), Emu(300000))
+    box.text_frame.text = text
+    font_name, size = rng.choice(FONTS)
+    run = box.text_frame.paragraphs[0].runs[0]
+    run.font.name = font_name
+    run.font.size = Pt(size)
+    return box
+
+
+def build_deck(path, spec, variant=0):
+    """
+    Writes a deck following spec. variant > 0 rewords a few VO lines and slide
+    points so File A / File B comparisons have real differences to find.
+    """
+    rng = random.Random(spec.seed)
+    variant_rng = random.Random(spec.seed * 1000 + variant)
+    prs = Presentation()
+    layout = prs.slide_layouts[5]
+
+    for number in range(1, spec.slides + 1):
+        slide = prs.slides.add_slide(layout)
+        slide.shapes.title.text = f"Slide {number}: {_sentence(rng, 3)}"
+        points = [_sentence(rng, rng.randint(4, 10)) for _ in range(spec.shapes_per_slide)]
+        if variant and variant_rng.random() < 0.2:
+            points[0] = _sentence(variant_rng, 6)
+
+        animated = []
+        container = slide.shapes
+        loose = spec.shapes_per_slide // 2
+        for index, point in enumerate(points[:loose]):
+            animated.append(_add_textbox(container, rng, index, point).shape_id)
+        # The rest go into groups nested group_depth deep
+        for depth in range(spec.group_depth):
+            container = container.add_group_shape().shapes
+        for index, point in enumerate(points[loose:], start=loose):
+            animated.append(_add_textbox(container, rng, index, point).shape_id)
+
+        vo_lines = [point for point in points]
+        remaining = max(0, spec.vo_words - sum(len(p.split()) for p in points))
+        while remaining > 0:
+            words = min(remaining, rng.randint(6, 14))
+            vo_lines.append(_sentence(rng, words))
+            remaining -= words
+        if variant and variant_rng.random() < 0.3:
+            vo_lines[-1] = _sentence(variant_rng, 8)
+        slide.notes_slide.notes_text_frame.text = (
+            "VO:\n" + "\n".join(f"- {line}" for line in vo_lines) + "\nInstructions to GD: none"
+        )
+
+        targets = animated[:spec.animations_per_slide]
+        if targets:
+            slide._element.append(_timing_xml(targets, rng))
+
+    prs.save(path)
+    return path
+
+
+def build_pair(directory, spec):
+    """(script deck, final deck) paths for one spec."""
+    name = f"deck_{spec.slides}x{spec.shapes_per_slide}_g{spec.group_depth}_a{spec.animations_per_slide}_v{spec.vo_words}"
+    path_a = build_deck(os.path.join(directory, f"{name}_A.pptx"), spec)
+    path_b = build_deck(os.path.join(directory, f"{name}_B.pptx"), spec, variant=1)
+    return path_a, path_b
@@ -1,23 +1,71 @@
-import win32com.client
-import pythoncom
 import pandas as pd
-from pptx import Presentation
-from sentence_transformers import SentenceTransformer, util
+from pptx.enum.shapes import MSO_SHAPE_TYPE
+from deck_model import as_deck, source_path
+from vo_matcher import classify_match, match_deck
+from model_provider import get_model
 import re
 import os
 
-model = SentenceTransformer('paraphrase-MiniLM-L6-v2')
-
 def get_vo_text(slide):
     if not slide.has_notes_slide:
         return []
-    notes_text = slide.notes_slide.notes_text_frame.text
+    return parse_vo_lines(slide.notes_slide.notes_text_frame.text)
+
+def parse_vo_lines(notes_text):
     vo_section = re.search(r'VO:(.*?)(Image Link:|Instructions to GD:|$)', notes_text, re.DOTALL | re.IGNORECASE)
     if not vo_section:
         return []
     vo_clean = vo_section.group(1)
     return [line.strip("-• \n") for line in vo_clean.split("\n") if line.strip()]
 
+# Lines of text from a python-pptx shape, descending into groups
+def extract_text_lines(shape):
+    chunks = []
+    if shape.shape_type == MSO_SHAPE_TYPE.GROUP:
+        for sub_shape in shape.shapes:
+            chunks.extend(extract_text_lines(sub_shape))
+    elif shape.has_text_frame and shape.text_frame.text:
+        for line in shape.text_frame.text.splitlines():
+            clean = line.strip("•- \n\t")
+            if clean:
+                chunks.append(clean)
+    return chunks
+
+def index_shapes_by_id(shapes, index=None):
+    index = {} if index is None else index
+    for shape in shapes:
+        index[shape.shape_id] = shape
+        if shape.shape_type == MSO_SHAPE_TYPE.GROUP:
+            index_shapes_by_id(shape.shapes, index)
+    return index
+
+# Walks each slide's p:timing main sequence on the shared DeckModel
+def get_animated_slide_points(source, engine="native"):
+    if engine == "com":
+        return get_animated_slide_points_com(source_path(source))
+    if engine != "native":
+        raise ValueError(f"Unknown animation engine: {engine}")
+
+    deck = as_deck(source)
+    slide_points = {}
+
+    for slide in deck.slides:
+        shapes = index_shapes_by_id(slide.shapes)
+        points = []
+        seen_texts = set()
+        for effect in slide.timeline:
+            shape = shapes.get(effect.shape_id)
+            if shape is None:
+                continue
+            for chunk in extract_text_lines(shape):
+                if chunk not in seen_texts:
+                    points.append(chunk)
+                    seen_texts.add(chunk)
+        slide_points[slide.number] = points
+
+    return slide_points
+
+# === POWERPOINT COM ENGINE ===
 # ✅ Updated to return a list of lines from text frame or grouped shapes
 def extract_text_from_shape(shape):
     chunks = []
@@ -34,7 +82,10 @@ def extract_text_from_shape(shape):
     return chunks
 
 # ✅ Updated to use the new chunk extraction
-def get_animated_slide_points(pptx_path):
+def get_animated_slide_points_com(pptx_path):
+    import pythoncom
+    import win32com.client
+
     pptx_path = os.path.abspath(pptx_path)
     pythoncom.CoInitialize()
     ppt = win32com.client.Dispatch("PowerPoint.Application")
@@ -67,6 +118,9 @@ def compare_point_to_vo(point, vo_lines, used_indices):
     if not vo_lines:
         return ("", 0.0, "Missing", "No VO content", -1)
 
+    from sentence_transformers import util
+
+    model = get_model()
     point_emb = model.encode(point, convert_to_tensor=True)
     vo_embs = model.encode(vo_lines, convert_to_tensor=True)
     cosine_scores = util.cos_sim(point_emb, vo_embs)[0]
@@ -76,47 +130,62 @@ def compare_point_to_vo(point, vo_lines, used_indices):
 
     best_score = float(cosine_scores.max())
     best_idx = int(cosine_scores.argmax())
-    best_match = vo_lines[best_idx]
-
-    if point.strip().lower() == best_match.strip().lower():
-        return best_match, 1.0, "Exact Copy", "Perfect match (copied)", best_idx
-    elif best_score >= 0.75:
-        return best_match, best_score, "Strong", "Chunked properly", best_idx
-    elif best_score >= 0.5:
-        return best_match, best_score, "Partial", "Partially matching", best_idx
+    return classify_match(point, vo_lines[best_idx], best_score, best_idx)
+
+def match_points_one_by_one(points, vo_lines):
+    used_vo_indices = set()
+    results = []
+    for point in points:
+        result = compare_point_to_vo(point, vo_lines, used_vo_indices)
+        if result[4] >= 0:
+            used_vo_indices.add(result[4])
+        results.append(result)
+    return results
+
+def get_slide_points(slide_model, animated_points):
+    slide_texts = animated_points.get(slide_model.number, [])
+    if slide_texts:
+        return slide_texts, False
+
+    shape_data = []
+    for shape in slide_model.shapes:
+        if shape.has_text_frame and shape.text.strip():
+            lines = shape.text.splitlines()
+            for line in lines:
+                clean = line.strip("•- \n\t")
+                if clean:
+                    shape_data.append((shape.top, shape.left, clean))
+    shape_data.sort(key=lambda x: (x[0], x[1]))
+    return [text for _, _, text in shape_data], True
+
+def run_chunking_qc_with_animation(source, batched=True):
+    """
+    batched=True encodes every slide point and VO line of the deck in shared
+    batches and scores each slide as one matrix; batched=False keeps the
+    original per-point compare_point_to_vo loop.
+    """
+    deck = as_deck(source)
+    animated_points = get_animated_slide_points(deck)
+
+    slides = []
+    for slide_model in deck.slides:
+        slide_texts, fallback_used = get_slide_points(slide_model, animated_points)
+        vo_texts = parse_vo_lines(slide_model.notes_text)
+        slides.append((slide_model.number, slide_texts, vo_texts, fallback_used))
+
+    if batched:
+        matches = match_deck(get_model(), [(slide_texts, vo_texts) for _, slide_texts, vo_texts, _ in slides])
     else:
-        return best_match, best_score, "Missing", "No strong match", -1
+        matches = [match_points_one_by_one(slide_texts, vo_texts) for _, slide_texts, vo_texts, _ in slides]
 
-def run_chunking_qc_with_animation(pptx_path):
-    prs = Presentation(pptx_path)
-    animated_points = get_animated_slide_points(pptx_path)
     all_rows, summary = [], []
 
-    for i, slide in enumerate(prs.slides, start=1):
-        slide_texts = animated_points.get(i, [])
-        vo_texts = get_vo_text(slide)
+    for (i, slide_texts, vo_texts, fallback_used), slide_matches in zip(slides, matches):
         chunk_status_list, copy_match_list = [], []
         slide_points_with_order = []
-        used_vo_indices = set()
-        fallback_used = False
 
-        if not slide_texts:
-            fallback_used = True
-            shape_data = []
-            for shape in slide.shapes:
-                if shape.has_text_frame and shape.text.strip():
-                    lines = shape.text.splitlines()
-                    for line in lines:
-                        clean = line.strip("•- \n\t")
-                        if clean:
-                            shape_data.append((shape.top, shape.left, clean))
-            shape_data.sort(key=lambda x: (x[0], x[1]))
-            slide_texts = [text for _, _, text in shape_data]
-
-        for j, point in enumerate(slide_texts, start=1):
-            vo_match, score, match_type, comment, matched_idx = compare_point_to_vo(point, vo_texts, used_vo_indices)
-            if matched_idx >= 0:
-                used_vo_indices.add(matched_idx)
+        for j, (point, match) in enumerate(zip(slide_texts, slide_matches), start=1):
+            vo_match, score, match_type, comment, matched_idx = match
             copy_match = "Yes" if match_type == "Exact Copy" else "No"
             chunk_status = (
                 "Chunked Properly" if match_type in ["Exact Copy", "Strong"]
@@ -1,11 +1,10 @@
-from pptx import Presentation
 from pptx.dml.color import RGBColor
-from sentence_transformers import SentenceTransformer, util
 import pandas as pd
+from deck_model import as_deck
+from vo_matcher import classify_match, match_deck
+from model_provider import get_model
 import re
 
-model = SentenceTransformer('paraphrase-MiniLM-L6-v2')
-
 def get_slide_text_with_position(slide):
     shape_data = []
     for shape in slide.shapes:
@@ -27,7 +26,9 @@ def get_slide_text_with_position(slide):
 def get_vo_text(slide):
     if not slide.has_notes_slide:
         return []
-    notes_text = slide.notes_slide.notes_text_frame.text
+    return parse_vo_lines(slide.notes_slide.notes_text_frame.text)
+
+def parse_vo_lines(notes_text):
     vo_section = re.search(r'VO:(.*?)(Image Link:|Instructions to GD:|$)', notes_text, re.DOTALL | re.IGNORECASE)
     if not vo_section:
         return []
@@ -37,33 +38,37 @@ def get_vo_text(slide):
 def compare_point_to_vo(point, vo_lines):
     if not vo_lines:
         return ("", 0.0, "Missing", "No VO content")
+    from sentence_transformers import util
+
+    model = get_model()
     point_emb = model.encode(point, convert_to_tensor=True)
     vo_embs = model.encode(vo_lines, convert_to_tensor=True)
     cosine_scores = util.cos_sim(point_emb, vo_embs)[0]
     best_score = float(cosine_scores.max())
     best_idx = int(cosine_scores.argmax())
-    best_match = vo_lines[best_idx]
-    if point.strip().lower() == best_match.strip().lower():
-        return best_match, 1.0, "Exact Copy", "Perfect match (copied)"
-    elif best_score >= 0.75:
-        return best_match, best_score, "Strong", "Chunked properly"
-    elif best_score >= 0.5:
-        return best_match, best_score, "Partial", "Partially matching"
+    return classify_match(point, vo_lines[best_idx], best_score, best_idx)[:4]
+
+def run_chunking_qc(source, batched=True):
+    deck = as_deck(source)
+    slides = [
+        (slide_model.number, get_slide_text_with_position(slide_model.slide), parse_vo_lines(slide_model.notes_text))
+        for slide_model in deck.slides
+    ]
+
+    # Batched mode encodes the whole deck at once; points may share a VO line here
+    if batched:
+        matches = match_deck(get_model(), [(slide_texts, vo_texts) for _, slide_texts, vo_texts in slides], exclusive=False)
     else:
-        return best_match, best_score, "Missing", "No strong match"
+        matches = [[compare_point_to_vo(point, vo_texts) for point in slide_texts] for _, slide_texts, vo_texts in slides]
 
-def run_chunking_qc(pptx_path):
-    prs = Presentation(pptx_path)
     all_rows, summary = [], []
 
-    for i, slide in enumerate(prs.slides, start=1):
-        slide_texts = get_slide_text_with_position(slide)
-        vo_texts = get_vo_text(slide)
+    for (i, slide_texts, vo_texts), slide_matches in zip(slides, matches):
         chunk_status_list, copy_match_list = [], []
         slide_points_with_order = []
 
-        for j, point in enumerate(slide_texts, start=1):
-            vo_match, score, match_type, comment = compare_point_to_vo(point, vo_texts)
+        for j, (point, match) in enumerate(zip(slide_texts, slide_matches), start=1):
+            vo_match, score, match_type, comment = match[:4]
             copy_match = "Yes" if match_type == "Exact Copy" else "No"
             chunk_status = "Chunked Properly" if match_type in ["Exact Copy", "Strong"] else "Not Chunked Properly" if match_type == "Missing" else "Partially Chunked"
             slide_points_with_order.append({
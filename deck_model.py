@@ -0,0 +1,86 @@
+import os
+from dataclasses import dataclass, field
+from functools import cached_property
+from pptx import Presentation
+from animation_timeline import read_slide_timeline
+
+
+# === MODEL ===
+@dataclass
+class SlideModel:
+    number: int
+    slide: object  # python-pptx Slide
+    notes_text: str = ""
+    shapes: list = field(default_factory=list)
+
+    @property
+    def element(self):
+        """Root <p:sld> element of the slide part."""
+        return self.slide._element
+
+    @cached_property
+    def timeline(self):
+        """Main-sequence animation effects, read from p:timing on first use."""
+        return read_slide_timeline(self.element, self.number)
+
+
+@dataclass
+class DeckModel:
+    path: str
+    presentation: object  # python-pptx Presentation
+    slides: list = field(default_factory=list)
+
+    @property
+    def file_name(self):
+        return os.path.basename(self.path)
+
+    def __iter__(self):
+        return iter(self.slides)
+
+    def __len__(self):
+        return len(self.slides)
+
+    def subset(self, numbers):
+        """The same deck restricted to the given slide numbers, for re-checking only changed slides."""
+        wanted = set(numbers)
+        return DeckModel(self.path, self.presentation, [slide for slide in self.slides if slide.number in wanted])
+
+
+# === LOADER ===
+def _read_notes_text(slide):
+    # Accessing slide.notes_slide creates a notes part when none exists, so guard it.
+    if not slide.has_notes_slide:
+        return ""
+    frame = slide.notes_slide.notes_text_frame
+    return frame.text if frame is not None else ""
+
+
+def load_deck(pptx_path):
+    """
+    Parses a deck once into a DeckModel that every checker can share,
+    so the package is unzipped and its XML parsed a single time per request.
+    """
+    prs = Presentation(pptx_path)
+    slides = []
+    for number, slide in enumerate(prs.slides, start=1):
+        slides.append(SlideModel(
+            number=number,
+            slide=slide,
+            notes_text=_read_notes_text(slide),
+            shapes=list(slide.shapes),
+        ))
+    return DeckModel(path=os.path.abspath(pptx_path), presentation=prs, slides=slides)
+
+
+def as_deck(source):
+    """Accepts either a file path or an already loaded DeckModel."""
+    if isinstance(source, DeckModel):
+        return source
+    return load_deck(source)
+
+
+def source_path(source):
+    """File path behind a path or DeckModel, for engines that must open the file themselves."""
+    if isinstance(source, DeckModel):
+        return source.path
+    return source
@@ -0,0 +1,196 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+import numpy as np
+from metrics import count
+
+CACHE_PATH = os.environ.get("QC_EMBEDDING_CACHE", os.path.join("cache", "embeddings.sqlite3"))
+MAX_DISK_ENTRIES = int(os.environ.get("QC_EMBEDDING_CACHE_MAX_ENTRIES", 200000))
+MAX_MEMORY_ENTRIES = int(os.environ.get("QC_EMBEDDING_CACHE_MEMORY_ENTRIES", 20000))
+
+
+def normalise_text(text):
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def text_key(model_name, text):
+    return hashlib.sha1(f"{model_name}\0{normalise_text(text)}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Two-level embedding cache: an in-process LRU in front of a SQLite table of
+    float16 vectors. The disk table is trimmed back to max_disk_entries by
+    evicting the least recently used rows.
+    """
+
+    def __init__(self, path=CACHE_PATH, max_disk_entries=MAX_DISK_ENTRIES, max_memory_entries=MAX_MEMORY_ENTRIES):
+        self.path = path
+        self.max_disk_entries = max_disk_entries
+        self.max_memory_entries = max_memory_entries
+        self.memory = OrderedDict()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "write_errors": 0}
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # Workers share the file, so wait out another writer's lock like slide_cache does
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, dim INTEGER NOT NULL, vec BLOB NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)")
+        self._db.commit()
+
+    def _remember(self, key, vec):
+        self.memory[key] = vec
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_memory_entries:
+            self.memory.popitem(last=False)
+
+    def get_many(self, keys):
+        """Returns {key: float32 vector} for every key found in memory or on disk."""
+        found = {}
+        with self._lock:
+            missing = []
+            for key in keys:
+                vec = self.memory.get(key)
+                if vec is None:
+                    missing.append(key)
+                else:
+                    self.memory.move_to_end(key)
+                    found[key] = vec
+                    self.stats["memory_hits"] += 1
+
+            now = time.time()
+            try:
+                for start in range(0, len(missing), 500):
+                    chunk = missing[start:start + 500]
+                    placeholders = ",".join("?" * len(chunk))
+                    rows = self._db.execute(
+                        f"SELECT key, dim, vec FROM embeddings WHERE key IN ({placeholders})", chunk
+                    ).fetchall()
+                    for key, dim, blob in rows:
+                        vec = np.frombuffer(blob, dtype=np.float16, count=dim).astype(np.float32)
+                        found[key] = vec
+                        self._remember(key, vec)
+                    self.stats["disk_hits"] += len(rows)
+                    if rows:
+                        self._db.executemany(
+                            "UPDATE embeddings SET last_used = ? WHERE key = ?", [(now, row[0]) for row in rows]
+                        )
+                self._db.commit()
+            except sqlite3.Error as e:
+                # Whatever was not read yet is a miss; the texts are simply encoded again
+                self._db.rollback()
+                print(f"[Embeddings] Cache read failed, treating the rest as misses: {e}")
+            self.stats["misses"] += len(set(keys) - found.keys())
+        return found
+
+    def put_many(self, items):
+        """Stores (key, vector) pairs and trims the disk table to its size bound."""
+        now = time.time()
+        with self._lock:
+            rows = []
+            for key, vec in items:
+                vec = np.asarray(vec, dtype=np.float32)
+                self._remember(key, vec)
+                rows.append((key, vec.shape[0], vec.astype(np.float16).tobytes(), now))
+            try:
+                self._db.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?)", rows)
+                self._evict()
+                self._db.commit()
+            except sqlite3.Error as e:
+                # Not stored on disk: the vectors stay in memory and later runs recompute them
+                self._db.rollback()
+                self.stats["write_errors"] += 1
+                print(f"[Embeddings] Could not write {len(rows)} vector(s) to the cache: {e}")
+
+    def _evict(self):
+        (count,) = self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        excess = count - self.max_disk_entries
+        if excess > 0:
+            self._db.execute(
+                "DELETE FROM embeddings WHERE key IN "
+                "(SELECT key FROM embeddings ORDER BY last_used ASC LIMIT ?)", (excess,)
+            )
+            self.stats["evictions"] += excess
+
+    def clear(self):
+        with self._lock:
+            self.memory.clear()
+            self._db.execute("DELETE FROM embeddings")
+            self._db.commit()
+
+    def snapshot(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats["memory_entries"] = len(self.memory)
+            stats["disk_entries"] = self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        return stats
+
+
+class CachedEncoder:
+    """
+    Drop-in stand-in for SentenceTransformer.encode that only runs the model
+    on texts the cache has not seen before.
+    """
+
+    def __init__(self, model, cache, model_name):
+        self.model = model
+        self.cache = cache
+        self.model_name = model_name
+
+    def encode(self, sentences, batch_size=32, convert_to_numpy=True, convert_to_tensor=False,
+               normalize_embeddings=False, show_progress_bar=False, **kwargs):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        keys = [text_key(self.model_name, text) for text in texts]
+
+        found = self.cache.get_many(list(dict.fromkeys(keys)))
+        pending = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in pending:
+                pending[key] = text
+        count("embedding_cache_hits", len(texts) - len(pending))
+        count("embedding_model_texts", len(pending))
+        if pending:
+            computed = self.model.encode(
+                list(pending.values()), batch_size=batch_size, convert_to_numpy=True,
+                show_progress_bar=show_progress_bar, **kwargs
+            )
+            new_items = list(zip(pending.keys(), np.asarray(computed, dtype=np.float32)))
+            self.cache.put_many(new_items)
+            found.update(new_items)
+
+        if texts:
+            embeddings = np.stack([found[key] for key in keys])
+        else:
+            embeddings = np.zeros((0, 0), dtype=np.float32)
+        if normalize_embeddings and len(texts):
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings = embeddings / np.where(norms == 0, 1, norms)
+        if single:
+            embeddings = embeddings[0]
+        if convert_to_tensor:
+            import torch
+            return torch.from_numpy(np.ascontiguousarray(embeddings))
+        return embeddings
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_embedding_cache():
+    """Process-wide cache shared by every chunking module."""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = EmbeddingCache()
+        return _shared_cache
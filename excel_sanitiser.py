@@ -0,0 +1,42 @@
+import re
+import pandas as pd
+
+# Characters an XLSX cell cannot hold: C0 controls other than tab/LF/CR,
+# lone surrogates and the U+FFFE/U+FFFF non-characters. Everything else,
+# accents, dashes and curly quotes included, is valid and is kept.
+ILLEGAL_XLSX_CHARS_RE = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ud800-\udfff\ufffe\uffff]")
+
+
+def clean_excel_text(text):
+    if not isinstance(text, str):
+        return text
+    return ILLEGAL_XLSX_CHARS_RE.sub("", text)
+
+
+def clean_excel_series(series):
+    """Strips illegal characters from the string cells of a column; other cells are untouched."""
+    if series.dtype != object and not pd.api.types.is_string_dtype(series):
+        return series
+    try:
+        dirty = series.str.contains(ILLEGAL_XLSX_CHARS_RE, na=False)
+    except AttributeError:
+        # Object column with no strings in it
+        return series
+    if not dirty.any():
+        return series
+    cleaned = series.copy()
+    cleaned[dirty] = series[dirty].str.replace(ILLEGAL_XLSX_CHARS_RE, "", regex=True)
+    return cleaned
+
+
+def clean_excel_frame(df):
+    """Column-wise sanitiser for every result frame before it is written to the report."""
+    cleaned = None
+    for position in range(df.shape[1]):
+        column = df.iloc[:, position]
+        result = clean_excel_series(column)
+        if result is not column:
+            if cleaned is None:
+                cleaned = df.copy()
+            cleaned.isetitem(position, result)
+    return df if cleaned is None else cleaned
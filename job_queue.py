@@ -0,0 +1,269 @@
+import os
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from contextlib import contextmanager
+
+JOB_DB_PATH = os.environ.get("QC_JOB_DB", os.path.join("cache", "jobs.sqlite3"))
+# Decks processed at once by this process; 0 disables the background workers
+JOB_WORKERS = int(os.environ.get("QC_JOB_WORKERS", 2))
+POLL_SECONDS = 2.0
+# A running job's owner renews its lease every LEASE_SECONDS / 3; a job whose lease ran out
+# (its worker died) is requeued, and failed once it has been claimed MAX_ATTEMPTS times
+LEASE_SECONDS = float(os.environ.get("QC_JOB_LEASE_SECONDS", 60))
+MAX_ATTEMPTS = int(os.environ.get("QC_JOB_MAX_ATTEMPTS", 3))
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+JOB_COLUMNS = [
+    "id", "status", "stage", "progress", "path_a", "path_b", "work_dir", "output_path",
+    "error", "attempts", "created_at", "started_at", "finished_at", "owner", "lease_until", "profile",
+]
+# Columns added after the first release, created on stores that predate them
+ADDED_COLUMNS = {"owner": "TEXT", "lease_until": "REAL", "profile": "TEXT"}
+
+
+class JobStore:
+    """
+    Job state in a local SQLite file, so queued and finished jobs outlive the
+    process. Every call opens its own connection, which keeps it safe to use
+    from the request threads and the worker threads alike.
+    """
+
+    def __init__(self, path=JOB_DB_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, status TEXT NOT NULL, stage TEXT, progress REAL NOT NULL DEFAULT 0, "
+                "path_a TEXT NOT NULL, path_b TEXT NOT NULL, work_dir TEXT NOT NULL, output_path TEXT NOT NULL, "
+                "error TEXT, attempts INTEGER NOT NULL DEFAULT 0, "
+                "created_at REAL NOT NULL, started_at REAL, finished_at REAL, owner TEXT, lease_until REAL, profile TEXT)"
+            )
+            existing = {row[1] for row in db.execute("PRAGMA table_info(jobs)")}
+            for column, column_type in ADDED_COLUMNS.items():
+                if column not in existing:
+                    db.execute(f"ALTER TABLE jobs ADD COLUMN {column} {column_type}")
+            db.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+
+    @contextmanager
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield db
+        finally:
+            db.close()
+
+    def add(self, job_id, path_a, path_b, work_dir, output_path, profile=None):
+        with self._connect() as db:
+            db.execute(
+                "INSERT INTO jobs (id, status, path_a, path_b, work_dir, output_path, profile, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, QUEUED, path_a, path_b, work_dir, output_path, profile, time.time()),
+            )
+
+    def get(self, job_id):
+        with self._connect() as db:
+            row = db.execute(f"SELECT {', '.join(JOB_COLUMNS)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(zip(JOB_COLUMNS, row)) if row else None
+
+    def claim(self, owner, lease_seconds=LEASE_SECONDS, max_attempts=MAX_ATTEMPTS):
+        """
+        Atomically moves the oldest queued job to running under owner's lease
+        and returns it, or None. Expired leases are recovered first.
+        """
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                self._recover_expired(db, now, max_attempts)
+                row = db.execute(
+                    "SELECT id FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (QUEUED,)
+                ).fetchone()
+                if row is not None:
+                    db.execute(
+                        "UPDATE jobs SET status = ?, stage = NULL, progress = 0, attempts = attempts + 1, "
+                        "started_at = ?, owner = ?, lease_until = ? WHERE id = ?",
+                        (RUNNING, now, owner, now + lease_seconds, row[0]),
+                    )
+                db.execute("COMMIT")
+            except Exception:
+                db.execute("ROLLBACK")
+                raise
+        return self.get(row[0]) if row else None
+
+    # Updates from an owner whose lease was taken over are ignored
+    def update_progress(self, job_id, stage, progress, owner):
+        with self._connect() as db:
+            db.execute(
+                "UPDATE jobs SET stage = ?, progress = ? WHERE id = ? AND owner = ? AND status = ?",
+                (stage, progress, job_id, owner, RUNNING),
+            )
+
+    def finish(self, job_id, owner, error=None):
+        with self._connect() as db:
+            db.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = ?, lease_until = NULL, "
+                "progress = CASE WHEN ? IS NULL THEN 1 ELSE progress END "
+                "WHERE id = ? AND owner = ? AND status = ?",
+                (FAILED if error else DONE, error, time.time(), error, job_id, owner, RUNNING),
+            )
+
+    def renew_leases(self, owner, lease_seconds=LEASE_SECONDS):
+        """Extends the lease on every job owner is running; the owner's heartbeat."""
+        with self._connect() as db:
+            return db.execute(
+                "UPDATE jobs SET lease_until = ? WHERE owner = ? AND status = ?",
+                (time.time() + lease_seconds, owner, RUNNING),
+            ).rowcount
+
+    @staticmethod
+    def _recover_expired(db, now, max_attempts):
+        # A running job with no lease comes from a store written before leases existed
+        expired = "status = ? AND (lease_until IS NULL OR lease_until < ?)"
+        failed = db.execute(
+            f"UPDATE jobs SET status = ?, error = ?, finished_at = ?, lease_until = NULL "
+            f"WHERE {expired} AND attempts >= ?",
+            (FAILED, f"Worker stopped during the job {max_attempts} time(s); giving up", now, RUNNING, now, max_attempts),
+        ).rowcount
+        requeued = db.execute(
+            f"UPDATE jobs SET status = ?, stage = NULL, progress = 0, owner = NULL, lease_until = NULL WHERE {expired}",
+            (QUEUED, RUNNING, now),
+        ).rowcount
+        return requeued, failed
+
+    def recover_expired(self, max_attempts=MAX_ATTEMPTS):
+        """
+        Jobs whose worker died (lease expired) go back in the queue, or are
+        failed after max_attempts claims. Jobs still leased by a live worker,
+        in this process or another, are left alone. Returns (requeued, failed).
+        """
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                counts = self._recover_expired(db, time.time(), max_attempts)
+                db.execute("COMMIT")
+            except Exception:
+                db.execute("ROLLBACK")
+                raise
+        return counts
+
+    def queue_position(self, job_id):
+        with self._connect() as db:
+            (ahead,) = db.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = ? AND created_at < "
+                "(SELECT created_at FROM jobs WHERE id = ?)", (QUEUED, job_id)
+            ).fetchone()
+        return ahead
+
+    def counts(self):
+        with self._connect() as db:
+            return dict(db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+
+
+class JobQueue:
+    """
+    A fixed number of worker threads that claim jobs from the store and run
+    them one at a time each. New submissions wake an idle worker straight
+    away; otherwise workers poll, which also picks up jobs queued by another
+    process sharing the same store.
+    """
+
+    def __init__(self, runner, store=None, workers=JOB_WORKERS):
+        self.runner = runner
+        self.store = store or JobStore()
+        self.workers = workers
+        self._wake = threading.Condition()
+        self._threads = []
+        self._stopping = False
+        self._stopped = threading.Event()
+        self.owner = None
+
+    def start(self):
+        if self._threads or not self.workers:
+            return self
+        # Made here rather than at import, so forked server workers each get their own;
+        # the random part keeps a reused pid from matching an old owner
+        self.owner = f"{os.getpid()}:{uuid.uuid4().hex[:12]}"
+        requeued, failed = self.store.recover_expired()
+        if requeued or failed:
+            print(f"[Jobs] Requeued {requeued} and failed {failed} job(s) left by a stopped worker")
+        for n in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"qc-job-worker-{n}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        heartbeat = threading.Thread(target=self._heartbeat, name="qc-job-heartbeat", daemon=True)
+        heartbeat.start()
+        self._threads.append(heartbeat)
+        return self
+
+    def stop(self, timeout=None):
+        self._stopped.set()
+        with self._wake:
+            self._stopping = True
+            self._wake.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def submit(self, path_a, path_b, work_dir, output_path, job_id=None, profile=None):
+        """Queues a job; profile names its style profile (None for the server default)."""
+        job_id = job_id or uuid.uuid4().hex
+        self.store.add(job_id, path_a, path_b, work_dir, output_path, profile)
+        with self._wake:
+            self._wake.notify()
+        return job_id
+
+    def status(self, job_id):
+        job = self.store.get(job_id)
+        if job and job["status"] == QUEUED:
+            job["queue_position"] = self.store.queue_position(job_id)
+        return job
+
+    def is_active(self, job_id):
+        job = self.store.get(job_id)
+        return job is not None and job["status"] in (QUEUED, RUNNING)
+
+    def _work(self):
+        while True:
+            with self._wake:
+                if self._stopping:
+                    return
+            job = self.store.claim(self.owner)
+            if job is None:
+                with self._wake:
+                    if not self._stopping:
+                        self._wake.wait(POLL_SECONDS)
+                continue
+            self.run_job(job)
+
+    def _heartbeat(self):
+        while not self._stopped.wait(LEASE_SECONDS / 3):
+            try:
+                self.store.renew_leases(self.owner)
+            except sqlite3.Error as e:
+                print(f"[Jobs] Could not renew job leases: {e}")
+
+    def run_job(self, job):
+        job_id = job["id"]
+
+        def progress(stage, fraction):
+            self.store.update_progress(job_id, stage, fraction, self.owner)
+
+        try:
+            self.runner(
+                job["path_a"], job["path_b"], job["output_path"], work_dir=job["work_dir"], progress=progress,
+                profile=job["profile"],
+            )
+        except Exception as e:
+            traceback.print_exc()
+            self.store.finish(job_id, self.owner, error=f"{type(e).__name__}: {e}")
+        else:
+            self.store.finish(job_id, self.owner)
@@ -0,0 +1,181 @@
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+import pandas as pd
+
+# Set QC_RUN_METRICS_SHEET=1 to append a "Run Metrics" sheet to every report
+RUN_METRICS_SHEET = os.environ.get("QC_RUN_METRICS_SHEET", "0") == "1"
+
+
+# === MEMORY ===
+def peak_rss_bytes():
+    """High-water mark of the process's resident memory, or None where it cannot be read."""
+    try:
+        import resource
+    except ImportError:
+        resource = None
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and in kilobytes on Linux and the BSDs
+        return peak if sys.platform == "darwin" else peak * 1024
+    # Windows has no resource module; psutil reports the peak working set there
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return getattr(psutil.Process().memory_info(), "peak_wset", None)
+
+
+# === PER-RUN METRICS ===
+class RunMetrics:
+    """
+    Timings and counters for one pipeline run. Stages are measured on the
+    thread that runs them; code deeper down (model inference, matching)
+    reports into the run through the thread-local current().
+    """
+
+    def __init__(self, label=""):
+        self.label = label
+        self.stages = []  # dicts in completion order
+        self.counts = defaultdict(int)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def measure(self, stage):
+        previous = getattr(_current, "run", None)
+        _current.run = self
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        error = None
+        try:
+            yield self
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            record = {
+                "stage": stage,
+                "wall_seconds": time.perf_counter() - wall_start,
+                # Thread CPU time; work handed to torch's own threads is not included
+                "cpu_seconds": time.thread_time() - cpu_start,
+                "peak_rss_bytes": peak_rss_bytes(),
+                "error": error,
+            }
+            with self._lock:
+                self.stages.append(record)
+            registry.observe(record)
+            _current.run = previous
+
+    def count(self, name, value=1):
+        with self._lock:
+            self.counts[name] += value
+        registry.count(name, value)
+
+    def to_frame(self):
+        with self._lock:
+            rows = [
+                {
+                    "Stage": record["stage"],
+                    "Wall (s)": round(record["wall_seconds"], 4),
+                    "CPU (s)": round(record["cpu_seconds"], 4),
+                    "Peak RSS (MB)": round(record["peak_rss_bytes"] / 1024 ** 2, 1) if record["peak_rss_bytes"] else None,
+                    "Error": record["error"] or "",
+                }
+                for record in self.stages
+            ]
+            # Counters (slides, shapes, embedding batches...) follow the stages, one per row
+            rows += [{"Stage": name, "Count": value} for name, value in sorted(self.counts.items())]
+        return pd.DataFrame(rows, columns=["Stage", "Wall (s)", "CPU (s)", "Peak RSS (MB)", "Count", "Error"])
+
+
+_current = threading.local()
+
+
+def current():
+    return getattr(_current, "run", None)
+
+
+@contextmanager
+def measure(stage):
+    """Measures a sub-stage of whatever run is active on this thread; a no-op outside a run."""
+    run = current()
+    if run is None:
+        yield None
+        return
+    with run.measure(stage):
+        yield run
+
+
+def count(name, value=1):
+    run = current()
+    if run is not None:
+        run.count(name, value)
+
+
+# === PROCESS-WIDE REGISTRY ===
+class MetricsRegistry:
+    """Totals across every run in this process, rendered in the Prometheus text format."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stage_wall = defaultdict(float)
+        self.stage_cpu = defaultdict(float)
+        self.stage_runs = defaultdict(int)
+        self.stage_errors = defaultdict(int)
+        self.stage_last = {}
+        self.counters = defaultdict(int)
+        self.peak_rss = 0
+
+    def observe(self, record):
+        stage = record["stage"]
+        with self._lock:
+            self.stage_wall[stage] += record["wall_seconds"]
+            self.stage_cpu[stage] += record["cpu_seconds"]
+            self.stage_runs[stage] += 1
+            self.stage_last[stage] = record["wall_seconds"]
+            if record["error"]:
+                self.stage_errors[stage] += 1
+            self.peak_rss = max(self.peak_rss, record["peak_rss_bytes"] or 0)
+
+    def count(self, name, value=1):
+        with self._lock:
+            self.counters[name] += value
+
+    def render(self, gauges=None):
+        """gauges is an optional {name: value} of point-in-time values supplied by the caller."""
+        lines = []
+
+        def family(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                label_text = ",".join(f'{key}="{val}"' for key, val in labels.items())
+                value = int(value) if float(value).is_integer() else float(value)
+                lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+
+        with self._lock:
+            stages = sorted(self.stage_runs)
+            family("qc_stage_wall_seconds_total", "counter", "Wall-clock seconds spent in each QC stage.",
+                   [({"stage": s}, self.stage_wall[s]) for s in stages])
+            family("qc_stage_cpu_seconds_total", "counter", "Thread CPU seconds spent in each QC stage.",
+                   [({"stage": s}, self.stage_cpu[s]) for s in stages])
+            family("qc_stage_runs_total", "counter", "Times each QC stage has run.",
+                   [({"stage": s}, self.stage_runs[s]) for s in stages])
+            family("qc_stage_errors_total", "counter", "Times each QC stage has failed.",
+                   [({"stage": s}, self.stage_errors[s]) for s in stages])
+            family("qc_stage_last_wall_seconds", "gauge", "Wall-clock seconds of the latest run of each stage.",
+                   [({"stage": s}, self.stage_last[s]) for s in stages])
+            for name in sorted(self.counters):
+                metric = f"qc_{name}_total"
+                family(metric, "counter", f"Total {name.replace('_', ' ')}.", [({}, self.counters[name])])
+            family("qc_process_peak_rss_bytes", "gauge", "Peak resident memory of this process.",
+                   [({}, max(self.peak_rss, peak_rss_bytes() or 0))])
+        for name, value in sorted((gauges or {}).items()):
+            family(f"qc_{name}", "gauge", f"Current {name.replace('_', ' ')}.", [({}, value)])
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
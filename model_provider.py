@@ -0,0 +1,132 @@
+import os
+import sys
+import threading
+import numpy as np
+from embedding_cache import CachedEncoder, get_embedding_cache
+from vo_matcher import PARTIAL_THRESHOLD, STRONG_THRESHOLD, encode_texts
+
+MODEL_NAME = 'paraphrase-MiniLM-L6-v2'
+# "float" runs the stock model; "int8" applies dynamic int8 quantisation to its Linear layers
+MODEL_BACKEND = os.environ.get("QC_MODEL_BACKEND", "float")
+# Intra-op threads for CPU inference; 0 leaves torch's default
+MODEL_THREADS = int(os.environ.get("QC_MODEL_THREADS", 0))
+
+_model = None
+_model_lock = threading.Lock()
+
+
+def _cache_namespace(backend):
+    # Quantised embeddings differ slightly, so they never share cache rows with float ones
+    return MODEL_NAME if backend == "float" else f"{MODEL_NAME}:{backend}"
+
+
+def quantize_model(model):
+    import torch
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def build_model(backend=MODEL_BACKEND, threads=MODEL_THREADS):
+    # Imported here so that importing a checker never pays for torch
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    if backend not in ("float", "int8"):
+        raise ValueError(f"Unknown model backend: {backend}")
+    if threads:
+        torch.set_num_threads(threads)
+    model = SentenceTransformer(MODEL_NAME, device="cpu")
+    if backend == "int8":
+        model = quantize_model(model)
+    return model
+
+
+def get_model():
+    """
+    Returns the process-wide similarity model, building it on first use.
+    The model is wrapped in the shared embedding cache.
+    """
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                _model = CachedEncoder(build_model(), get_embedding_cache(), _cache_namespace(MODEL_BACKEND))
+    return _model
+
+
+def set_model(model, cached=True, backend=MODEL_BACKEND):
+    """Installs a preloaded or stub model, e.g. for batch workers and benchmarks."""
+    global _model
+    with _model_lock:
+        _model = CachedEncoder(model, get_embedding_cache(), _cache_namespace(backend)) if cached else model
+
+
+def warm_up():
+    """Loads the model and runs one forward pass so the first request is not slow."""
+    model = get_model()
+    # Bypass the cache so a real forward pass happens even when "warm up" is cached
+    getattr(model, "model", model).encode(["warm up"], show_progress_bar=False)
+    return True
+
+
+def is_ready():
+    return _model is not None
+
+
+# === QUANTISATION ACCURACY CHECK ===
+def score_band(score):
+    if score >= STRONG_THRESHOLD:
+        return "Strong"
+    if score >= PARTIAL_THRESHOLD:
+        return "Partial"
+    return "Missing"
+
+
+def compare_backends(slides, float_model=None, int8_model=None):
+    """
+    Scores every (point, VO line) pair of the given (points, vo_lines) slides
+    with both backends, uncached, and reports how often the int8 score lands
+    in a different Strong/Partial/Missing band than the float score.
+    """
+    float_model = float_model or build_model("float")
+    int8_model = int8_model or build_model("int8")
+    texts = [text for points, vo_lines in slides for text in (*points, *vo_lines)]
+    float_embs = encode_texts(float_model, texts)
+    int8_embs = encode_texts(int8_model, texts)
+
+    diffs = []
+    disagreements = []
+    for points, vo_lines in slides:
+        for point in points:
+            for vo_line in vo_lines:
+                float_score = float(float_embs[point] @ float_embs[vo_line])
+                int8_score = float(int8_embs[point] @ int8_embs[vo_line])
+                diffs.append(abs(float_score - int8_score))
+                if score_band(float_score) != score_band(int8_score):
+                    disagreements.append((point, vo_line, round(float_score, 3), round(int8_score, 3)))
+
+    pairs = len(diffs)
+    return {
+        "pairs": pairs,
+        "band_agreement": 1 - len(disagreements) / pairs if pairs else 1.0,
+        "max_score_diff": max(diffs, default=0.0),
+        "mean_score_diff": float(np.mean(diffs)) if pairs else 0.0,
+        "disagreements": disagreements,
+    }
+
+
+if __name__ == "__main__":
+    # python model_provider.py deck.pptx -> int8 vs float agreement on that deck's points and VO
+    from deck_model import load_deck
+    from chunking_by_animation_win32 import get_animated_slide_points, get_slide_points, parse_vo_lines
+
+    deck = load_deck(sys.argv[1])
+    animated_points = get_animated_slide_points(deck)
+    sample = [
+        (get_slide_points(slide, animated_points)[0], parse_vo_lines(slide.notes_text))
+        for slide in deck.slides
+    ]
+    report = compare_backends(sample)
+    print(f"pairs={report['pairs']} band_agreement={report['band_agreement']:.4f} "
+          f"max_diff={report['max_score_diff']:.4f} mean_diff={report['mean_score_diff']:.4f}")
+    for point, vo_line, float_score, int8_score in report["disagreements"]:
+        print(f"  {float_score} -> {int8_score}: {point!r} / {vo_line!r}")
@@ -0,0 +1,182 @@
+import math
+import re
+from collections import Counter
+
+WORD_RE = re.compile(r'\b\w+\b')
+
+# Longest run of File B slides one File A note may be spread over
+MAX_SEGMENT = 8
+# How far (in B slides) the alignment may drift from the proportional diagonal
+BAND_WIDTH = 40
+# Small structural costs so that, at equal word cost, tight one-to-one mappings win:
+# leaving an unrelated B note unmatched must cost less than absorbing it into a run
+SPLIT_PENALTY = 0.5
+SKIP_PENALTY = 0.25
+
+
+class NoteTokens:
+    """A note tokenised once: its words in order, their counts and their set."""
+
+    def __init__(self, slide, text):
+        self.slide = slide
+        self.text = text
+        self.words = WORD_RE.findall(text.lower())
+        self.counts = Counter(self.words)
+        self.vocab = set(self.counts)
+
+
+def tokenise_notes(notes):
+    return [NoteTokens(slide, text) for slide, text in notes]
+
+
+def segment_words(segment):
+    vocab = set()
+    for note in segment:
+        vocab |= note.vocab
+    return vocab
+
+
+def diff_words(note, segment):
+    """(missing, extra) word lists, with the same semantics as compare_words in both directions."""
+    vocab = segment_words(segment)
+    missing = [word for word in note.words if word not in vocab]
+    extra = [word for b in segment for word in b.words if word not in note.vocab]
+    return missing, extra
+
+
+# === GREEDY (LEGACY) ===
+def align_greedy(tokens_a, tokens_b):
+    """
+    The original mapping: each A note takes the following B notes until every
+    one of its words has been seen. Coverage is tracked with a shrinking set
+    instead of re-scanning a growing word list.
+    """
+    mapping = []
+    b_index = 0
+    for note in tokens_a:
+        remaining = set(note.vocab)
+        start = b_index
+        for j in range(b_index, len(tokens_b)):
+            remaining -= tokens_b[j].vocab
+            if not remaining:
+                b_index = j + 1
+                break
+        else:
+            # Never fully covered: like before, the note absorbs the rest of File B
+            mapping.append((start, len(tokens_b)))
+            continue
+        mapping.append((start, b_index))
+    return mapping
+
+
+# === MONOTONE ALIGNMENT ===
+def _band(i, n, m, width):
+    centre = round(i * m / n) if n else 0
+    return max(0, centre - width), min(m, centre + width)
+
+
+def align_dp(tokens_a, tokens_b, max_segment=MAX_SEGMENT, band_width=BAND_WIDTH):
+    """
+    Monotone alignment of A notes onto consecutive runs of B notes. Each A note
+    takes a run of 0..max_segment B notes, and B notes may also be skipped.
+    The cost is missing + extra words plus small split/skip penalties, and the
+    search is limited to a band around the diagonal so it stays close to linear
+    in the number of slides. The band grows with the B-per-A slide ratio, so
+    every B note stays reachable when File B is much longer than File A; if
+    the end is still out of reach, the greedy mapping is used instead.
+    Returns one (start, end) B range per A note.
+    """
+    n, m = len(tokens_a), len(tokens_b)
+    if not n:
+        return []
+    width = max(band_width, max_segment, 2 * math.ceil(m / n) + max_segment)
+    bands = [_band(i, n, m, width) for i in range(n + 1)]
+    skip_cost = [len(b.words) + SKIP_PENALTY for b in tokens_b]
+
+    inf = float("inf")
+    cost = [dict() for _ in range(n + 1)]
+    back = [dict() for _ in range(n + 1)]
+    cost[0][0] = 0.0
+
+    for i in range(n + 1):
+        low, high = bands[i]
+        row = cost[i]
+        # (shared words, extra word count) of each B note against A note i, worked out once per pair
+        overlap = {}
+        for j in range(low, high + 1):
+            here = row.get(j, inf)
+            if here == inf:
+                continue
+
+            # Leave B note j unmatched
+            if j < m and j + 1 <= high and here + skip_cost[j] < row.get(j + 1, inf):
+                row[j + 1] = here + skip_cost[j]
+                back[i][j + 1] = ("skip", j)
+
+            if i == n:
+                continue
+            note = tokens_a[i]
+            next_low, next_high = bands[i + 1]
+            next_row = cost[i + 1]
+
+            # Map A note i onto B[j:k]; coverage grows incrementally as k extends
+            missing = len(note.words)
+            extra = 0
+            covered = set()
+            for k in range(j, min(m, j + max_segment) + 1):
+                if k > j:
+                    pair = overlap.get(k - 1)
+                    if pair is None:
+                        b = tokens_b[k - 1]
+                        shared = b.vocab & note.vocab
+                        pair = overlap[k - 1] = (shared, len(b.words) - sum(b.counts[word] for word in shared))
+                    shared, b_extra = pair
+                    newly = shared - covered
+                    if newly:
+                        covered |= newly
+                        missing -= sum(note.counts[word] for word in newly)
+                    extra += b_extra
+                if k < next_low or k > next_high:
+                    continue
+                total = here + missing + extra + SPLIT_PENALTY * max(0, k - j - 1)
+                if total < next_row.get(k, inf):
+                    next_row[k] = total
+                    back[i + 1][k] = ("map", j)
+
+    if m not in back[n]:
+        print(f"[Notes] Alignment band could not reach the end of File B ({n} vs {m} notes); using greedy")
+        return align_greedy(tokens_a, tokens_b)
+
+    mapping = []
+    i, j = n, m
+    while i > 0 or j > 0:
+        step, prev = back[i][j]
+        if step == "map":
+            mapping.append((prev, j))
+            i -= 1
+        j = prev
+    mapping.reverse()
+    return mapping
+
+
+ALIGNERS = {
+    "dp": align_dp,
+    "greedy": align_greedy,
+}
+
+
+def align_notes(notes_a, notes_b, method="dp"):
+    """
+    notes_a / notes_b are (slide, text) lists. Returns one row per A note:
+    (slide_a, text_a, matched B slides, missing words, extra words).
+    """
+    tokens_a = tokenise_notes(notes_a)
+    tokens_b = tokenise_notes(notes_b)
+    mapping = ALIGNERS[method](tokens_a, tokens_b)
+
+    rows = []
+    for note, (start, end) in zip(tokens_a, mapping):
+        segment = tokens_b[start:end]
+        missing, extra = diff_words(note, segment)
+        rows.append((note.slide, note.text, [b.slide for b in segment], missing, extra))
+    return rows
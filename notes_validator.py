@@ -1,13 +1,26 @@
-import re
 import os
+import re
 import pandas as pd
-from pptx import Presentation
 from pptx.enum.shapes import MSO_SHAPE_TYPE
 from pptx.dml.color import RGBColor
+from deck_model import as_deck
+from excel_sanitiser import clean_excel_text
+from notes_alignment import align_notes
+from style_profiles import get_profile
+from style_resolver import StyleResolver
 
 # === CONFIG ===
-VALID_FONTS = ["HelveticaNowDisplay Black", "Queens Medium", "HelveticaNowDisplay Medium", "Cambria Math", "Consolas"]
-VALID_COLOURS = {"#0045C0", "#27BDBB", "#FDD900", "#FF5C00", "#117673", "#CCC1FF", "#3B4096", "#F26722", "#B9CB00", "#000000", "#FFFFFF"}
+# "dp" (monotone slide alignment) or "greedy" (the original first-cover walk)
+NOTES_ALIGNMENT = os.environ.get("QC_NOTES_ALIGNMENT", "dp")
+SHAPE_COLUMNS = [
+    "File Name", "Slide Number", "Shape Name / Table Cell", "Shape Type", "Font Name", "Font Size",
+    "Font Color Hex", "Font Color Name", "Fill Color Hex", "Fill Color Name", "Line Color Hex",
+    "Line Color Name", "Extracted Text",
+]
+RUN_COLUMNS = [
+    "Slide Number", "Shape Name / Table Cell", "Paragraph", "Run", "Font Name", "Font Size",
+    "Font Color Hex", "Font Source", "Extracted Text",
+]
 
 # === CLEANERS ===
 def remove_instructions(text):
@@ -24,7 +37,7 @@ def clean_text_for_excel(text):
     if not isinstance(text, str):
         return text
     text = text.replace("’", "'")  # Normalize curly apostrophes
-    return ''.join([c for c in text if ord(c) in range(32, 127) or ord(c) in (9, 10, 13)])
+    return clean_excel_text(text)
 
 # === COLOR HELPERS ===
 def rgb_to_hex(rgb):
@@ -32,21 +45,24 @@ def rgb_to_hex(rgb):
         return "", ""
     r, g, b = rgb[0], rgb[1], rgb[2]
     hex_color = "#{:02X}{:02X}{:02X}".format(r, g, b)
-    name = {
-        "#000000": "Black", "#FFFFFF": "White", "#F26722": "Orange",
-        "#0045C0": "Blue", "#27BDBB": "Turquoise", "#FDD900": "Yellow",
-        "#117673": "Teal", "#CCC1FF": "Lavender", "#3B4096": "Indigo",
-        "#B9CB00": "Lime"
-    }.get(hex_color.upper(), "Custom")
-    return hex_color, name
+    return hex_to_name(hex_color)
+
+def hex_to_name(hex_color):
+    # Names from the default style profile; QC runs rename colours with their own
+    # profile after the slide cache (report_writer.apply_colour_names)
+    return (hex_color, get_profile().colour_name(hex_color)) if hex_color else ("", "")
 
 # === SHAPE EXTRACTOR ===
-def extract_shape_info(shape, slide_num, file_name):
+def extract_shape_info(shape, slide_num, file_name, resolver=None, run_rows=None):
+    # Fonts and colours are resolved through the layout, master and theme; pass one
+    # resolver per deck so those levels are only read once. run_rows, if given,
+    # collects one row per run (adjacent runs with the same style are merged).
+    resolver = resolver or StyleResolver()
     infos = []
 
     if shape.shape_type == MSO_SHAPE_TYPE.GROUP:
         for sub in shape.shapes:
-            infos.extend(extract_shape_info(sub, slide_num, file_name))
+            infos.extend(extract_shape_info(sub, slide_num, file_name, resolver, run_rows))
         return infos
 
     font_name = font_size = text = ""
@@ -59,34 +75,34 @@ def extract_shape_info(shape, slide_num, file_name):
             text = clean_text_for_excel(raw_text)
 
             try:
-                # Fallback-safe loop: get first valid font name/size
-                for para in tf.paragraphs:
-                    for run in para.runs:
-                        font = run.font
-                        font_name = font.name if font.name else "No Font"  # If no font is found, set "No Font"
-                        font_size = font.size.pt if font.size else "No Size"  # If no font size, set "No Size"
-
-                        if font.color and hasattr(font.color, 'rgb') and font.color.rgb:
-                            font_hex, font_name_color = rgb_to_hex(font.color.rgb)
-
-                        if font_name and font_size:
-                            break
-                    if font_name and font_size:
-                        break
+                runs = resolver.shape_runs(shape)
+                if runs:
+                    # The shape row shows its first run's style; every run is in run_rows
+                    first = runs[0]
+                    font_name = first.font or "No Font"
+                    font_size = first.size
+                    font_hex, font_name_color = hex_to_name(first.colour)
+                if run_rows is not None:
+                    shape_name = shape.name
+                    run_rows.extend({
+                        "Slide Number": slide_num,
+                        "Shape Name / Table Cell": shape_name,
+                        "Paragraph": run.paragraph,
+                        "Run": run.run,
+                        "Font Name": run.font,
+                        "Font Size": run.size,
+                        "Font Color Hex": run.colour,
+                        "Font Source": run.source,
+                        "Extracted Text": clean_text_for_excel(run.text),
+                    } for run in runs)
             except Exception as e:
                 print(f"Font extraction error in slide {slide_num}, shape {shape.name}: {e}")
 
     try:
-        if shape.fill and shape.fill.fore_color and hasattr(shape.fill.fore_color, 'rgb') and shape.fill.fore_color.rgb:
-            fill_hex, fill_name = rgb_to_hex(shape.fill.fore_color.rgb)
-    except:
-        pass
-
-    try:
-        if shape.line and shape.line.color and hasattr(shape.line.color, 'rgb') and shape.line.color.rgb:
-            line_hex, line_name = rgb_to_hex(shape.line.color.rgb)
-    except:
-        pass
+        fill_hex, fill_name = hex_to_name(resolver.shape_fill(shape))
+        line_hex, line_name = hex_to_name(resolver.shape_line(shape))
+    except Exception as e:
+        print(f"Colour extraction error in slide {slide_num}, shape {shape.name}: {e}")
 
     infos.append({
         "File Name": file_name,
@@ -107,14 +123,11 @@ def extract_shape_info(shape, slide_num, file_name):
     return infos
 
 # === EXTRACT NOTES ===
-def extract_notes(file_path):
-    prs = Presentation(file_path)
+def extract_notes(source):
+    deck = as_deck(source)
     notes = []
-    for i, slide in enumerate(prs.slides, 1):
-        note = ""
-        if slide.has_notes_slide and slide.notes_slide.notes_text_frame:
-            note = slide.notes_slide.notes_text_frame.text.strip()
-        notes.append((i, remove_instructions(note)))
+    for slide in deck.slides:
+        notes.append((slide.number, remove_instructions(slide.notes_text.strip())))
     return notes
 
 # === WORD COMPARISON ===
@@ -124,54 +137,62 @@ def compare_words(text_a, text_b):
     return [word for word in a_words if word not in b_words]
 
 # === SLIDE INFO EXTRACTOR ===
-def extract_ppt_data(ppt_path):
-    prs = Presentation(ppt_path)
-    file_name = os.path.basename(ppt_path)
+def extract_ppt_data(source, run_rows=None):
+    deck = as_deck(source)
+    resolver = StyleResolver()
     all_info = []
-    for idx, slide in enumerate(prs.slides, 1):
+    for slide in deck.slides:
         for shape in slide.shapes:
-            all_info.extend(extract_shape_info(shape, idx, file_name))
+            all_info.extend(extract_shape_info(shape, slide.number, deck.file_name, resolver, run_rows))
     return pd.DataFrame(all_info)
 
+def extract_ppt_styles(source):
+    """Shape rows and per-run style rows for a deck, from one pass."""
+    run_rows = []
+    shapes_df = extract_ppt_data(source, run_rows)
+    return shapes_df, run_styles_frame(pd.DataFrame(run_rows))
+
 # === MAIN VALIDATOR ===
-def run_notes_validation(path_a, path_b):
-    notes_a = extract_notes(path_a)
-    notes_b = extract_notes(path_b)
-    shapes_df = extract_ppt_data(path_b)
-    shapes_df["Font Size"] = pd.to_numeric(shapes_df["Font Size"], errors='coerce')
+def compare_notes(source_a, source_b, alignment=NOTES_ALIGNMENT):
+    """File A / File B notes frames and the slide-aligned word comparison."""
+    notes_a = extract_notes(source_a)
+    notes_b = extract_notes(source_b)
 
     df_notes_a = pd.DataFrame([{"Slide": s, "Note Text": t} for s, t in notes_a])
     df_notes_b = pd.DataFrame([{"Slide": s, "Note Text": t} for s, t in notes_b])
 
+    # Each note is tokenised once; "dp" aligns slides monotonically, "greedy" is the original walk
     comparison_rows = []
-    b_index = 0
-
-    for slide_a, note_a in notes_a:
-        matched_slides = []
-        combined_b = ""
-        a_words = re.findall(r'\b\w+\b', note_a.lower())
-        b_words_collected = []
-
-        for j in range(b_index, len(notes_b)):
-            slide_b, note_b = notes_b[j]
-            b_words = re.findall(r'\b\w+\b', note_b.lower())
-            b_words_collected.extend(b_words)
-            combined_b += " " + note_b
-            matched_slides.append(str(slide_b))
-            if all(word in b_words_collected for word in a_words):
-                b_index = j + 1
-                break
-
-        missing = compare_words(note_a, combined_b)
-        extra = compare_words(combined_b, note_a)
+    for slide_a, note_a, matched_slides, missing, extra in align_notes(notes_a, notes_b, alignment):
         comparison_rows.append({
             "File A Slide": slide_a,
             "File A Notes": note_a,
-            "Matched B Slides": ", ".join(matched_slides),
+            "Matched B Slides": ", ".join(str(slide_b) for slide_b in matched_slides),
             "Missing Words": " ".join(missing),
             "Extra Words": " ".join(extra),
             "Highlighted Notes": note_a
         })
 
-    df_cmp = pd.DataFrame(comparison_rows)
-    return df_notes_a, df_notes_b, df_cmp, shapes_df
+    return df_notes_a, df_notes_b, pd.DataFrame(comparison_rows)
+
+def quality_check_frame(shapes_df):
+    # Shape rows as the Quality Check sheet holds them; a run of slides with no shapes still gets the columns
+    if shapes_df.empty and "Font Size" not in shapes_df.columns:
+        shapes_df = shapes_df.reindex(columns=SHAPE_COLUMNS)
+    shapes_df["Font Size"] = pd.to_numeric(shapes_df["Font Size"], errors='coerce')
+    return shapes_df
+
+def run_styles_frame(runs_df):
+    if runs_df.empty and "Font Size" not in runs_df.columns:
+        runs_df = runs_df.reindex(columns=RUN_COLUMNS)
+    runs_df["Font Size"] = pd.to_numeric(runs_df["Font Size"], errors='coerce')
+    return runs_df
+
+def run_notes_validation(source_a, source_b, alignment=NOTES_ALIGNMENT, shapes_df=None):
+    # Paths or preloaded DeckModels; File B is parsed once for both notes and shapes.
+    # shapes_df may be passed in when File B's shape rows were already built (e.g. from the slide cache).
+    deck_b = as_deck(source_b)
+    df_notes_a, df_notes_b, df_cmp = compare_notes(source_a, deck_b, alignment)
+    if shapes_df is None:
+        shapes_df = extract_ppt_data(deck_b)
+    return df_notes_a, df_notes_b, df_cmp, quality_check_frame(shapes_df)
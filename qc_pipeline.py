@@ -0,0 +1,202 @@
+import os
+from ungroup_util import ungroup_shapes_in_ppt
+from deck_model import load_deck
+from animation_checker import run_animation_qc
+from chunking_by_animation_win32 import run_chunking_qc_with_animation
+from notes_validator import extract_ppt_styles, run_notes_validation
+from text_rules_validator import run_text_rules_validation
+from qc_points_generator import build_qc_points
+from report_writer import apply_colour_names, apply_font_fallbacks, fill_rules_for, write_report
+from excel_sanitiser import clean_excel_frame
+from stage_scheduler import Stage, StageScheduler
+from slide_cache import deck_fingerprints, run_incremental
+from model_provider import MODEL_BACKEND, MODEL_NAME
+from vo_matcher import PARTIAL_THRESHOLD, STRONG_THRESHOLD
+from metrics import RUN_METRICS_SHEET, RunMetrics, count, measure
+from results_store import HISTORY_ENABLED, export_results, new_run, record_run
+from style_profiles import get_profile
+
+# Chunking rows depend on the model and its bands as well as on the slide
+CHUNKING_CACHE_KEY = f"chunking:{MODEL_NAME}:{MODEL_BACKEND}:{STRONG_THRESHOLD}:{PARTIAL_THRESHOLD}"
+
+
+def report_filename(path_b):
+    return f"{os.path.splitext(os.path.basename(path_b))[0]}_QC_Report.xlsx"
+
+
+def _no_progress(stage, fraction):
+    pass
+
+
+def load_counted_deck(path, side):
+    # Counted per deck ("slides_a", "slides_b"...) so a run's slides are not the sum of both files
+    deck = load_deck(path)
+    count(f"slides_{side}", len(deck))
+    count(f"shapes_{side}", sum(len(slide.shapes) for slide in deck.slides))
+    return deck
+
+
+# === CHECKS ===
+# Per-slide results are reused for every slide whose fingerprint is unchanged
+def check_animation(deck_b, fingerprints=None):
+    return clean_excel_frame(run_incremental("animation", deck_b, run_animation_qc, "Slide", fingerprints=fingerprints))
+
+
+def check_chunking(deck_b, fingerprints=None):
+    df_slide_point, df_summary = run_incremental(
+        CHUNKING_CACHE_KEY, deck_b, run_chunking_qc_with_animation, "Slide Number", fingerprints=fingerprints
+    )
+    return clean_excel_frame(df_slide_point), clean_excel_frame(df_summary)
+
+
+def extract_shapes(deck_b, fingerprints=None):
+    """(shape rows, run style rows) for File B."""
+    return run_incremental(
+        "shapes", deck_b, extract_ppt_styles, "Slide Number",
+        fingerprints=fingerprints, overrides={"File Name": deck_b.file_name},
+    )
+
+
+def check_text_rules(df_qc):
+    return clean_excel_frame(run_text_rules_validation(df_qc))
+
+
+def build_results(df_animation, chunking, notes, df_text_rules, profile=None, df_runs=None):
+    """
+    The report's sheets as (sheet name, DataFrame) pairs, in workbook order,
+    judged against a style profile. With df_runs (the run style rows) fonts
+    are checked on every run and the rows get a "Run Styles" sheet.
+    """
+    df_slide_point, df_summary = chunking
+    df_notes_a, df_notes_b, df_cmp, df_qc = (clean_excel_frame(df) for df in notes)
+    if df_runs is not None:
+        df_runs = clean_excel_frame(df_runs)
+
+    with measure("report.qc_points"):
+        df_qc = apply_colour_names(apply_font_fallbacks(df_qc, profile), profile)
+        # Summarise all QC issues straight from the frames, not from the written workbook
+        df_qc_points = build_qc_points(df_slide_point, df_animation, df_text_rules, df_qc, profile, df_runs)
+
+    run_styles = [] if df_runs is None else [("Run Styles", df_runs)]
+    return [
+        ("Slide Point Analysis", df_slide_point),
+        ("Summary Review", df_summary),
+        ("Animation QC", df_animation),
+        ("File A Notes", df_notes_a),
+        ("File B Notes", df_notes_b),
+        ("Comparison Results", df_cmp),
+        ("Quality Check", df_qc),
+        *run_styles,
+        ("Text Rules Check", df_text_rules),
+        ("QC Points", df_qc_points),
+    ]
+
+
+# === PIPELINE ===
+def build_qc_stages(path_a, path_b, output_path, work_dir, metrics=None,
+                    record_history=HISTORY_ENABLED, export_dir=None, export_format="parquet", profile=None):
+    """
+    The QC run as a stage DAG. Animation, chunking and notes validation only
+    share the parsed decks, so they run side by side; text rules wait for the
+    notes validation's Quality Check frame, and the results wait for everything.
+    File B's shape and run style rows are extracted once, for the notes
+    validation and the run-level font checks.
+    With output_path=None the run stops at the result frames and no workbook
+    is written. The history append and the columnar export run alongside the
+    workbook write. profile names the style profile (None for the default).
+    """
+    ungrouped_path_b = os.path.join(work_dir, "ungrouped_" + os.path.basename(path_b))
+    # Resolved up front, so an unknown profile fails before any work is done
+    profile = get_profile(profile)
+    run = new_run(path_a, path_b, model=MODEL_NAME, backend=MODEL_BACKEND, profile=profile.name)
+
+    def ungroup():
+        ungroup_shapes_in_ppt(path_b, ungrouped_path_b)
+        return ungrouped_path_b
+
+    def notes(deck_a, deck_b, shapes):
+        return run_notes_validation(deck_a, deck_b, shapes_df=shapes[0])
+
+    def report(results):
+        sheets = list(results)
+        if metrics is not None:
+            # Built last, so it covers every stage that finished before the workbook was written
+            sheets.append(("Run Metrics", metrics.to_frame))
+        # One streaming pass writes every sheet with its highlights
+        with measure("report.write"):
+            return write_report(output_path, sheets, fill_rules_for(profile))
+
+    # Each deck is parsed once and shared, read-only, by every checker
+    stages = [
+        Stage("ungroup", ungroup),
+        Stage("deck_a", lambda: load_counted_deck(path_a, "a")),
+        Stage("deck_b", lambda ungroup: load_counted_deck(ungroup, "b"), deps=("ungroup",)),
+        Stage("fingerprints", lambda deck_b: deck_fingerprints(deck_b), deps=("deck_b",)),
+        Stage("animation", check_animation, deps=("deck_b", "fingerprints")),
+        Stage("chunking", check_chunking, deps=("deck_b", "fingerprints")),
+        Stage("shapes", extract_shapes, deps=("deck_b", "fingerprints")),
+        Stage("notes", notes, deps=("deck_a", "deck_b", "shapes")),
+        Stage("text_rules", lambda notes: check_text_rules(notes[3]), deps=("notes",)),
+        Stage(
+            "results",
+            lambda animation, chunking, notes, text_rules, shapes: build_results(
+                animation, chunking, notes, text_rules, profile, shapes[1]
+            ),
+            deps=("animation", "chunking", "notes", "text_rules", "shapes"),
+        ),
+    ]
+    if output_path is not None:
+        stages.append(Stage("report", report, deps=("results",)))
+    if record_history:
+        stages.append(Stage(
+            "history", lambda results, deck_b: record_run(results, {**run, "slides": len(deck_b)}),
+            deps=("results", "deck_b"),
+        ))
+    if export_dir is not None:
+        stages.append(Stage(
+            "export", lambda results, deck_b: export_results(results, export_dir, {**run, "slides": len(deck_b)}, export_format),
+            deps=("results", "deck_b"),
+        ))
+    return stages
+
+
+def _run_stages(stages, label, progress, metrics):
+    scheduler = StageScheduler(
+        stages, on_start=lambda name, s: progress(name, s.completed_fraction()), metrics=metrics
+    )
+    try:
+        with metrics.measure("pipeline"):
+            results = scheduler.run()
+    finally:
+        print(f"[Pipeline] {label}: {scheduler.summary()}")
+    progress("done", 1.0)
+    return results
+
+
+def run_qc_pipeline(path_a, path_b, output_path, work_dir=None, progress=None, metrics_sheet=RUN_METRICS_SHEET,
+                    export_dir=None, export_format="parquet", profile=None):
+    """
+    Runs every check on File A (script) and File B (final deck) and writes the
+    QC report to output_path. progress(stage, fraction) is called as each
+    stage starts, so callers can report where a long deck has got to.
+    Stage timings go to the /metrics registry, and with metrics_sheet=True
+    also to a "Run Metrics" sheet in the report.
+    """
+    progress = progress or _no_progress
+    work_dir = work_dir or os.path.dirname(os.path.abspath(path_b))
+    metrics = RunMetrics(os.path.basename(path_b))
+    stages = build_qc_stages(
+        path_a, path_b, output_path, work_dir, metrics if metrics_sheet else None,
+        export_dir=export_dir, export_format=export_format, profile=profile,
+    )
+    _run_stages(stages, os.path.basename(path_b), progress, metrics)
+    return output_path
+
+
+def run_qc_results(path_a, path_b, work_dir=None, progress=None, profile=None):
+    """Runs the same checks as run_qc_pipeline but returns the sheets instead of writing a workbook."""
+    progress = progress or _no_progress
+    work_dir = work_dir or os.path.dirname(os.path.abspath(path_b))
+    metrics = RunMetrics(os.path.basename(path_b))
+    stages = build_qc_stages(path_a, path_b, None, work_dir, profile=profile)
+    return _run_stages(stages, os.path.basename(path_b), progress, metrics)["results"]
@@ -1,170 +1,174 @@
 import pandas as pd
-from openpyxl import load_workbook
+from style_profiles import get_profile
 
-# Approved color sets
-APPROVED_FONT_COLORS = {"#000000", "#FFFFFF", "#F26722"}
-APPROVED_FILL_COLORS = {
-    "#F26722", "#0045C0", "#FDD900", "#B9CB00",
-    "#3B4096", "#CCC1FF", "#27BDBB", "#117673"
-}
+# Approved fonts, sizes and colours come from the style profile (style_profiles/*.json)
 
-def generate_qc_summary(excel_path):
-    wb = load_workbook(excel_path)
-    all_issues = []
-
-    def is_valid(val):
-        return pd.notna(val) and str(val).strip().lower() not in ["", "nan"]
-
-    # --- 1. Slide Point Analysis ---
-    if "Slide Point Analysis" in wb.sheetnames:
-        df = pd.read_excel(excel_path, sheet_name="Slide Point Analysis")
-        for _, row in df.iterrows():
-            comment = row.get("Comment")
-            slide_point = row.get("Slide Point")
-            if is_valid(slide_point):
-                if comment == "No VO content":
-                    all_issues.append({
-                        "Slide Number": row.get("Slide Number"),
-                        "Issue Type": "No VO Content",  # Specific issue for No VO content
-                        "Description": slide_point,
-                        "Shape ID": ""
-                    })
-                elif comment == "Partially matching":
-                    all_issues.append({
-                        "Slide Number": row.get("Slide Number"),
-                        "Issue Type": "Partially Matching",  # Specific issue for Partially matching
-                        "Description": slide_point,
-                        "Shape ID": ""
-                    })
-                elif comment == "No strong match":
-                    all_issues.append({
-                        "Slide Number": row.get("Slide Number"),
-                        "Issue Type": "Chunking",
-                        "Description": slide_point,
-                        "Shape ID": ""
-                    })
-
-    # --- 2. Animation QC ---
-    if "Animation QC" in wb.sheetnames:
-        df = pd.read_excel(excel_path, sheet_name="Animation QC")
-        for _, row in df.iterrows():
-            animation_type = str(row.get("Animation Type", "")).strip().lower()
-            slide = row.get("Slide Number", "")
-            shape = row.get("Shape Name / Table Cell", "")
-            text = row.get("Text", "")
-
-            if animation_type == "unknown":
-                all_issues.append({
-                    "Slide Number": slide,
-                    "Issue Type": "Unknown Animation",
-                    "Description": text if is_valid(text) else "(No text)",
-                    "Shape ID": shape
-                })
-
-    # --- 3. Text Rules Check ---
-    if "Text Rules Check" in wb.sheetnames:
-        df = pd.read_excel(excel_path, sheet_name="Text Rules Check", dtype=str)
-        for _, row in df.iterrows():
-            text = row.get("Extracted Text", "")
-            slide = row.get("Slide Number", "")
-            shape = row.get("Shape Name / Table Cell", "")
-
-            # Contraction check
-            if row.get("Contraction Used") == "Yes" and is_valid(text):
-                all_issues.append({"Slide Number": slide, "Issue Type": "Contraction", "Description": text, "Shape ID": shape})
-
-            # US English spelling check
-            if is_valid(row.get("US English Used")):
-                all_issues.append({"Slide Number": slide, "Issue Type": "US English", "Description": row.get("US English Used"), "Shape ID": shape})
-
-            # Extra space check
-            if row.get("Extra Space") == "Yes" and is_valid(text):
-                all_issues.append({"Slide Number": slide, "Issue Type": "Extra Space", "Description": text, "Shape ID": shape})
-
-            # Ending period check
-            if row.get("Ending Period Used") == "Yes" and is_valid(text):
-                all_issues.append({"Slide Number": slide, "Issue Type": "Ending Period", "Description": text, "Shape ID": shape})
-
-            # Mid-sentence period check
-            if row.get("Mid Sentence Period Used") == "Yes" and is_valid(text):
-                all_issues.append({"Slide Number": slide, "Issue Type": "Mid Sentence Period", "Description": text, "Shape ID": shape})
-
-    # --- 4. Quality Check ---
-    if "Quality Check" in wb.sheetnames:
-        df = pd.read_excel(excel_path, sheet_name="Quality Check")
-        for _, row in df.iterrows():
-            slide = row.get("Slide Number", "")
-            text = row.get("Extracted Text", "")
-            shape = row.get("Shape Name / Table Cell", "")
-
-            font_name = str(row.get("Font Name", "")).strip()
-            font_color = str(row.get("Font Color Hex", "")).upper().strip()
-            fill_color = str(row.get("Fill Color Hex", "")).upper().strip()
-
-            # Font check: Unapproved font
-            if is_valid(font_name) and font_name not in [
-                "HelveticaNowDisplay Medium", "Queens Medium", "HelveticaNowDisplay Black", "Consolas", "Cambria math"
-            ]:
-                all_issues.append({
-                    "Slide Number": slide,
-                    "Issue Type": "Unapproved Font",
-                    "Description": font_name,
-                    "Shape ID": shape
-                })
-
-            # Font size check (ranges)
-            try:
-                size = float(row.get("Font Size", 0))
-                if font_name == "Queens Medium" and size != 35:
-                    all_issues.append({
-                        "Slide Number": slide,
-                        "Issue Type": "Font Size Mismatch",
-                        "Description": f"{font_name} : {size}",
-                        "Shape ID": shape
-                    })
-                elif font_name == "HelveticaNowDisplay Medium" and not (24 <= size <= 27):
-                    all_issues.append({
-                        "Slide Number": slide,
-                        "Issue Type": "Font Size Mismatch",
-                        "Description": f"{font_name} : {size}",
-                        "Shape ID": shape
-                    })
-                elif font_name == "HelveticaNowDisplay Black" and not (70 <= size <= 92.5):
-                    all_issues.append({
-                        "Slide Number": slide,
-                        "Issue Type": "Font Size Mismatch",
-                        "Description": f"{font_name} : {size}",
-                        "Shape ID": shape
-                    })
-            except:
-                pass
-
-            # Font color mismatch
-            if is_valid(font_color) and font_color not in APPROVED_FONT_COLORS:
-                all_issues.append({
-                    "Slide Number": slide,
-                    "Issue Type": "Unapproved Font Color",
-                    "Description": font_color,
-                    "Shape ID": shape
-                })
-
-            # Fill color mismatch
-            if is_valid(fill_color) and fill_color not in APPROVED_FILL_COLORS:
-                all_issues.append({
-                    "Slide Number": slide,
-                    "Issue Type": "Unapproved Fill Color",
-                    "Description": fill_color,
-                    "Shape ID": shape
-                })
+SLIDE_POINT_ISSUES = {
+    "No VO content": "No VO Content",
+    "Partially matching": "Partially Matching",
+    "No strong match": "Chunking",
+}
+ISSUE_COLUMNS = ["Slide Number", "Issue Type", "Description", "Shape ID"]
+
+
+def is_valid(val):
+    return pd.notna(val) and str(val).strip().lower() not in ["", "nan"]
+
+
+def valid_mask(series):
+    """Vectorised is_valid over a column."""
+    return series.notna() & ~series.astype(str).str.strip().str.lower().isin(["", "nan"])
+
+
+def _column(df, name, default=""):
+    if name in df.columns:
+        return df[name]
+    return pd.Series(default, index=df.index, dtype=object)
+
+
+def _issues(section, check, df, mask, slide, issue_type, description, shape=""):
+    """Rows of df selected by mask, as issue records with their original ordering keys."""
+    mask = mask.fillna(False).astype(bool)
+    if not mask.any():
+        return None
+
+    def pick(value):
+        return value[mask].to_numpy() if isinstance(value, pd.Series) else value
+
+    return pd.DataFrame({
+        "Slide Number": pick(slide),
+        "Issue Type": issue_type,
+        "Description": pick(description),
+        "Shape ID": pick(shape),
+        "_section": section,
+        "_row": df.index[mask],
+        "_check": check,
+    })
+
+
+def slide_point_issues(df):
+    comment = _column(df, "Comment")
+    slide_point = _column(df, "Slide Point")
+    base = valid_mask(slide_point)
+    return [
+        _issues(0, 0, df, base & (comment == label), _column(df, "Slide Number"), issue_type, slide_point)
+        for label, issue_type in SLIDE_POINT_ISSUES.items()
+    ]
+
+
+def animation_issues(df):
+    # The Animation QC frame names its slide column "Slide"
+    slide = df["Slide Number"] if "Slide Number" in df.columns else _column(df, "Slide")
+    text = _column(df, "Text")
+    animation_type = _column(df, "Animation Type").astype(str).str.strip().str.lower()
+    description = text.where(valid_mask(text), "(No text)")
+    return [_issues(1, 0, df, animation_type == "unknown", slide, "Unknown Animation",
+                    description, _column(df, "Shape Name / Table Cell"))]
+
+
+def text_rule_issues(df):
+    slide = _column(df, "Slide Number")
+    shape = _column(df, "Shape Name / Table Cell")
+    text = _column(df, "Extracted Text")
+    text_ok = valid_mask(text)
+    us_words = _column(df, "US English Used")
+
+    def flagged(column):
+        return (_column(df, column) == "Yes") & text_ok
+
+    checks = [
+        ("Contraction", flagged("Contraction Used"), text),
+        ("US English", valid_mask(us_words), us_words),
+        ("Extra Space", flagged("Extra Space"), text),
+        ("Ending Period", flagged("Ending Period Used"), text),
+        ("Mid Sentence Period", flagged("Mid Sentence Period Used"), text),
+    ]
+    return [
+        _issues(2, check, df, mask, slide, issue_type, description, shape)
+        for check, (issue_type, mask, description) in enumerate(checks)
+    ]
+
+
+def font_issues(df, profile=None):
+    slide = _column(df, "Slide Number")
+    shape = _column(df, "Shape Name / Table Cell")
+    font_name = _column(df, "Font Name").astype(str).str.strip()
+    style = get_profile(profile).evaluate(df)
+
+    # Sizes that are present but not numbers are skipped, as the row-wise check did
+    raw_size = _column(df, "Font Size", 0)
+    size_known = style["size"].notna() | raw_size.isna()
+    size_bad = style["font_ok"] & ~style["size_ok"]
+    size_description = font_name + " : " + style["size"].map(str)
+    font_color = style["font_colour"]
+
+    return [
+        _issues(3, 0, df, valid_mask(font_name) & ~style["font_ok"], slide, "Unapproved Font", font_name, shape),
+        _issues(3, 1, df, size_bad & size_known, slide, "Font Size Mismatch", size_description, shape),
+        _issues(3, 2, df, valid_mask(font_color) & ~style["font_colour_ok"], slide, "Unapproved Font Color", font_color, shape),
+    ]
+
+
+def quality_check_issues(df, profile=None, df_runs=None):
+    # With run style rows every run's font is checked; the same issue on several runs of a shape is reported once
+    issues = font_issues(df if df_runs is None else df_runs, profile)
+    style = get_profile(profile).evaluate(df)
+    fill_color = style["fill_colour"]
+    issues.append(_issues(
+        3, 3, df, valid_mask(fill_color) & ~style["fill_colour_ok"], _column(df, "Slide Number"),
+        "Unapproved Fill Color", fill_color, _column(df, "Shape Name / Table Cell"),
+    ))
+    return issues
+
+
+def build_qc_points(df_slide_point=None, df_animation=None, df_text_rules=None, df_qc=None, profile=None,
+                    df_runs=None):
+    """
+    Derives the QC Points issue list straight from the result frames, one
+    boolean mask per issue type. Issues keep the order of the row-by-row
+    scan: by slide, then sheet, then row. Font checks use the run style rows
+    when they are given, and the Quality Check rows otherwise.
+    """
+    frames = []
+    if df_slide_point is not None:
+        frames += slide_point_issues(df_slide_point.reset_index(drop=True))
+    if df_animation is not None:
+        frames += animation_issues(df_animation.reset_index(drop=True))
+    if df_text_rules is not None:
+        frames += text_rule_issues(df_text_rules.reset_index(drop=True))
+    if df_qc is not None:
+        runs = None if df_runs is None else df_runs.reset_index(drop=True)
+        frames += quality_check_issues(df_qc.reset_index(drop=True), profile, runs)
+
+    frames = [frame for frame in frames if frame is not None]
+    if not frames:
+        return pd.DataFrame(columns=ISSUE_COLUMNS)
 
     # --- Final Cleanup ---
-    df_final = pd.DataFrame(all_issues)
-    df_final = df_final[df_final["Description"].apply(lambda x: is_valid(x))]
-    df_final.drop_duplicates(inplace=True)
+    df_final = pd.concat(frames, ignore_index=True)
+    df_final = df_final.sort_values(by=["_section", "_row", "_check"], kind="stable")
+    df_final = df_final[valid_mask(df_final["Description"])]
+    df_final = df_final.drop_duplicates(subset=ISSUE_COLUMNS)
     df_final["Slide Number"] = pd.to_numeric(df_final["Slide Number"], errors="coerce")
-    df_final.dropna(subset=["Slide Number"], inplace=True)
+    df_final = df_final.dropna(subset=["Slide Number"])
     df_final["Slide Number"] = df_final["Slide Number"].astype(int)
-    df_final.sort_values(by=["Slide Number"], inplace=True)
+    df_final = df_final.sort_values(by=["Slide Number"], kind="stable")
+    return df_final[ISSUE_COLUMNS].reset_index(drop=True)
+
+
+def generate_qc_summary(excel_path):
+    """Offline entry point: rebuilds the QC Points sheet of an existing report."""
+    with pd.ExcelFile(excel_path) as xls:
+        def read(sheet_name, **kwargs):
+            return xls.parse(sheet_name, **kwargs) if sheet_name in xls.sheet_names else None
+
+        df_final = build_qc_points(
+            df_slide_point=read("Slide Point Analysis"),
+            df_animation=read("Animation QC"),
+            df_text_rules=read("Text Rules Check", dtype=str),
+            df_qc=read("Quality Check"),
+            df_runs=read("Run Styles"),
+        )
 
     # --- Write QC Points Sheet ---
     with pd.ExcelWriter(excel_path, engine="openpyxl", mode="a", if_sheet_exists="replace") as writer:
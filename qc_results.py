@@ -0,0 +1,139 @@
+import json
+import os
+import time
+import pandas as pd
+from ungroup_util import ungroup_shapes_in_ppt
+from notes_validator import compare_notes, quality_check_frame
+from qc_pipeline import check_animation, check_chunking, check_text_rules, extract_shapes, load_counted_deck
+from qc_points_generator import build_qc_points
+from report_writer import apply_colour_names, apply_font_fallbacks
+from excel_sanitiser import clean_excel_frame
+from slide_cache import deck_fingerprints
+from metrics import RunMetrics
+from model_provider import MODEL_BACKEND, MODEL_NAME
+from results_store import HISTORY_ENABLED, new_run, record_run
+from style_profiles import get_profile
+
+# Slides checked together per streamed batch; bigger batches encode more efficiently, smaller ones stream sooner
+STREAM_CHUNK_SLIDES = int(os.environ.get("QC_STREAM_CHUNK_SLIDES", 8))
+
+# Report sheet -> JSON key
+SHEET_KEYS = {
+    "Slide Point Analysis": "slide_points",
+    "Summary Review": "summary",
+    "Animation QC": "animation",
+    "File A Notes": "notes_a",
+    "File B Notes": "notes_b",
+    "Comparison Results": "comparison",
+    "Quality Check": "quality_check",
+    "Run Styles": "run_styles",
+    "Text Rules Check": "text_rules",
+    "QC Points": "qc_points",
+}
+# The per-slide sheets, each with the column that holds its slide number
+SLIDE_SHEETS = {
+    "slide_points": "Slide Number",
+    "summary": "Slide Number",
+    "animation": "Slide",
+    "quality_check": "Slide Number",
+    "run_styles": "Slide Number",
+    "text_rules": "Slide Number",
+    "qc_points": "Slide Number",
+}
+
+
+# === JSON ===
+def frame_records(df):
+    """Rows as JSON-ready dicts: NaN becomes null and numpy scalars become plain numbers."""
+    if df is None or df.empty:
+        return []
+    return json.loads(df.to_json(orient="records", date_format="iso", force_ascii=False))
+
+
+def results_to_json(sheets):
+    return {SHEET_KEYS.get(name, name): frame_records(df) for name, df in sheets}
+
+
+def _rows_by_slide(df, column):
+    if df is None or df.empty or column not in df.columns:
+        return {}
+    numbers = pd.to_numeric(df[column], errors="coerce")
+    return {int(number): frame_records(df[numbers == number]) for number in numbers.dropna().unique()}
+
+
+# === STREAMING ===
+def stream_qc_results(path_a, path_b, work_dir, chunk_slides=STREAM_CHUNK_SLIDES, record_history=HISTORY_ENABLED,
+                      profile=None):
+    """
+    Yields the QC results as events for an NDJSON stream: "start", the
+    deck-wide "notes" comparison, one "slide" event per File B slide as each
+    batch of slides is checked, then "done". Per-slide rows are the same as
+    the matching rows of the full report, and the whole run is recorded in
+    the results history once the last slide is sent.
+    """
+    started = time.perf_counter()
+    profile = get_profile(profile)
+    metrics = RunMetrics(os.path.basename(path_b))
+    with metrics.measure("stream.decks"):
+        ungrouped_path_b = os.path.join(work_dir, "ungrouped_" + os.path.basename(path_b))
+        ungroup_shapes_in_ppt(path_b, ungrouped_path_b)
+        deck_a = load_counted_deck(path_a, "a")
+        deck_b = load_counted_deck(ungrouped_path_b, "b")
+        fingerprints = deck_fingerprints(deck_b)
+    yield {
+        "type": "start", "file_a": deck_a.file_name, "file_b": deck_b.file_name,
+        "slides": len(deck_b), "profile": profile.name,
+    }
+
+    # Notes are aligned across the whole of both decks, so the comparison is sent before any slide
+    with metrics.measure("stream.notes"):
+        notes = [clean_excel_frame(df) for df in compare_notes(deck_a, deck_b)]
+    yield {"type": "notes", **results_to_json(zip(("File A Notes", "File B Notes", "Comparison Results"), notes))}
+
+    issues = 0
+    batches = {key: [] for key in SLIDE_SHEETS}
+    numbers = [slide.number for slide in deck_b.slides]
+    for offset in range(0, len(numbers), chunk_slides):
+        batch = numbers[offset:offset + chunk_slides]
+        deck = deck_b.subset(batch)
+        batch_fingerprints = {number: fingerprints[number] for number in batch}
+        with metrics.measure("stream.batch"):
+            df_animation = check_animation(deck, batch_fingerprints)
+            df_slide_point, df_summary = check_chunking(deck, batch_fingerprints)
+            shapes_df, df_runs = extract_shapes(deck, batch_fingerprints)
+            df_qc = quality_check_frame(shapes_df)
+            df_text_rules = check_text_rules(df_qc)
+            df_qc = apply_colour_names(apply_font_fallbacks(clean_excel_frame(df_qc), profile), profile)
+            df_runs = clean_excel_frame(df_runs)
+            frames = {
+                "slide_points": df_slide_point,
+                "summary": df_summary,
+                "animation": df_animation,
+                "quality_check": df_qc,
+                "run_styles": df_runs,
+                "text_rules": df_text_rules,
+                "qc_points": build_qc_points(df_slide_point, df_animation, df_text_rules, df_qc, profile, df_runs),
+            }
+
+        for key in SLIDE_SHEETS:
+            batches[key].append(frames[key])
+        rows = {key: _rows_by_slide(frames[key], column) for key, column in SLIDE_SHEETS.items()}
+        for number in batch:
+            event = {"type": "slide", "slide": number}
+            event.update({key: rows[key].get(number, []) for key in SLIDE_SHEETS})
+            issues += len(event["qc_points"])
+            yield event
+
+    if record_history:
+        sheet_names = {key: name for name, key in SHEET_KEYS.items()}
+        sheets = list(zip(("File A Notes", "File B Notes", "Comparison Results"), notes))
+        sheets += [(sheet_names[key], pd.concat(frames, ignore_index=True)) for key, frames in batches.items() if frames]
+        run = new_run(path_a, path_b, model=MODEL_NAME, backend=MODEL_BACKEND, profile=profile.name, slides=len(numbers))
+        record_run(sheets, run)
+
+    yield {
+        "type": "done",
+        "slides": len(numbers),
+        "issues": issues,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
@@ -0,0 +1,210 @@
+import math
+import numbers
+import numpy as np
+import pandas as pd
+import xlsxwriter
+from style_profiles import get_profile
+
+# === STYLE RULES ===
+# Fonts, sizes, colours and placeholder defaults come from the style profile (style_profiles/*.json)
+
+COMMENT_COLOR_MAP = {
+    "Perfect match (copied)": "ff0000",
+    "Chunked properly": "87E179",
+    "No strong match": "FF9999",
+    "Partially matching": "9ADFE6",
+    "No VO content": "8B0000"
+}
+
+RED_FILL = "FFC7CE"
+ORANGE_FILL = "FFD966"
+YELLOW_FILL = "FFFF00"
+ANIMATION_OK_FILL = "CCFFCC"
+ANIMATION_UNKNOWN_FILL = "FFCCCC"
+
+
+def _text(series):
+    return series.fillna("").astype(str).str.strip()
+
+
+def _has_text(df):
+    if "Extracted Text" not in df.columns:
+        return pd.Series(False, index=df.index)
+    return _text(df["Extracted Text"]) != ""
+
+
+def apply_font_fallbacks(df_qc, profile=None):
+    """
+    Fills in a font (and size, if missing) for text shapes with no explicit
+    font, using the style profile's placeholder defaults. Returns a new frame.
+    """
+    required = ["Font Name", "Font Size", "Shape Name / Table Cell", "Shape Type", "Extracted Text"]
+    if not all(col in df_qc.columns for col in required):
+        return df_qc
+
+    profile = get_profile(profile)
+    df = df_qc.copy()
+    font = _text(df["Font Name"])
+    shape_name = _text(df["Shape Name / Table Cell"])
+    shape_type = _text(df["Shape Type"])
+
+    keys = pd.Series(list(zip(shape_name, shape_type)), index=df.index, dtype=object)
+    fallback = keys.map(lambda key: profile.placeholder_defaults.get(key))
+    if profile.textbox_default:
+        is_textbox = (shape_type == "TEXT_BOX (17)") & shape_name.str.lower().str.startswith("textbox")
+        textbox = pd.Series([profile.textbox_default] * len(df), index=df.index, dtype=object)
+        fallback = fallback.where(fallback.notna() | ~is_textbox, textbox)
+
+    apply = _has_text(df) & (font == "") & fallback.notna()
+    if not apply.any():
+        return df
+
+    fallback_font = fallback[apply].map(lambda f: f[0])
+    fallback_size = fallback[apply].map(lambda f: f[1])
+    size = pd.to_numeric(df["Font Size"], errors="coerce")
+    missing_size = apply & (size.isna() | (size == 0))
+
+    df["Font Name"] = df["Font Name"].astype(object)
+    df.loc[apply, "Font Name"] = fallback_font
+    df.loc[missing_size, "Font Size"] = fallback_size[missing_size[apply]]
+    return df
+
+
+COLOUR_NAME_COLUMNS = {
+    "Font Color Hex": "Font Color Name",
+    "Fill Color Hex": "Fill Color Name",
+    "Line Color Hex": "Line Color Name",
+}
+
+
+def apply_colour_names(df_qc, profile=None):
+    """
+    Names every colour from the run's style profile. Shape rows can come from
+    the slide cache, which is shared by every profile, so names are always
+    set here rather than trusted from extraction. Returns a new frame.
+    """
+    profile = get_profile(profile)
+    df = df_qc.copy()
+    for hex_column, name_column in COLOUR_NAME_COLUMNS.items():
+        if hex_column in df.columns and name_column in df.columns:
+            colour = _text(df[hex_column])
+            df[name_column] = colour.map(lambda value: profile.colour_name(value) if value else "")
+    return df
+
+
+def font_validation_fills(df, profile=None):
+    """Font, size and font colour highlights for the Quality Check and Run Styles sheets."""
+    required = ["Font Name", "Font Size", "Extracted Text", "Font Color Hex"]
+    if not all(col in df.columns for col in required):
+        return {}
+
+    has_text = _has_text(df)
+    style = get_profile(profile).evaluate(df)
+    size_bad = has_text & ~style["size_ok"]
+    font_bad = has_text & ~style["font_ok"] & (style["font"] != "")
+    color_bad = has_text & (style["font_colour"] != "") & ~style["font_colour_ok"]
+
+    return {
+        "Font Name": pd.Series(np.where(font_bad, ORANGE_FILL, None), index=df.index),
+        "Font Size": pd.Series(np.where(size_bad, RED_FILL, None), index=df.index),
+        "Font Color Hex": pd.Series(np.where(color_bad, YELLOW_FILL, None), index=df.index),
+    }
+
+
+def slide_point_fills(df):
+    if "Comment" not in df.columns:
+        return {}
+    return {"Comment": _text(df["Comment"]).map(COMMENT_COLOR_MAP)}
+
+
+def animation_fills(df):
+    if "Animation Type" not in df.columns:
+        return {}
+    value = _text(df["Animation Type"]).str.lower()
+    fills = np.select(
+        [value.str.contains("fade|wipe"), value == "unknown"],
+        [ANIMATION_OK_FILL, ANIMATION_UNKNOWN_FILL],
+        default=None,
+    )
+    return {"Animation Type": pd.Series(fills, index=df.index)}
+
+
+FILL_RULES = {
+    "Slide Point Analysis": slide_point_fills,
+    "Animation QC": animation_fills,
+    "Quality Check": font_validation_fills,
+    "Run Styles": font_validation_fills,
+}
+
+
+def fill_rules_for(profile=None):
+    """FILL_RULES with the font highlights judged against the given style profile."""
+    profile = get_profile(profile)
+
+    def fills(df):
+        return font_validation_fills(df, profile)
+
+    return {**FILL_RULES, "Quality Check": fills, "Run Styles": fills}
+
+
+# === WRITER ===
+def _is_blank(value):
+    # Empty strings are left as empty cells, as pandas' openpyxl writer did
+    return value is None or value is pd.NA or value == "" or (isinstance(value, (float, np.floating)) and math.isnan(value))
+
+
+def write_report(output_path, sheets, fill_rules=FILL_RULES):
+    """
+    Writes every (sheet_name, DataFrame) pair, with its cell fills, in a single
+    streaming pass. xlsxwriter's constant_memory mode flushes each row as it is
+    written, so memory stays flat no matter how many rows the report has.
+    A sheet's frame may also be a callable, built only when its turn comes.
+    """
+    workbook = xlsxwriter.Workbook(output_path, {
+        "constant_memory": True,
+        "strings_to_numbers": False,
+        "strings_to_formulas": False,
+        "strings_to_urls": False,
+    })
+    # Same header look pandas' to_excel produces
+    header_format = workbook.add_format({"bold": True, "border": 1, "align": "center", "valign": "top"})
+    fill_formats = {}
+
+    def fill_format(color):
+        if color not in fill_formats:
+            fill_formats[color] = workbook.add_format({"bg_color": f"#{color}", "pattern": 1})
+        return fill_formats[color]
+
+    try:
+        for sheet_name, df in sheets:
+            if callable(df):
+                df = df()
+            ws = workbook.add_worksheet(sheet_name)
+            for col, name in enumerate(df.columns):
+                ws.write_string(0, col, str(name), header_format)
+
+            rule = fill_rules.get(sheet_name)
+            fills = rule(df) if rule else {}
+            fill_columns = [
+                fills[name].tolist() if name in fills else None
+                for name in df.columns
+            ]
+            columns = [df[name].tolist() for name in df.columns]
+
+            for row, values in enumerate(zip(*columns), start=1):
+                for col, value in enumerate(values):
+                    color = fill_columns[col][row - 1] if fill_columns[col] is not None else None
+                    fmt = fill_format(color) if isinstance(color, str) else None
+                    if _is_blank(value):
+                        if fmt is not None:
+                            ws.write_blank(row, col, None, fmt)
+                    elif isinstance(value, (bool, np.bool_)):
+                        ws.write_boolean(row, col, bool(value), fmt)
+                    elif isinstance(value, numbers.Real):
+                        # Covers numpy scalars left in object columns; bool was handled above
+                        ws.write_number(row, col, value, fmt)
+                    else:
+                        ws.write_string(row, col, str(value), fmt)
+    finally:
+        workbook.close()
+    return output_path
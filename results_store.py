@@ -0,0 +1,269 @@
+"""
+Columnar copies of QC results, for analytics across many runs.
+
+Every pipeline run appends its result frames to a local history dataset,
+one Parquet file per run and table, hive-partitioned by run date:
+
+    history/<table>/run_date=2026-10-18/<run_id>.parquet
+
+so a date-filtered scan only opens the matching folders, and only the columns
+asked for are read. The same frames can be exported per run (batch_qc.py
+--export) as Parquet or Arrow IPC files.
+
+    python results_store.py summary --since 2026-09-01
+    python results_store.py compact
+"""
+import argparse
+import json
+import os
+import sys
+import uuid
+from datetime import datetime, timezone
+import pandas as pd
+
+HISTORY_ROOT = os.environ.get("QC_HISTORY", "history")
+# Set QC_HISTORY_ENABLED=0 to stop appending runs to the history dataset
+HISTORY_ENABLED = os.environ.get("QC_HISTORY_ENABLED", "1") == "1"
+EXPORT_FORMATS = ("parquet", "arrow")
+
+# Report sheet -> history table
+RESULT_TABLES = {
+    "Slide Point Analysis": "slide_points",
+    "Animation QC": "animation",
+    "Comparison Results": "comparison",
+    "Quality Check": "quality_check",
+    "Run Styles": "run_styles",
+    "Text Rules Check": "text_rules",
+    "QC Points": "qc_points",
+}
+RUNS_TABLE = "runs"
+
+# Columns stored as numbers; everything else is stored as text, so every
+# run's file for a table has the same types and the files scan as one dataset
+INT_COLUMNS = {"Slide", "Slide Number", "Point Number", "File A Slide", "Paragraph", "Run"}
+FLOAT_COLUMNS = {"Similarity Score", "Font Size", "Delay (sec)"}
+
+
+def new_run(path_a, path_b, **extra):
+    """Run metadata stamped on every row the run writes."""
+    now = datetime.now(timezone.utc)
+    return {
+        "run_id": uuid.uuid4().hex,
+        "run_at": now.isoformat(timespec="seconds"),
+        "run_date": now.strftime("%Y-%m-%d"),
+        "file_a": os.path.basename(path_a),
+        "file_b": os.path.basename(path_b),
+        **extra,
+    }
+
+
+# === CONVERSION ===
+def history_frame(df, run):
+    """A result frame with fixed column types and the run's id, time and file names in front."""
+    out = pd.DataFrame(index=df.index)
+    for key in ("run_id", "run_at", "file_a", "file_b"):
+        out[key] = pd.Series(run[key], index=df.index, dtype="string")
+    for column in df.columns:
+        if column in INT_COLUMNS:
+            out[column] = pd.to_numeric(df[column], errors="coerce").round().astype("Int64")
+        elif column in FLOAT_COLUMNS:
+            out[column] = pd.to_numeric(df[column], errors="coerce").astype("float64")
+        else:
+            out[column] = df[column].astype("string")
+    return out.reset_index(drop=True)
+
+
+def _arrow_table(df, run):
+    import pyarrow as pa
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[b"qc_run"] = json.dumps(run).encode("utf-8")
+    return table.replace_schema_metadata(metadata)
+
+
+def run_tables(sheets, run):
+    """{table: DataFrame} for the result sheets of one run, plus its one-row "runs" entry."""
+    frames = {RESULT_TABLES[name]: history_frame(df, run) for name, df in sheets if name in RESULT_TABLES}
+    qc_points = dict(sheets).get("QC Points")
+    summary = {key: value for key, value in run.items() if key != "run_date"}
+    summary["issues"] = 0 if qc_points is None else len(qc_points)
+    frames[RUNS_TABLE] = pd.DataFrame([summary])
+    return frames
+
+
+def _write_atomic(path, write):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Dot-prefixed, so dataset scans skip a file that is still being written
+    tmp_path = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.{uuid.uuid4().hex}.tmp")
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+# === PER-RUN EXPORT ===
+def export_results(sheets, directory, run, fmt="parquet"):
+    """Writes each result frame to <directory>/<table>.parquet (or .arrow); returns the paths."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}; use one of {', '.join(EXPORT_FORMATS)}")
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+
+    paths = []
+    for table_name, df in run_tables(sheets, run).items():
+        table = _arrow_table(df, run)
+        path = os.path.join(directory, f"{table_name}.{fmt}")
+        if fmt == "parquet":
+            _write_atomic(path, lambda tmp: pq.write_table(table, tmp))
+        else:
+            _write_atomic(path, lambda tmp: feather.write_feather(table, tmp))
+        paths.append(path)
+    return paths
+
+
+# === HISTORY DATASET ===
+class ResultsHistory:
+    """
+    The local history of QC results. Appends never touch existing files, so
+    several processes (web workers, batch workers) can append at once.
+    """
+
+    def __init__(self, root=HISTORY_ROOT):
+        self.root = os.path.abspath(root)
+
+    def table_dir(self, table):
+        return os.path.join(self.root, table)
+
+    def append(self, sheets, run):
+        import pyarrow.parquet as pq
+        for table_name, df in run_tables(sheets, run).items():
+            table = _arrow_table(df, run)
+            path = os.path.join(self.table_dir(table_name), f"run_date={run['run_date']}", f"{run['run_id']}.parquet")
+            _write_atomic(path, lambda tmp: pq.write_table(table, tmp))
+        return run["run_id"]
+
+    def dataset(self, table):
+        """A pyarrow dataset over every run's file for the table, or None if nothing was recorded yet."""
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        path = self.table_dir(table)
+        if not os.path.isdir(path):
+            return None
+        partitioning = ds.partitioning(pa.schema([("run_date", pa.string())]), flavor="hive")
+        dataset = ds.dataset(path, format="parquet", partitioning=partitioning)
+        # A column missing from some runs (e.g. a new check) is read as null for them
+        schemas = [fragment.physical_schema for fragment in dataset.get_fragments()]
+        if not schemas:
+            return None
+        schema = pa.unify_schemas(schemas + [partitioning.schema])
+        return ds.dataset(path, schema=schema, format="parquet", partitioning=partitioning)
+
+    def scan(self, table, columns=None, since=None, until=None, where=None):
+        """
+        Reads a table into a DataFrame. since/until are "YYYY-MM-DD" run dates
+        (inclusive) and prune whole partitions; where is an optional pyarrow
+        dataset expression, e.g. ds.field("Issue Type") == "US English".
+        """
+        import pyarrow.dataset as ds
+
+        dataset = self.dataset(table)
+        if dataset is None:
+            return pd.DataFrame(columns=columns or [])
+        conditions = [where] if where is not None else []
+        if since:
+            conditions.append(ds.field("run_date") >= since)
+        if until:
+            conditions.append(ds.field("run_date") <= until)
+        expression = None
+        for condition in conditions:
+            expression = condition if expression is None else expression & condition
+        columns = [c for c in columns if c in dataset.schema.names] if columns else None
+        return dataset.to_table(columns=columns, filter=expression).to_pandas()
+
+    def compact(self, table):
+        """Merges each date partition's per-run files into one file; returns the number of files removed."""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        removed = 0
+        root = self.table_dir(table)
+        if not os.path.isdir(root):
+            return 0
+        for partition in sorted(os.listdir(root)):
+            folder = os.path.join(root, partition)
+            files = sorted(os.path.join(folder, name) for name in os.listdir(folder) if name.endswith(".parquet"))
+            if len(files) < 2:
+                continue
+            tables = [pq.read_table(path, partitioning=None) for path in files]
+            merged = pa.concat_tables(tables, promote_options="default")
+            path = os.path.join(folder, f"compacted-{uuid.uuid4().hex}.parquet")
+            # The merged file is in place before the originals go, so no run is ever missing
+            _write_atomic(path, lambda tmp: pq.write_table(merged, tmp))
+            for old in files:
+                os.remove(old)
+            removed += len(files)
+        return removed
+
+
+_history = None
+
+
+def get_history():
+    global _history
+    if _history is None:
+        _history = ResultsHistory()
+    return _history
+
+
+def record_run(sheets, run, history=None):
+    """Appends a run to the history; a failure is logged and never fails the QC run itself."""
+    try:
+        return (history or get_history()).append(sheets, run)
+    except ImportError:
+        print("[History] pyarrow is not installed; results are not recorded")
+    except Exception as e:
+        print(f"[History] Could not record run {run['run_id']}: {e}")
+    return None
+
+
+# === TRENDS ===
+def summarise(history, since=None, until=None, top=10):
+    """The recurring issues and fonts across every recorded run in the date range."""
+    runs = history.scan(RUNS_TABLE, columns=["run_id"], since=since, until=until)
+    issues = history.scan(
+        "qc_points", columns=["file_b", "Slide Number", "Issue Type"], since=since, until=until
+    )
+    fonts = history.scan("quality_check", columns=["Font Name"], since=since, until=until)
+
+    print(f"[History] {len(runs)} run(s), {len(issues)} issue(s)")
+    if not issues.empty:
+        print("\nIssue types:")
+        print(issues["Issue Type"].value_counts().head(top).to_string())
+        print("\nSlides with the most issues:")
+        by_slide = issues.groupby(["file_b", "Slide Number"]).size().sort_values(ascending=False)
+        print(by_slide.head(top).to_string())
+    if not fonts.empty:
+        print("\nFonts:")
+        print(fonts["Font Name"].replace("", pd.NA).dropna().value_counts().head(top).to_string())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query and maintain the QC results history.")
+    parser.add_argument("command", choices=("summary", "compact"))
+    parser.add_argument("--root", default=HISTORY_ROOT, help="History dataset directory")
+    parser.add_argument("--since", help="First run date to include (YYYY-MM-DD)")
+    parser.add_argument("--until", help="Last run date to include (YYYY-MM-DD)")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    history = ResultsHistory(args.root)
+    if args.command == "summary":
+        summarise(history, since=args.since, until=args.until, top=args.top)
+    else:
+        tables = [RUNS_TABLE, *RESULT_TABLES.values()]
+        removed = sum(history.compact(table) for table in tables)
+        print(f"[History] Compacted {removed} file(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,209 @@
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import pandas as pd
+from lxml import etree
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.oxml.ns import qn
+
+CACHE_PATH = os.environ.get("QC_SLIDE_CACHE", os.path.join("cache", "slide_results.sqlite3"))
+MAX_ENTRIES = int(os.environ.get("QC_SLIDE_CACHE_MAX_ENTRIES", 100000))
+# Set QC_SLIDE_CACHE_ENABLED=0 to always recompute every slide
+CACHE_ENABLED = os.environ.get("QC_SLIDE_CACHE_ENABLED", "1") == "1"
+# Bump when a checker's per-slide output changes, so old rows are never reused
+CACHE_VERSION = "2"
+
+
+# === FINGERPRINTS ===
+def _layout_digest(layout_part, digests):
+    """The layout plus the master, theme and presentation text defaults its text styles inherit from."""
+    master_part = layout_part.part_related_by(RT.SLIDE_MASTER)
+    master_key = str(master_part.partname)
+    if master_key not in digests:
+        h = hashlib.sha256(etree.tostring(master_part._element))
+        h.update(master_part.part_related_by(RT.THEME).blob)
+        default_style = master_part.package.presentation_part._element.find(qn("p:defaultTextStyle"))
+        if default_style is not None:
+            h.update(etree.tostring(default_style))
+        digests[master_key] = h.hexdigest()
+    h = hashlib.sha256(etree.tostring(layout_part._element))
+    h.update(digests[master_key].encode())
+    return h.hexdigest()
+
+
+def slide_fingerprint(slide_model, layout_digests=None):
+    """
+    Hash of everything a checker reads from one slide: the slide XML (shapes,
+    text and p:timing), its notes XML, the layout, master and theme it
+    inherits placeholder positions and text styles from, and the targets of
+    its relationships.
+    """
+    slide = slide_model.slide
+    layout_digests = {} if layout_digests is None else layout_digests
+    layout_part = slide.slide_layout.part
+    layout_key = str(layout_part.partname)
+    if layout_key not in layout_digests:
+        layout_digests[layout_key] = _layout_digest(layout_part, layout_digests)
+
+    h = hashlib.sha256()
+    h.update(etree.tostring(slide_model.element))
+    h.update(b"\0notes\0")
+    if slide.has_notes_slide:
+        h.update(etree.tostring(slide.notes_slide._element))
+    h.update(b"\0layout\0" + layout_digests[layout_key].encode())
+    for rel_id, rel in sorted(slide.part.rels.items()):
+        target = rel.target_ref if rel.is_external else str(rel.target_part.partname)
+        h.update(f"\0{rel_id}={rel.reltype}:{target}".encode())
+    return h.hexdigest()
+
+
+def deck_fingerprints(deck):
+    layout_digests = {}
+    return {slide.number: slide_fingerprint(slide, layout_digests) for slide in deck.slides}
+
+
+# === STORE ===
+class SlideResultCache:
+    """
+    Per-slide checker output in SQLite, keyed by (checker, slide fingerprint).
+    The table is trimmed back to max_entries by evicting the least recently
+    used rows.
+    """
+
+    def __init__(self, path=CACHE_PATH, max_entries=MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.stats = {"hits": 0, "misses": 0}
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS slide_results ("
+            "checker TEXT NOT NULL, fingerprint TEXT NOT NULL, payload BLOB NOT NULL, last_used REAL NOT NULL, "
+            "PRIMARY KEY (checker, fingerprint))"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS slide_results_last_used ON slide_results (last_used)")
+        self._db.commit()
+
+    def get_many(self, checker, fingerprints):
+        found = {}
+        unique = list(dict.fromkeys(fingerprints))
+        now = time.time()
+        with self._lock:
+            for start in range(0, len(unique), 500):
+                chunk = unique[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._db.execute(
+                    f"SELECT fingerprint, payload FROM slide_results WHERE checker = ? AND fingerprint IN ({placeholders})",
+                    [checker, *chunk],
+                ).fetchall()
+                for fingerprint, payload in rows:
+                    found[fingerprint] = pickle.loads(payload)
+                if rows:
+                    self._db.executemany(
+                        "UPDATE slide_results SET last_used = ? WHERE checker = ? AND fingerprint = ?",
+                        [(now, checker, row[0]) for row in rows],
+                    )
+            self._db.commit()
+        return found
+
+    def put_many(self, checker, items):
+        now = time.time()
+        rows = [
+            (checker, fingerprint, pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL), now)
+            for fingerprint, payload in items
+        ]
+        with self._lock:
+            self._db.executemany("INSERT OR REPLACE INTO slide_results VALUES (?, ?, ?, ?)", rows)
+            (count,) = self._db.execute("SELECT COUNT(*) FROM slide_results").fetchone()
+            if count > self.max_entries:
+                self._db.execute(
+                    "DELETE FROM slide_results WHERE rowid IN "
+                    "(SELECT rowid FROM slide_results ORDER BY last_used ASC LIMIT ?)", (count - self.max_entries,)
+                )
+            self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM slide_results")
+            self._db.commit()
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_slide_cache():
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = SlideResultCache()
+        return _shared_cache
+
+
+# === INCREMENTAL CHECKERS ===
+def _split_by_slide(df, slide_column):
+    if df.empty or slide_column not in df.columns:
+        return {}
+    return {number: rows.to_dict("records") for number, rows in df.groupby(slide_column, sort=False)}
+
+
+def run_incremental(checker, deck, run, slide_column, cache=None, fingerprints=None, overrides=None):
+    """
+    Runs run(deck) -> DataFrame (or a tuple of DataFrames) only on the slides
+    whose fingerprint has no cached result, and rebuilds the full output from
+    cached and fresh per-slide rows in slide order. Cached rows get the
+    current slide number, plus any constant overrides such as the file name,
+    so a slide that only moved is still reused.
+    """
+    if not CACHE_ENABLED and cache is None:
+        return run(deck)
+
+    cache = cache or get_slide_cache()
+    fingerprints = fingerprints or deck_fingerprints(deck)
+    key = f"{checker}:{CACHE_VERSION}"
+    cached = cache.get_many(key, list(fingerprints.values()))
+    stale = [slide.number for slide in deck.slides if fingerprints[slide.number] not in cached]
+
+    per_slide = {number: cached[fingerprints[number]] for number in fingerprints if fingerprints[number] in cached}
+    if stale:
+        fresh = run(deck.subset(stale))
+        single = isinstance(fresh, pd.DataFrame)
+        frames = (fresh,) if single else tuple(fresh)
+        columns = [list(df.columns) for df in frames]
+        splits = [_split_by_slide(df, slide_column) for df in frames]
+        new_items = []
+        for number in stale:
+            payload = {"single": single, "columns": columns, "rows": [split.get(number, []) for split in splits]}
+            per_slide[number] = payload
+            new_items.append((fingerprints[number], payload))
+        cache.put_many(key, new_items)
+
+    reused = len(fingerprints) - len(stale)
+    cache.stats["hits"] += reused
+    cache.stats["misses"] += len(stale)
+    print(f"[SlideCache] {checker}: {reused}/{len(fingerprints)} slides reused")
+
+    payloads = [per_slide[slide.number] for slide in deck.slides]
+    if not payloads:
+        return run(deck)
+    single = payloads[0]["single"]
+    frames = []
+    for index in range(len(payloads[0]["columns"])):
+        # A subset with no rows for a frame has no columns either, so take the union in order
+        columns = list(dict.fromkeys(col for payload in payloads for col in payload["columns"][index]))
+        rows = []
+        for slide, payload in zip(deck.slides, payloads):
+            for row in payload["rows"][index]:
+                row = dict(row)
+                row[slide_column] = slide.number
+                if overrides:
+                    row.update(overrides)
+                rows.append(row)
+        frames.append(pd.DataFrame(rows, columns=columns) if rows else pd.DataFrame(columns=columns))
+    return frames[0] if single else tuple(frames)
@@ -0,0 +1,160 @@
+import csv
+import hashlib
+import io
+import os
+import pickle
+import threading
+import time
+from us2uk_QC import SpellingMatcher
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DICTIONARY_PATH = os.path.join(BASE_DIR, "us_to_uk_dictionary.csv")
+CACHE_DIR = os.environ.get("QC_DICTIONARY_CACHE", os.path.join(BASE_DIR, "cache"))
+RELOAD_CHECK_SECONDS = 2.0
+# Part of the artefact name and checked on load, so a matcher change never unpickles an old layout
+MATCHER_FORMAT = SpellingMatcher.FORMAT_VERSION
+
+# Both column spellings have been used for the CSV header over time
+US_COLUMNS = ("US", "American")
+UK_COLUMNS = ("UK", "British")
+
+
+def parse_dictionary_csv(data):
+    """Parses the CSV bytes into an ordered {us: uk} dict without pandas."""
+    reader = csv.reader(io.StringIO(data.decode("utf-8-sig")))
+    header = [cell.strip() for cell in next(reader, [])]
+    us_col = next((header.index(c) for c in US_COLUMNS if c in header), 0)
+    uk_col = next((header.index(c) for c in UK_COLUMNS if c in header), 1)
+
+    dictionary = {}
+    for row in reader:
+        if len(row) <= max(us_col, uk_col):
+            continue
+        us, uk = row[us_col].strip(), row[uk_col].strip()
+        if not us or not uk:
+            continue
+        # A second header line ("American,British") is not a spelling pair
+        if us in US_COLUMNS and uk in UK_COLUMNS:
+            continue
+        dictionary[us] = uk
+    return dictionary
+
+
+class DictionaryService:
+    """
+    Serves the US -> UK dictionary and its compiled matcher. The compiled form
+    is pickled next to a hash of the CSV and the matcher format version, so
+    workers only re-parse and re-compile when either changes. Edits to the CSV are picked up
+    on the next lookup, without restarting the process.
+    """
+
+    def __init__(self, csv_path=DICTIONARY_PATH, cache_dir=CACHE_DIR):
+        self.csv_path = csv_path
+        self.cache_dir = cache_dir
+        self.digest = None
+        self.dictionary = {}
+        self.matcher = SpellingMatcher({})
+        self._stat = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.reload()
+
+    def _artefact_path(self, digest):
+        return os.path.join(self.cache_dir, f"us_to_uk_v{MATCHER_FORMAT}_{digest[:16]}.pickle")
+
+    def reload(self):
+        with self._lock:
+            stat = os.stat(self.csv_path)
+            with open(self.csv_path, "rb") as f:
+                data = f.read()
+            digest = hashlib.sha256(data).hexdigest()
+            self._stat = (stat.st_mtime_ns, stat.st_size)
+            self._checked_at = time.monotonic()
+            if digest == self.digest:
+                return False
+
+            artefact = self._artefact_path(digest)
+            compiled = None
+            if os.path.exists(artefact):
+                try:
+                    with open(artefact, "rb") as f:
+                        compiled = pickle.load(f)
+                except Exception:
+                    compiled = None
+            stale = (
+                not isinstance(compiled, dict)
+                or compiled.get("digest") != digest
+                or compiled.get("format") != MATCHER_FORMAT
+            )
+            if stale:
+                dictionary = parse_dictionary_csv(data)
+                compiled = {
+                    "digest": digest,
+                    "format": MATCHER_FORMAT,
+                    "dictionary": dictionary,
+                    "matcher": SpellingMatcher(dictionary),
+                }
+                try:
+                    os.makedirs(self.cache_dir, exist_ok=True)
+                    tmp_path = f"{artefact}.{os.getpid()}.tmp"
+                    with open(tmp_path, "wb") as f:
+                        pickle.dump(compiled, f, protocol=pickle.HIGHEST_PROTOCOL)
+                    os.replace(tmp_path, artefact)
+                except OSError as e:
+                    print(f"[Dictionary] Could not write compiled dictionary: {e}")
+
+            self.digest = digest
+            self.dictionary = compiled["dictionary"]
+            self.matcher = compiled["matcher"]
+            return True
+
+    def refresh(self):
+        """Reloads if the CSV changed on disk; stat is checked at most every RELOAD_CHECK_SECONDS."""
+        now = time.monotonic()
+        if now - self._checked_at < RELOAD_CHECK_SECONDS:
+            return False
+        self._checked_at = now
+        try:
+            stat = os.stat(self.csv_path)
+        except OSError:
+            return False
+        if (stat.st_mtime_ns, stat.st_size) == self._stat:
+            return False
+        return self.reload()
+
+    def detect(self, text):
+        self.refresh()
+        return self.matcher.detect(text)
+
+    def convert(self, text):
+        self.refresh()
+        return self.matcher.convert(text)
+
+    def get_dictionary(self):
+        self.refresh()
+        return self.dictionary
+
+
+_services = {}
+_services_lock = threading.Lock()
+
+
+def get_dictionary_service(csv_path=DICTIONARY_PATH):
+    key = os.path.abspath(csv_path)
+    with _services_lock:
+        service = _services.get(key)
+        if service is None:
+            service = DictionaryService(key)
+            _services[key] = service
+        return service
+
+
+def service_matcher(dictionary):
+    """The prebuilt matcher of the service that serves this exact dict, or None."""
+    with _services_lock:
+        services = list(_services.values())
+    for service in services:
+        with service._lock:
+            if service.dictionary is dictionary:
+                return service.matcher
+    return None
@@ -0,0 +1,144 @@
+import os
+import threading
+import time
+import traceback
+from contextlib import nullcontext
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+
+# Stages running at once within one pipeline run
+STAGE_WORKERS = int(os.environ.get("QC_STAGE_WORKERS", 4))
+
+
+@dataclass
+class Stage:
+    """A named step; func receives the results of its dependencies as keyword arguments."""
+    name: str
+    func: object
+    deps: tuple = ()
+
+
+@dataclass
+class StageRun:
+    name: str
+    status: str = "pending"
+    started: float = None
+    finished: float = None
+    thread: str = ""
+    error: str = None
+    traceback: str = field(default=None, repr=False)
+
+    @property
+    def seconds(self):
+        if self.started is None or self.finished is None:
+            return None
+        return self.finished - self.started
+
+
+class StageError(RuntimeError):
+    def __init__(self, runs):
+        self.runs = runs
+        failed = [run for run in runs.values() if run.status == "failed"]
+        super().__init__("; ".join(f"{run.name}: {run.error}" for run in failed))
+
+
+class StageScheduler:
+    """
+    Runs a DAG of stages on a thread pool. A stage starts as soon as all of
+    its dependencies have finished, so independent checkers overlap and the
+    run takes about as long as its critical path. If a stage fails, its
+    dependents are skipped, the stages already running are allowed to
+    finish, and StageError is raised with every stage's record attached.
+    """
+
+    def __init__(self, stages, max_workers=STAGE_WORKERS, on_start=None, metrics=None):
+        self.stages = {stage.name: stage for stage in stages}
+        if len(self.stages) != len(stages):
+            raise ValueError("Stage names must be unique")
+        for stage in stages:
+            for dep in stage.deps:
+                if dep not in self.stages:
+                    raise ValueError(f"Stage {stage.name!r} depends on unknown stage {dep!r}")
+        self._check_acyclic()
+        self.max_workers = max_workers
+        self.on_start = on_start
+        self.metrics = metrics
+        self.runs = {name: StageRun(name) for name in self.stages}
+        self.results = {}
+
+    def _check_acyclic(self):
+        state = {}
+
+        def visit(name, path):
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "visiting":
+                raise ValueError(f"Stage cycle: {' -> '.join(path + [name])}")
+            state[name] = "visiting"
+            for dep in self.stages[name].deps:
+                visit(dep, path + [name])
+            state[name] = "done"
+
+        for name in self.stages:
+            visit(name, [])
+
+    def _run_stage(self, stage):
+        run = self.runs[stage.name]
+        run.thread = threading.current_thread().name
+        run.started = time.perf_counter()
+        try:
+            with self.metrics.measure(stage.name) if self.metrics else nullcontext():
+                return stage.func(**{dep: self.results[dep] for dep in stage.deps})
+        finally:
+            run.finished = time.perf_counter()
+
+    def run(self):
+        pending = dict(self.stages)
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="qc-stage") as pool:
+            while pending or running:
+                for name, stage in list(pending.items()):
+                    dep_status = [self.runs[dep].status for dep in stage.deps]
+                    if any(status in ("failed", "skipped") for status in dep_status):
+                        self.runs[name].status = "skipped"
+                        del pending[name]
+                    elif all(status == "done" for status in dep_status):
+                        self.runs[name].status = "running"
+                        if self.on_start:
+                            self.on_start(name, self)
+                        running[pool.submit(self._run_stage, stage)] = name
+                        del pending[name]
+
+                if not running:
+                    break
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    run = self.runs[name]
+                    try:
+                        self.results[name] = future.result()
+                        run.status = "done"
+                    except Exception as e:
+                        run.status = "failed"
+                        run.error = f"{type(e).__name__}: {e}"
+                        run.traceback = traceback.format_exc()
+
+        if any(run.status != "done" for run in self.runs.values()):
+            raise StageError(self.runs)
+        return self.results
+
+    def completed_fraction(self):
+        done = sum(1 for run in self.runs.values() if run.status in ("done", "failed", "skipped"))
+        return done / len(self.runs) if self.runs else 1.0
+
+    def timings(self):
+        """(stage, status, seconds, error) rows in the order stages were declared."""
+        return [(run.name, run.status, run.seconds, run.error) for run in self.runs.values()]
+
+    def summary(self):
+        parts = [
+            f"{name}={seconds:.2f}s" if seconds is not None else f"{name}={status}"
+            for name, status, seconds, _ in self.timings()
+        ]
+        return " ".join(parts)
@@ -0,0 +1,154 @@
+import json
+import math
+import os
+import threading
+import time
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PROFILE_DIR = os.environ.get("QC_STYLE_PROFILE_DIR", os.path.join(BASE_DIR, "style_profiles"))
+# Profile used when a run does not name one, e.g. QC_STYLE_PROFILE=client_x for style_profiles/client_x.json
+DEFAULT_PROFILE = os.environ.get("QC_STYLE_PROFILE", "default")
+RELOAD_CHECK_SECONDS = 2.0
+
+
+class UnknownProfile(Exception):
+    pass
+
+
+def _text(series):
+    return series.fillna("").astype(str).str.strip()
+
+
+def _column(df, name):
+    if name in df.columns:
+        return df[name]
+    return pd.Series("", index=df.index, dtype=object)
+
+
+# === PROFILE ===
+class StyleProfile:
+    """
+    A brand's approved fonts (with size ranges), font and fill colours,
+    colour names and placeholder defaults, compiled into lookup tables so
+    every rule runs as a column operation over the Quality Check frame.
+    Font names match case-insensitively; colours are compared as upper-case hex.
+    """
+
+    def __init__(self, name, fonts, font_colours, fill_colours, colour_names=None,
+                 placeholder_defaults=None, textbox_default=None, description=""):
+        self.name = name
+        self.description = description
+        self.fonts = {}  # casefolded name -> (display name, min size, max size)
+        for font, size_range in fonts.items():
+            low, high = size_range if size_range else (None, None)
+            self.fonts[font.strip().casefold()] = (
+                font, -math.inf if low is None else float(low), math.inf if high is None else float(high)
+            )
+        self.font_colours = {colour.upper() for colour in font_colours}
+        self.fill_colours = {colour.upper() for colour in fill_colours}
+        self.colour_names = {colour.upper(): label for colour, label in (colour_names or {}).items()}
+        self.placeholder_defaults = {
+            (entry["shape"], entry["type"]): (entry["font"], entry["size"]) for entry in placeholder_defaults or []
+        }
+        self.textbox_default = (textbox_default["font"], textbox_default["size"]) if textbox_default else None
+        self._min_size = {key: low for key, (_, low, _) in self.fonts.items()}
+        self._max_size = {key: high for key, (_, _, high) in self.fonts.items()}
+
+    @classmethod
+    def from_dict(cls, data, name=None):
+        try:
+            return cls(
+                name=data.get("name") or name,
+                fonts=data["fonts"],
+                font_colours=data.get("font_colours", []),
+                fill_colours=data.get("fill_colours", []),
+                colour_names=data.get("colour_names"),
+                placeholder_defaults=data.get("placeholder_defaults"),
+                textbox_default=data.get("textbox_default"),
+                description=data.get("description", ""),
+            )
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Invalid style profile {name or data.get('name')!r}: {e}") from e
+
+    def colour_name(self, hex_colour):
+        return self.colour_names.get(hex_colour.upper(), "Custom")
+
+    def evaluate(self, df):
+        """
+        Per-row style verdicts for a Quality Check frame:
+        font/font_colour/fill_colour (normalised text), size (numeric),
+        font_ok, size_ok (approved font and size within its range),
+        font_colour_ok and fill_colour_ok.
+        """
+        font = _text(_column(df, "Font Name"))
+        key = font.str.casefold()
+        size = pd.to_numeric(_column(df, "Font Size"), errors="coerce")
+        font_colour = _text(_column(df, "Font Color Hex")).str.upper()
+        fill_colour = _text(_column(df, "Fill Color Hex")).str.upper()
+
+        font_ok = key.isin(self.fonts.keys())
+        # NaN bounds for unapproved fonts make between() false, as does a missing size
+        size_ok = font_ok & size.between(key.map(self._min_size), key.map(self._max_size))
+        return pd.DataFrame({
+            "font": font,
+            "size": size,
+            "font_colour": font_colour,
+            "fill_colour": fill_colour,
+            "font_ok": font_ok,
+            "size_ok": size_ok.fillna(False).astype(bool),
+            "font_colour_ok": font_colour.isin(self.font_colours),
+            "fill_colour_ok": fill_colour.isin(self.fill_colours),
+        }, index=df.index)
+
+
+# === LOADING ===
+class _ProfileEntry:
+    def __init__(self, path):
+        self.path = path
+        self.stat = None
+        self.profile = None
+        self.checked_at = 0.0
+
+
+_profiles = {}
+_profiles_lock = threading.Lock()
+
+
+def profile_path(name, directory=PROFILE_DIR):
+    if not name or os.path.basename(name) != name or name.startswith("."):
+        raise UnknownProfile(f"Invalid style profile name {name!r}")
+    return os.path.join(directory, f"{name}.json")
+
+
+def available_profiles(directory=PROFILE_DIR):
+    if not os.path.isdir(directory):
+        return []
+    return sorted(os.path.splitext(name)[0] for name in os.listdir(directory) if name.endswith(".json"))
+
+
+def get_profile(profile=None):
+    """
+    The compiled profile for a name (or the default profile for None). Each
+    profile is parsed once and recompiled only when its file changes; a
+    StyleProfile passed in is returned as is.
+    """
+    if isinstance(profile, StyleProfile):
+        return profile
+    name = profile or DEFAULT_PROFILE
+    path = profile_path(name)
+    with _profiles_lock:
+        entry = _profiles.setdefault(path, _ProfileEntry(path))
+        now = time.monotonic()
+        if entry.profile is not None and now - entry.checked_at < RELOAD_CHECK_SECONDS:
+            return entry.profile
+        entry.checked_at = now
+        try:
+            stat = os.stat(path)
+        except OSError:
+            raise UnknownProfile(f"No style profile named {name!r}; available: {', '.join(available_profiles())}")
+        if (stat.st_mtime_ns, stat.st_size) != entry.stat:
+            with open(path, encoding="utf-8") as f:
+                entry.profile = StyleProfile.from_dict(json.load(f), name=name)
+            entry.stat = (stat.st_mtime_ns, stat.st_size)
+        return entry.profile
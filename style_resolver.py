@@ -0,0 +1,396 @@
+"""
+Effective text styles for every run, resolved through PowerPoint's inheritance chain:
+
+    run -> paragraph -> shape (lstStyle, p:style) -> layout placeholder
+        -> master placeholder -> master text styles -> presentation defaults -> theme
+
+Everything below the shape is the same for every shape on the same layout
+placeholder, so it is merged once per (layout, placeholder, level); each
+master's text styles, colour map and theme are parsed once per deck. A shape
+then only merges its own few properties on top.
+"""
+import colorsys
+from typing import NamedTuple
+from lxml import etree
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.oxml.ns import qn
+
+LEVELS = 9
+# PowerPoint's size when nothing in the chain sets one
+DEFAULT_FONT_SIZE = 18.0
+TITLE_TYPES = {"title", "ctrTitle"}
+OTHER_TYPES = {"dt", "ftr", "sldNum", "hdr"}
+# Slide/layout placeholder type -> the master placeholder it inherits from
+MASTER_PLACEHOLDER = {"ctrTitle": "title", "subTitle": "body", "obj": "body"}
+DEFAULT_CLR_MAP = {
+    "bg1": "lt1", "tx1": "dk1", "bg2": "lt2", "tx2": "dk2", "accent1": "accent1", "accent2": "accent2",
+    "accent3": "accent3", "accent4": "accent4", "accent5": "accent5", "accent6": "accent6",
+    "hlink": "hlink", "folHlink": "folHlink",
+}
+THEME_FONTS = {"+mj-lt": "major", "+mn-lt": "minor"}
+OTHER_FILLS = {"noFill", "gradFill", "blipFill", "pattFill", "grpFill"}
+EMPTY_LEVELS = ({},) * LEVELS
+
+# Clark-notation tags, built once rather than per lookup
+A_LATIN, A_LST_STYLE, A_LN = qn("a:latin"), qn("a:lstStyle"), qn("a:ln")
+A_DEF_PPR, A_DEF_RPR, A_PPR, A_RPR = qn("a:defPPr"), qn("a:defRPr"), qn("a:pPr"), qn("a:rPr")
+A_P, A_R, A_FLD, A_T = qn("a:p"), qn("a:r"), qn("a:fld"), qn("a:t")
+A_LEVEL_PPRS = tuple(qn(f"a:lvl{level}pPr") for level in range(1, LEVELS + 1))
+P_TX_BODY, P_SP_PR, P_SP = qn("p:txBody"), qn("p:spPr"), qn("p:sp")
+PH_PATH = f"{qn('p:nvPr')}/{qn('p:ph')}"
+STYLE_REFS = {ref: f"{qn('p:style')}/{qn(f'a:{ref}')}" for ref in ("fontRef", "fillRef", "lnRef")}
+
+
+class RunStyle(NamedTuple):
+    """One run, or several adjacent runs of a paragraph that resolve to the same style."""
+    paragraph: int
+    run: int
+    text: str
+    font: str
+    size: float
+    colour: str
+    source: str  # the level that set the font: run, paragraph, shape, layout, master, presentation or theme
+
+
+# === XML HELPERS ===
+def _children(element):
+    return element.iterchildren(etree.Element)
+
+
+def _colour_spec(element):
+    """(kind, value, modifiers) for a colour choice element such as a:srgbClr or a:schemeClr."""
+    tag = etree.QName(element).localname
+    if tag == "sysClr":
+        tag, value = "srgbClr", element.get("lastClr")
+    elif tag in ("srgbClr", "schemeClr"):
+        value = element.get("val")
+    else:
+        return None
+    if not value:
+        return None
+    modifiers = tuple((etree.QName(m).localname, int(m.get("val", 0))) for m in _children(element))
+    return tag, value, modifiers
+
+
+def _solid_fill(parent):
+    """Colour spec of a:solidFill under parent; False if another fill is set there, None if no fill is."""
+    if parent is None:
+        return None
+    for child in _children(parent):
+        tag = etree.QName(child).localname
+        if tag == "solidFill":
+            choice = next(_children(child), None)
+            return None if choice is None else _colour_spec(choice)
+        if tag in OTHER_FILLS:
+            return False
+    return None
+
+
+def _text_props(rpr):
+    """{font, size, colour} set directly on an a:rPr or a:defRPr."""
+    if rpr is None:
+        return {}
+    props = {}
+    latin = rpr.find(A_LATIN)
+    if latin is not None and latin.get("typeface"):
+        props["font"] = latin.get("typeface")
+    if rpr.get("sz"):
+        props["size"] = int(rpr.get("sz")) / 100
+    colour = _solid_fill(rpr)
+    if colour:
+        props["colour"] = colour
+    return props
+
+
+def _list_style(element):
+    """Per-level run defaults (levels 1-9) of an a:lstStyle, p:bodyStyle or similar list style."""
+    if element is None or len(element) == 0:
+        return EMPTY_LEVELS
+    default_ppr = element.find(A_DEF_PPR)
+    default = _text_props(None if default_ppr is None else default_ppr.find(A_DEF_RPR))
+    levels = []
+    for tag in A_LEVEL_PPRS:
+        ppr = element.find(tag)
+        props = _text_props(None if ppr is None else ppr.find(A_DEF_RPR))
+        levels.append({**default, **props})
+    return tuple(levels)
+
+
+def _shape_list_style(sp):
+    tx_body = sp.find(P_TX_BODY)
+    return _list_style(None if tx_body is None else tx_body.find(A_LST_STYLE))
+
+
+def _placeholder(sp):
+    """(type, idx) of a placeholder shape element, or None for any other shape."""
+    nv = next(_children(sp), None)
+    ph = None if nv is None else nv.find(PH_PATH)
+    if ph is None:
+        return None
+    return ph.get("type", "obj"), ph.get("idx")
+
+
+def _clr_map(element, default=None):
+    if element is None:
+        return default
+    return {**DEFAULT_CLR_MAP, **dict(element.attrib)}
+
+
+def _clr_map_override(part_element, default):
+    override = part_element.find(f"{qn('p:clrMapOvr')}/{qn('a:overrideClrMapping')}")
+    return _clr_map(override, default)
+
+
+def _apply_modifiers(rgb, modifiers):
+    """Applies the common DrawingML colour transforms (lumMod/lumOff, tint, shade); others are ignored."""
+    r, g, b = (int(rgb[i:i + 2], 16) / 255 for i in (0, 2, 4))
+    for name, value in modifiers:
+        amount = value / 100000
+        if name in ("lumMod", "lumOff"):
+            h, l, s = colorsys.rgb_to_hls(r, g, b)
+            l = l * amount if name == "lumMod" else l + amount
+            r, g, b = colorsys.hls_to_rgb(h, min(max(l, 0.0), 1.0), s)
+        elif name == "tint":
+            r, g, b = (c + (1 - c) * (1 - amount) for c in (r, g, b))
+        elif name == "shade":
+            r, g, b = (c * amount for c in (r, g, b))
+    return "".join(f"{round(min(max(c, 0.0), 1.0) * 255):02X}" for c in (r, g, b))
+
+
+def _merge(levels):
+    """First value of each property down a chain of (level name, props); returns (props, {property: level name})."""
+    props, sources = {}, {}
+    for name, level in levels:
+        for key, value in level.items():
+            if key not in props:
+                props[key] = value
+                sources[key] = name
+    return props, sources
+
+
+# === MASTER / LAYOUT LEVELS ===
+class _MasterStyles:
+    def __init__(self, master_part):
+        element = master_part._element
+        tx_styles = element.find(qn("p:txStyles"))
+        self.styles = {
+            kind: _list_style(None if tx_styles is None else tx_styles.find(qn(f"p:{kind}Style")))
+            for kind in ("title", "body", "other")
+        }
+        self.placeholders = {}
+        for sp in element.iter(P_SP):
+            ph = _placeholder(sp)
+            if ph is not None:
+                self.placeholders.setdefault(ph[0], _shape_list_style(sp))
+        self.clr_map = _clr_map(element.find(qn("p:clrMap")), dict(DEFAULT_CLR_MAP))
+        self.scheme, self.fonts = {}, {}
+        try:
+            theme = etree.fromstring(master_part.part_related_by(RT.THEME).blob)
+        except (KeyError, etree.XMLSyntaxError):
+            return
+        for scheme in theme.iter(qn("a:clrScheme")):
+            for entry in _children(scheme):
+                choice = next(_children(entry), None)
+                spec = None if choice is None else _colour_spec(choice)
+                if spec and spec[0] == "srgbClr":
+                    self.scheme[etree.QName(entry).localname] = spec
+            break
+        for kind in ("major", "minor"):
+            latin = theme.find(f".//{qn(f'a:{kind}Font')}/{qn('a:latin')}")
+            if latin is not None and latin.get("typeface"):
+                self.fonts[kind] = latin.get("typeface")
+
+    def placeholder(self, ph_type):
+        ph_type = MASTER_PLACEHOLDER.get(ph_type, ph_type)
+        if ph_type in self.placeholders:
+            return self.placeholders[ph_type]
+        return self.placeholders.get("body", EMPTY_LEVELS) if ph_type not in OTHER_TYPES else EMPTY_LEVELS
+
+    @staticmethod
+    def style_kind(ph_type):
+        if ph_type is None or ph_type in OTHER_TYPES:
+            return "other"
+        return "title" if ph_type in TITLE_TYPES else "body"
+
+
+class _LayoutStyles:
+    def __init__(self, layout_part, master):
+        element = layout_part._element
+        self.master = master
+        self.clr_map = _clr_map_override(element, master.clr_map)
+        self.by_idx, self.by_type = {}, {}
+        for sp in element.iter(P_SP):
+            ph = _placeholder(sp)
+            if ph is None:
+                continue
+            levels = _shape_list_style(sp)
+            self.by_type.setdefault(ph[0], (ph[0], levels))
+            if ph[1] is not None:
+                self.by_idx.setdefault(ph[1], (ph[0], levels))
+
+    def placeholder(self, ph_type, idx):
+        """(layout placeholder type, levels) for a slide placeholder: by idx, then by type."""
+        if idx is not None and idx in self.by_idx:
+            return self.by_idx[idx]
+        if ph_type in self.by_type:
+            return self.by_type[ph_type]
+        if ph_type in TITLE_TYPES:
+            for title_type in sorted(TITLE_TYPES):
+                if title_type in self.by_type:
+                    return self.by_type[title_type]
+        return ph_type, EMPTY_LEVELS
+
+
+# === RESOLVER ===
+class StyleResolver:
+    """
+    Resolves run styles for the slides of one deck. Layout, master and theme
+    levels are memoised by part name, so use one resolver per deck.
+    """
+
+    def __init__(self):
+        self._masters = {}
+        self._layouts = {}
+        self._slides = {}
+        self._bases = {}
+        self._colours = {}
+        self._presentation_styles = None
+
+    def _slide(self, slide_part):
+        """(layout key, layout levels, colour map) for a slide, read once per slide."""
+        if slide_part not in self._slides:
+            layout_part = slide_part.part_related_by(RT.SLIDE_LAYOUT)
+            key = str(layout_part.partname)
+            if key not in self._layouts:
+                master_part = layout_part.part_related_by(RT.SLIDE_MASTER)
+                master_key = str(master_part.partname)
+                if master_key not in self._masters:
+                    self._masters[master_key] = _MasterStyles(master_part)
+                self._layouts[key] = _LayoutStyles(layout_part, self._masters[master_key])
+            if self._presentation_styles is None:
+                element = slide_part.package.presentation_part._element
+                self._presentation_styles = _list_style(element.find(qn("p:defaultTextStyle")))
+            layout = self._layouts[key]
+            self._slides[slide_part] = (key, layout, _clr_map_override(slide_part._element, layout.clr_map))
+        return self._slides[slide_part]
+
+    def _base(self, layout_key, layout, ph, level):
+        """Merged props and sources of every level below the shape, once per (layout, placeholder, level)."""
+        key = (layout_key, ph, level)
+        if key not in self._bases:
+            master = layout.master
+            presentation = self._presentation_styles[level]
+            if ph is None:
+                chain = [("presentation", presentation), ("master", master.styles["other"][level])]
+                kind = "other"
+            else:
+                layout_type, layout_levels = layout.placeholder(*ph)
+                kind = master.style_kind(layout_type)
+                chain = [
+                    ("layout", layout_levels[level]),
+                    ("master", master.placeholder(layout_type)[level]),
+                    ("master", master.styles[kind][level]),
+                    ("presentation", presentation),
+                ]
+            self._bases[key] = (_merge(chain), kind)
+        return self._bases[key]
+
+    def colour_hex(self, spec, master, clr_map):
+        """'#RRGGBB' for a colour spec, with scheme colours looked up in the master's theme."""
+        if not spec:
+            return ""
+        key = (spec, id(master), id(clr_map))
+        if key not in self._colours:
+            kind, value, modifiers = spec
+            if kind == "schemeClr":
+                base = master.scheme.get(clr_map.get(value, value))
+                value, modifiers = (base[1], base[2] + modifiers) if base else (None, ())
+            try:
+                self._colours[key] = "#" + _apply_modifiers(value, modifiers) if value else ""
+            except ValueError:
+                self._colours[key] = ""
+        return self._colours[key]
+
+    def shape_runs(self, shape):
+        """Compact RunStyle records for every run with text in a shape's text frame."""
+        sp = shape._element
+        tx_body = sp.find(P_TX_BODY)
+        if tx_body is None:
+            return []
+        layout_key, layout, clr_map = self._slide(shape.part)
+        master = layout.master
+        ph = _placeholder(sp)
+        shape_levels = _shape_list_style(sp)
+        font_ref = sp.find(STYLE_REFS["fontRef"])
+        style_props = {}
+        if font_ref is not None:
+            if font_ref.get("idx") in ("major", "minor"):
+                style_props["font"] = "+mj-lt" if font_ref.get("idx") == "major" else "+mn-lt"
+            choice = next(_children(font_ref), None)
+            colour = None if choice is None else _colour_spec(choice)
+            if colour:
+                style_props["colour"] = colour
+
+        records = []
+        for p_index, paragraph in enumerate(tx_body.iterchildren(A_P)):
+            ppr = paragraph.find(A_PPR)
+            level = min(max(int(ppr.get("lvl", 0)) if ppr is not None else 0, 0), LEVELS - 1)
+            para_props = _text_props(None if ppr is None else ppr.find(A_DEF_RPR))
+            (base_props, base_sources), kind = self._base(layout_key, layout, ph, level)
+            previous = None
+            for r_index, run in enumerate(paragraph.iterchildren(A_R, A_FLD)):
+                text_element = run.find(A_T)
+                text = text_element.text if text_element is not None and text_element.text else ""
+                if not text.strip():
+                    # Whitespace takes no visible style; it joins the run before it
+                    if previous is not None:
+                        records[-1] = previous = previous._replace(text=previous.text + text)
+                    continue
+                props, sources = _merge([
+                    ("run", _text_props(run.find(A_RPR))),
+                    ("paragraph", para_props),
+                    ("shape", shape_levels[level]),
+                    ("shape", style_props),
+                    ("base", base_props),
+                ])
+                if sources.get("font") == "base":
+                    sources["font"] = base_sources["font"]
+                record = self._record(p_index, r_index, text, props, sources, kind, master, clr_map)
+                if previous is not None and previous[3:6] == record[3:6]:
+                    records[-1] = previous = previous._replace(text=previous.text + text)
+                else:
+                    records.append(record)
+                    previous = record
+        return records
+
+    def _record(self, p_index, r_index, text, props, sources, kind, master, clr_map):
+        font = props.get("font")
+        source = sources.get("font", "theme")
+        if font in THEME_FONTS:
+            font = master.fonts.get(THEME_FONTS[font])
+            source = "theme"
+        elif font is None:
+            font = master.fonts.get("major" if kind == "title" else "minor")
+        colour = self.colour_hex(props.get("colour") or ("schemeClr", "tx1", ()), master, clr_map)
+        return RunStyle(p_index, r_index, text, font or "", props.get("size", DEFAULT_FONT_SIZE), colour, source)
+
+    def shape_fill(self, shape):
+        """Hex fill colour of a shape: its own solid fill, else its p:style fill reference."""
+        return self._shape_colour(shape, shape._element.find(P_SP_PR), "fillRef")
+
+    def shape_line(self, shape):
+        sp_pr = shape._element.find(P_SP_PR)
+        return self._shape_colour(shape, None if sp_pr is None else sp_pr.find(A_LN), "lnRef")
+
+    def _shape_colour(self, shape, parent, style_ref):
+        spec = _solid_fill(parent)
+        if spec is None:
+            ref = shape._element.find(STYLE_REFS[style_ref])
+            if ref is None or ref.get("idx", "0") == "0":
+                return ""
+            choice = next(_children(ref), None)
+            spec = None if choice is None else _colour_spec(choice)
+        if not spec:
+            return ""
+        _, layout, clr_map = self._slide(shape.part)
+        return self.colour_hex(spec, layout.master, clr_map)
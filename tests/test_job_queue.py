@@ -0,0 +1,91 @@
+import threading
+import time
+
+from job_queue import DONE, FAILED, QUEUED, RUNNING, JobQueue, JobStore
+
+
+def _store(tmp_path):
+    return JobStore(str(tmp_path / "jobs.sqlite3"))
+
+
+def test_start_leaves_jobs_leased_by_a_live_worker(tmp_path):
+    store = _store(tmp_path)
+    release = threading.Event()
+    started = threading.Event()
+    runs = []
+
+    def runner(path_a, path_b, output_path, work_dir=None, progress=None, profile=None):
+        runs.append(path_b)
+        started.set()
+        release.wait(5)
+
+    first = JobQueue(runner, store=store, workers=1).start()
+    job_id = first.submit("a.pptx", "b.pptx", str(tmp_path), str(tmp_path / "out.xlsx"))
+    assert started.wait(5)
+
+    # A second server process starting up against the same store
+    second = JobQueue(runner, store=store, workers=1).start()
+    time.sleep(0.2)
+    assert store.get(job_id)["status"] == RUNNING
+    assert store.get(job_id)["owner"] == first.owner
+
+    release.set()
+    for _ in range(50):
+        if store.get(job_id)["status"] == DONE:
+            break
+        time.sleep(0.1)
+    first.stop(5)
+    second.stop(5)
+    assert store.get(job_id)["status"] == DONE
+    assert runs == ["b.pptx"]
+
+
+def test_expired_lease_is_requeued_then_failed_after_max_attempts(tmp_path):
+    store = _store(tmp_path)
+    store.add("job", "a.pptx", "b.pptx", str(tmp_path), str(tmp_path / "out.xlsx"))
+    for attempt in range(1, 3):
+        job = store.claim("dead-worker", lease_seconds=-1, max_attempts=2)
+        assert job["attempts"] == attempt
+        requeued, failed = store.recover_expired(max_attempts=2)
+        assert (requeued, failed) == ((1, 0) if attempt < 2 else (0, 1))
+    job = store.get("job")
+    assert job["status"] == FAILED and "2 time(s)" in job["error"]
+    assert store.claim("other-worker") is None
+
+
+def test_stale_owner_cannot_finish_a_reclaimed_job(tmp_path):
+    store = _store(tmp_path)
+    store.add("job", "a.pptx", "b.pptx", str(tmp_path), str(tmp_path / "out.xlsx"))
+    store.claim("old-worker", lease_seconds=-1)
+    assert store.claim("new-worker")["owner"] == "new-worker"
+    store.finish("job", "old-worker", error="late failure")
+    assert store.get("job")["status"] == RUNNING
+    store.finish("job", "new-worker")
+    assert store.get("job")["status"] == DONE
+
+
+def test_renew_leases_extends_only_the_owners_jobs(tmp_path):
+    store = _store(tmp_path)
+    store.add("job", "a.pptx", "b.pptx", str(tmp_path), str(tmp_path / "out.xlsx"))
+    store.claim("worker", lease_seconds=1)
+    before = store.get("job")["lease_until"]
+    assert store.renew_leases("someone-else", lease_seconds=100) == 0
+    assert store.renew_leases("worker", lease_seconds=100) == 1
+    assert store.get("job")["lease_until"] > before
+    assert store.recover_expired() == (0, 0)
+    assert store.get("job")["status"] != QUEUED
+
+
+def test_job_profile_reaches_the_runner(tmp_path):
+    store = _store(tmp_path)
+    seen = {}
+
+    def runner(path_a, path_b, output_path, work_dir=None, progress=None, profile=None):
+        seen["profile"] = profile
+
+    queue = JobQueue(runner, store=store, workers=0)
+    queue.owner = "worker"
+    job_id = queue.submit("a.pptx", "b.pptx", str(tmp_path), str(tmp_path / "out.xlsx"), profile="brand")
+    queue.run_job(store.claim("worker"))
+    assert store.get(job_id)["status"] == DONE
+    assert seen == {"profile": "brand"}
@@ -0,0 +1,53 @@
+import notes_alignment
+from notes_alignment import align_dp, align_greedy, align_notes, tokenise_notes
+
+
+def _decks(n, m, stride):
+    """n script notes, each repeated on every stride-th of m deck slides; the other slides hold filler."""
+    notes_a = [(i + 1, f"topic{i} alpha{i} beta{i} gamma{i}") for i in range(n)]
+    notes_b = []
+    for j in range(m):
+        if j % stride == 0 and j // stride < n:
+            notes_b.append((j + 1, notes_a[j // stride][1]))
+        else:
+            notes_b.append((j + 1, f"filler{j} words{j}"))
+    return notes_a, notes_b
+
+
+def _align(notes_a, notes_b):
+    return align_dp(tokenise_notes(notes_a), tokenise_notes(notes_b))
+
+
+def test_one_note_against_a_long_deck_maps_to_the_first_slide():
+    notes_a, notes_b = _decks(1, 50, 50)
+    assert _align(notes_a, notes_b) == [(0, 1)]
+
+
+def test_file_b_much_longer_than_file_a():
+    for n, m in [(1, 100), (2, 200), (5, 500)]:
+        stride = m // n
+        notes_a, notes_b = _decks(n, m, stride)
+        assert _align(notes_a, notes_b) == [(i * stride, i * stride + 1) for i in range(n)], (n, m)
+
+
+def test_file_a_longer_than_file_b():
+    notes_a, notes_b = _decks(6, 3, 1)
+    mapping = _align(notes_a, notes_b)
+    assert len(mapping) == 6
+    assert mapping[:3] == [(0, 1), (1, 2), (2, 3)]
+    assert all(start == end for start, end in mapping[3:])
+
+
+def test_unreachable_band_falls_back_to_greedy(monkeypatch):
+    notes_a, notes_b = _decks(2, 200, 100)
+    tokens_a, tokens_b = tokenise_notes(notes_a), tokenise_notes(notes_b)
+    # A band that never reaches the last B note
+    monkeypatch.setattr(notes_alignment, "_band", lambda i, n, m, width: (0, min(m - 1, 2)))
+    assert align_dp(tokens_a, tokens_b) == align_greedy(tokens_a, tokens_b)
+
+
+def test_align_notes_rows_for_unequal_decks():
+    notes_a, notes_b = _decks(2, 120, 60)
+    rows = align_notes(notes_a, notes_b)
+    assert [row[2] for row in rows] == [[1], [61]]
+    assert all(not row[3] and not row[4] for row in rows)
@@ -0,0 +1,41 @@
+import results_store
+import slide_cache
+from benchmarks.stub_model import install_stub_model
+from benchmarks.synthetic_deck import DeckSpec, build_pair
+from qc_pipeline import run_qc_results
+from qc_results import SHEET_KEYS, SLIDE_SHEETS, _rows_by_slide, frame_records, stream_qc_results
+
+
+def _deck_pair(tmp_path, monkeypatch, slides=5):
+    install_stub_model()
+    # Every slide is computed fresh, and no run lands in the working tree's history
+    monkeypatch.setattr(slide_cache, "CACHE_ENABLED", False)
+    monkeypatch.setattr(results_store, "_history", results_store.ResultsHistory(str(tmp_path / "history")))
+    return build_pair(str(tmp_path), DeckSpec(slides=slides, shapes_per_slide=3, vo_words=20))
+
+
+def test_stream_sends_start_notes_slides_then_done(tmp_path, monkeypatch):
+    path_a, path_b = _deck_pair(tmp_path, monkeypatch)
+    events = list(stream_qc_results(path_a, path_b, str(tmp_path), chunk_slides=2, record_history=False))
+
+    assert [event["type"] for event in events] == ["start", "notes"] + ["slide"] * 5 + ["done"]
+    assert events[0]["slides"] == 5
+    assert [event["slide"] for event in events[2:-1]] == [1, 2, 3, 4, 5]
+    assert events[-1]["slides"] == 5
+
+
+def test_slide_events_match_the_full_report_rows(tmp_path, monkeypatch):
+    path_a, path_b = _deck_pair(tmp_path, monkeypatch, slides=6)
+    events = list(stream_qc_results(path_a, path_b, str(tmp_path), chunk_slides=4, record_history=False))
+    sheets = {SHEET_KEYS[name]: df for name, df in run_qc_results(path_a, path_b, work_dir=str(tmp_path))}
+
+    expected = {key: _rows_by_slide(sheets[key], column) for key, column in SLIDE_SHEETS.items()}
+    slide_events = [event for event in events if event["type"] == "slide"]
+    assert len(slide_events) == 6 and expected["quality_check"] and expected["slide_points"]
+    for event in slide_events:
+        for key in SLIDE_SHEETS:
+            assert event[key] == expected[key].get(event["slide"], []), (event["slide"], key)
+
+    notes = next(event for event in events if event["type"] == "notes")
+    for key in ("notes_a", "notes_b", "comparison"):
+        assert notes[key] == frame_records(sheets[key])
@@ -1,12 +1,7 @@
 import re
 import pandas as pd
-from pptx import Presentation
-
-# Load US → UK dictionary once
-def load_us_to_uk_dict(csv_path="us_to_uk_dictionary.csv"):
-    df = pd.read_csv(csv_path)
-    return {row["American"].strip().lower(): row["British"].strip().lower()
-            for _, row in df.iterrows() if pd.notna(row["American"]) and pd.notna(row["British"])}
+from deck_model import as_deck
+from spelling_dictionary import DICTIONARY_PATH, get_dictionary_service
 
 # Contraction patterns
 contractions_re = re.compile(r"\b(?:[A-Za-z]+n’t|'s|'re|'ve|'ll|'d|'m)\b", re.IGNORECASE)
@@ -16,13 +11,16 @@ extra_space_re = re.compile(r"\s{2,}")
 def clean_text(text):
     return text.replace("\n", " ").strip()
 
-def scan_text_issues(pptx_path, dictionary_path="us_to_uk_dictionary.csv"):
-    prs = Presentation(pptx_path)
-    us_to_uk = load_us_to_uk_dict(dictionary_path)
-    word_re = re.compile(r'\b(' + '|'.join(re.escape(word) for word in us_to_uk.keys()) + r')\b', re.IGNORECASE)
+def scan_text_issues(source, dictionary_path=DICTIONARY_PATH):
+    deck = as_deck(source)
+    # The service's compiled matcher, shared across calls and rebuilt only when the CSV changes
+    service = get_dictionary_service(dictionary_path)
+    service.refresh()
+    matcher = service.matcher
 
     findings = []
-    for slide_idx, slide in enumerate(prs.slides, 1):
+    for slide in deck.slides:
+        slide_idx = slide.number
         entries = []
 
         # Extract content from slide
@@ -31,10 +29,9 @@ def scan_text_issues(pptx_path, dictionary_path="us_to_uk_dictionary.csv"):
                 entries.append(("Content", shape.text.strip()))
 
         # Extract content from notes
-        if slide.has_notes_slide and slide.notes_slide.notes_text_frame:
-            notes = slide.notes_slide.notes_text_frame.text.strip()
-            if notes:
-                entries.append(("Notes", notes))
+        notes = slide.notes_text.strip()
+        if notes:
+            entries.append(("Notes", notes))
 
         # Analyze all extracted text
         for loc_type, text in entries:
@@ -44,7 +41,7 @@ def scan_text_issues(pptx_path, dictionary_path="us_to_uk_dictionary.csv"):
             contractions = contractions_re.findall(text_clean)
             periods = period_re.findall(text_clean)
             extra_spaces = extra_space_re.findall(text_clean)
-            us_words = [m.group() for m in word_re.finditer(text_clean)]
+            us_words = [text_clean[start:end] for start, end, _, _ in matcher.find(text_clean, overlapping=False)]
 
             if contractions or periods or extra_spaces or us_words:
                 findings.append({
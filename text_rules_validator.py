@@ -1,9 +1,7 @@
 import re
+import numpy as np
 import pandas as pd
-from us2uk_QC import load_us_to_uk_dict, detect_us_words
-
-# Load US to UK dictionary
-us_uk_dict = load_us_to_uk_dict()
+from spelling_dictionary import get_dictionary_service
 
 # Pattern to detect contractions with smart (’) and straight (') apostrophes
 CONTRACTION_PATTERN = re.compile(
@@ -15,7 +13,8 @@ def has_contraction(text):
     return bool(CONTRACTION_PATTERN.search(text))
 
 def has_us_spelling(text):
-    return detect_us_words(text, us_uk_dict)
+    # Compiled matcher from the shared service; reloads if the CSV is edited
+    return get_dictionary_service().detect(text)
 
 def has_extra_spaces(text):
     return "  " in text
@@ -23,37 +22,62 @@ def has_extra_spaces(text):
 def has_ending_period(text):
     return text.strip().endswith(".")
 
+MID_SENTENCE_PERIOD_PATTERN = re.compile(r"(?<!^)\.(?!$)")
+
 def has_mid_sentence_period(text):
-    return bool(re.search(r"(?<!^)\.(?!$)", text))
+    return bool(MID_SENTENCE_PERIOD_PATTERN.search(text))
+
+# === COLUMNAR RULES ENGINE ===
+# Output column -> rule over the whole stripped "Extracted Text" Series.
+# A rule returns a bool Series (reported as "Yes"/"") or a string Series (reported as is).
+TEXT_RULES = {}
+
+def register_text_rule(column, rule):
+    TEXT_RULES[column] = rule
+
+def us_spelling_rule(texts):
+    # Shape text repeats heavily across a deck, so each distinct string is scanned once
+    service = get_dictionary_service()
+    found = {text: ", ".join(service.detect(text)) for text in texts.unique()}
+    return texts.map(found)
+
+register_text_rule("Contraction Used", lambda texts: texts.str.contains(CONTRACTION_PATTERN))
+register_text_rule("US English Used", us_spelling_rule)
+register_text_rule("Extra Space", lambda texts: texts.str.contains("  ", regex=False))
+register_text_rule("Ending Period Used", lambda texts: texts.str.endswith("."))
+register_text_rule("Mid Sentence Period Used", lambda texts: texts.str.contains(MID_SENTENCE_PERIOD_PATTERN))
+
+def evaluate_text_rules(texts):
+    """Runs every registered rule over a Series of stripped texts; returns a typed flags frame."""
+    flags = {}
+    for column, rule in TEXT_RULES.items():
+        values = rule(texts)
+        flags[column] = values.astype(bool) if values.dtype == bool else values.astype("string")
+    return pd.DataFrame(flags, index=texts.index)
 
 def run_text_rules_validation(df_qc):
     if "Extracted Text" not in df_qc.columns:
         return pd.DataFrame([{"Error": "Missing 'Extracted Text' column in QC sheet"}])
 
-    result = []
-    for _, row in df_qc.iterrows():
-        text = str(row.get("Extracted Text", "")).strip()
-
-        # Skip completely empty lines
-        if not text:
-            continue
-
-        contraction_found = has_contraction(text)
-        us_words = has_us_spelling(text)
-
-        result.append({
-            "File Name": row.get("File Name", ""),
-            "Slide Number": row.get("Slide Number", ""),
-            "Shape Name / Table Cell": row.get("Shape Name / Table Cell", ""),
-            "Extracted Text": text,
-            "Contraction Used": "Yes" if contraction_found else "",
-            "US English Used": ", ".join(us_words) if us_words else "",
-            "Extra Space": "Yes" if has_extra_spaces(text) else "",
-            "Ending Period Used": "Yes" if has_ending_period(text) else "",
-            "Mid Sentence Period Used": "Yes" if has_mid_sentence_period(text) else ""
-        })
-
-    return pd.DataFrame(result)
+    texts = df_qc["Extracted Text"].astype(str).str.strip()
+
+    # Skip completely empty lines
+    keep = texts != ""
+    rows, texts = df_qc[keep], texts[keep]
+    flags = evaluate_text_rules(texts)
+
+    result = pd.DataFrame({
+        column: rows[column] if column in rows.columns else ""
+        for column in ("File Name", "Slide Number", "Shape Name / Table Cell")
+    }, index=rows.index)
+    result["Extracted Text"] = texts
+    for column in flags.columns:
+        if flags[column].dtype == bool:
+            result[column] = np.where(flags[column], "Yes", "")
+        else:
+            result[column] = flags[column].astype(object)
+
+    return result.reset_index(drop=True)
 
 # Debug mode
 if __name__ == "__main__":
@@ -1,13 +1,284 @@
+import copy
+import math
 import os
-import pythoncom
-import win32com.client
+import re
+import shutil
+import struct
+import zipfile
+from lxml import etree
 
+NS = {
+    "p": "http://schemas.openxmlformats.org/presentationml/2006/main",
+    "a": "http://schemas.openxmlformats.org/drawingml/2006/main",
+    "mc": "http://schemas.openxmlformats.org/markup-compatibility/2006",
+}
+P = "{%s}" % NS["p"]
+A = "{%s}" % NS["a"]
+MC = "{%s}" % NS["mc"]
 
-def ungroup_shapes_in_ppt(input_path, output_path):
+SLIDE_PART_RE = re.compile(r"^ppt/slides/slide\d+\.xml$")
+FILL_TAGS = {A + "noFill", A + "solidFill", A + "gradFill", A + "blipFill", A + "pattFill"}
+FULL_CIRCLE = 21600000  # rotation unit is 1/60000 of a degree
+
+
+def ungroup_shapes_in_ppt(input_path, output_path, engine="native"):
     """
     Ungroups all grouped shapes (including nested) in a PowerPoint presentation.
     Saves the modified file to the specified output path.
+
+    engine="native" rewrites the slide XML in-process and runs anywhere;
+    engine="com" drives a desktop PowerPoint through pywin32 (Windows only).
+    """
+    if engine == "com":
+        return _ungroup_with_com(input_path, output_path)
+    if engine != "native":
+        raise ValueError(f"Unknown ungroup engine: {engine}")
+
+    try:
+        ungroup_package(input_path, output_path)
+    except Exception as e:
+        print(f"[Ungroup Error] Failed: {str(e)}")
+        # Keep the pipeline going on the original deck rather than a missing file
+        if os.path.abspath(input_path) != os.path.abspath(output_path):
+            shutil.copyfile(input_path, output_path)
+
+
+# === NATIVE OOXML ENGINE ===
+def ungroup_package(input_path, output_path):
+    """
+    Flattens every p:grpSp in the deck's slide parts and writes a new package.
+    Only slide parts that actually change are re-serialised; every other part
+    (media included) is copied across as its original compressed bytes.
+    Returns the number of groups removed.
     """
+    removed_total = 0
+    with zipfile.ZipFile(input_path) as zin, zipfile.ZipFile(output_path, "w") as zout:
+        for info in zin.infolist():
+            if SLIDE_PART_RE.match(info.filename):
+                root = etree.fromstring(zin.read(info))
+                removed = flatten_slide_groups(root)
+                if removed:
+                    removed_total += removed
+                    data = etree.tostring(root, xml_declaration=True, encoding="UTF-8", standalone=True)
+                    zout.writestr(_fresh_info(info), data, compress_type=zipfile.ZIP_DEFLATED)
+                    continue
+            _copy_raw_member(zin, zout, info)
+    return removed_total
+
+
+def flatten_slide_groups(sld):
+    """Ungroups all groups in a <p:sld> tree in place and returns how many were removed."""
+    sp_tree = sld.find("p:cSld/p:spTree", NS)
+    if sp_tree is None:
+        return 0
+    # Groups that are animation targets keep their effect only while they exist,
+    # so they are left intact (PowerPoint would otherwise drop the effect).
+    animated_ids = set(sld.xpath("p:timing//p:spTgt/@spid | p:timing//p:bldP/@spid", namespaces=NS))
+    return _flatten_container(sp_tree, animated_ids)
+
+
+def _flatten_container(container, animated_ids):
+    removed = 0
+    for child in list(container):
+        if child.tag != P + "grpSp":
+            continue
+        if _shape_id(child) in animated_ids:
+            removed += _flatten_container(child, animated_ids)
+            continue
+        removed += _flatten_container(child, animated_ids)
+        members = _group_members(child)
+        transform = GroupTransform.from_group(child)
+        group_fill = _group_fill(child)
+        index = container.index(child)
+        container.remove(child)
+        for offset, member in enumerate(members):
+            if transform is not None:
+                _transform_member(member, transform)
+            if group_fill is not None:
+                _resolve_group_fill(member, group_fill)
+            container.insert(index + offset, member)
+        removed += 1
+    return removed
+
+
+def _group_members(grp):
+    return [el for el in grp if el.tag not in (P + "nvGrpSpPr", P + "grpSpPr", P + "extLst")]
+
+
+def _shape_id(shape):
+    c_nv_pr = shape.find(".//p:cNvPr", NS)
+    return c_nv_pr.get("id") if c_nv_pr is not None else None
+
+
+def _group_fill(grp):
+    sp_pr = grp.find("p:grpSpPr", NS)
+    if sp_pr is None:
+        return None
+    for el in sp_pr:
+        if el.tag in FILL_TAGS:
+            return el
+    return None
+
+
+def _resolve_group_fill(member, group_fill):
+    # Children that inherit the group's fill must carry it themselves once the group is gone
+    for grp_fill in member.iter(A + "grpFill"):
+        grp_fill.getparent().replace(grp_fill, copy.deepcopy(group_fill))
+
+
+# === TRANSFORM MATH ===
+class GroupTransform:
+    """Maps a child's xfrm from the group's child space into the parent's space."""
+
+    def __init__(self, off, ext, ch_off, ch_ext, rot=0, flip_h=False, flip_v=False):
+        self.off = off
+        self.ext = ext
+        self.ch_off = ch_off
+        self.ch_ext = ch_ext
+        self.rot = rot
+        self.flip_h = flip_h
+        self.flip_v = flip_v
+
+    @classmethod
+    def from_group(cls, grp):
+        xfrm = grp.find("p:grpSpPr/a:xfrm", NS)
+        if xfrm is None:
+            return None
+        off = _point(xfrm.find("a:off", NS), "x", "y")
+        ext = _point(xfrm.find("a:ext", NS), "cx", "cy")
+        ch_off = _point(xfrm.find("a:chOff", NS), "x", "y", default=off)
+        ch_ext = _point(xfrm.find("a:chExt", NS), "cx", "cy", default=ext)
+        return cls(
+            off, ext, ch_off, ch_ext,
+            rot=int(xfrm.get("rot", 0)),
+            flip_h=xfrm.get("flipH") in ("1", "true"),
+            flip_v=xfrm.get("flipV") in ("1", "true"),
+        )
+
+    def apply(self, x, y, cx, cy, rot=0, flip_h=False, flip_v=False):
+        sx = self.ext[0] / self.ch_ext[0] if self.ch_ext[0] else 1.0
+        sy = self.ext[1] / self.ch_ext[1] if self.ch_ext[1] else 1.0
+
+        # Scale and offset out of the group's child coordinate space
+        new_cx, new_cy = cx * sx, cy * sy
+        center_x = self.off[0] + (x - self.ch_off[0]) * sx + new_cx / 2
+        center_y = self.off[1] + (y - self.ch_off[1]) * sy + new_cy / 2
+
+        # Group flips mirror the child about the group centre and reverse its rotation
+        group_cx = self.off[0] + self.ext[0] / 2
+        group_cy = self.off[1] + self.ext[1] / 2
+        if self.flip_h:
+            center_x = 2 * group_cx - center_x
+            flip_h = not flip_h
+            rot = -rot
+        if self.flip_v:
+            center_y = 2 * group_cy - center_y
+            flip_v = not flip_v
+            rot = -rot
+
+        # Group rotation turns the child centre about the group centre (clockwise, y down)
+        if self.rot:
+            theta = math.radians(self.rot / 60000)
+            dx, dy = center_x - group_cx, center_y - group_cy
+            center_x = group_cx + dx * math.cos(theta) - dy * math.sin(theta)
+            center_y = group_cy + dx * math.sin(theta) + dy * math.cos(theta)
+            rot += self.rot
+
+        return (
+            int(round(center_x - new_cx / 2)), int(round(center_y - new_cy / 2)),
+            int(round(new_cx)), int(round(new_cy)),
+            rot % FULL_CIRCLE, flip_h, flip_v,
+        )
+
+
+def _point(el, x_attr, y_attr, default=(0, 0)):
+    if el is None:
+        return default
+    return int(el.get(x_attr, 0)), int(el.get(y_attr, 0))
+
+
+def _member_xfrms(member):
+    if member.tag == MC + "AlternateContent":
+        xfrms = []
+        for branch in member:
+            for shape in branch:
+                xfrms.extend(_member_xfrms(shape))
+        return xfrms
+    for path in ("p:spPr/a:xfrm", "p:grpSpPr/a:xfrm", "p:xfrm"):
+        xfrm = member.find(path, NS)
+        if xfrm is not None:
+            return [xfrm]
+    return []
+
+
+def _transform_member(member, transform):
+    for xfrm in _member_xfrms(member):
+        off = xfrm.find("a:off", NS)
+        ext = xfrm.find("a:ext", NS)
+        if off is None or ext is None:
+            continue
+        x, y = _point(off, "x", "y")
+        cx, cy = _point(ext, "cx", "cy")
+        new_x, new_y, new_cx, new_cy, rot, flip_h, flip_v = transform.apply(
+            x, y, cx, cy,
+            rot=int(xfrm.get("rot", 0)),
+            flip_h=xfrm.get("flipH") in ("1", "true"),
+            flip_v=xfrm.get("flipV") in ("1", "true"),
+        )
+        # A kept (animated) group only moves its outer frame; chOff/chExt stay as they are
+        off.set("x", str(new_x))
+        off.set("y", str(new_y))
+        ext.set("cx", str(new_cx))
+        ext.set("cy", str(new_cy))
+        _set_optional(xfrm, "rot", str(rot) if rot else None)
+        _set_optional(xfrm, "flipH", "1" if flip_h else None)
+        _set_optional(xfrm, "flipV", "1" if flip_v else None)
+
+
+def _set_optional(el, name, value):
+    if value is None:
+        el.attrib.pop(name, None)
+    else:
+        el.set(name, value)
+
+
+# === ZIP HELPERS ===
+def _fresh_info(info):
+    new_info = zipfile.ZipInfo(info.filename, date_time=info.date_time)
+    new_info.external_attr = info.external_attr
+    new_info.compress_type = zipfile.ZIP_DEFLATED
+    return new_info
+
+
+def _copy_raw_member(zin, zout, info):
+    """
+    Copies a member's compressed bytes verbatim, so large media parts are not
+    inflated and deflated again. zipfile has no public API for this, so the
+    local header is rebuilt from the ZipInfo and the entry registered by hand.
+    """
+    zin.fp.seek(info.header_offset)
+    local_header = zin.fp.read(30)
+    name_len, extra_len = struct.unpack("<HH", local_header[26:30])
+    zin.fp.seek(info.header_offset + 30 + name_len + extra_len)
+    raw = zin.fp.read(info.compress_size)
+
+    new_info = copy.copy(info)
+    new_info.flag_bits &= ~0x08  # sizes and CRC go in the local header, no data descriptor
+    new_info.extra = b""
+    new_info.header_offset = zout.fp.tell()
+    zout.fp.write(new_info.FileHeader())
+    zout.fp.write(raw)
+    zout.filelist.append(new_info)
+    zout.NameToInfo[new_info.filename] = new_info
+    zout.start_dir = zout.fp.tell()
+    zout._didModify = True
+
+
+# === POWERPOINT COM ENGINE ===
+def _ungroup_with_com(input_path, output_path):
+    import pythoncom
+    import win32com.client
+
     pythoncom.CoInitialize()
     ppt = win32com.client.Dispatch("PowerPoint.Application")
 
@@ -1,24 +1,113 @@
 import re
-import pandas as pd
+import threading
+from collections import OrderedDict
 
-# Load the US to UK dictionary from CSV
-def load_us_to_uk_dict(csv_path="us_to_uk_dictionary.csv"):
-    df = pd.read_csv(csv_path)
-    dictionary = dict(zip(df["US"], df["UK"]))
-    return dictionary
+WORD_RE = re.compile(r"\w+")
+
+# Load the US to UK dictionary from CSV (compiled and cached by the dictionary service)
+def load_us_to_uk_dict(csv_path=None):
+    from spelling_dictionary import DICTIONARY_PATH, get_dictionary_service
+    return get_dictionary_service(csv_path or DICTIONARY_PATH).get_dictionary()
+
+class SpellingMatcher:
+    """
+    Tokenise-once matcher for a US -> UK dictionary. Each word of the text is
+    looked up in a hash table keyed by an entry's first word, so a scan costs
+    one pass over the text instead of one regex search per dictionary entry.
+    Multi-word entries are confirmed against the original span.
+    """
+
+    # Bump when the compiled attributes change, so pickled matchers are rebuilt
+    FORMAT_VERSION = 1
+
+    def __init__(self, dictionary):
+        self.dictionary = dictionary
+        self.order = {}
+        self.entries = {}  # first word -> [(word count, us, uk)], longest first
+        for position, (us, uk) in enumerate(dictionary.items()):
+            if not isinstance(us, str) or not WORD_RE.search(us):
+                continue
+            words = WORD_RE.findall(us.lower())
+            self.order[us] = position
+            self.entries.setdefault(words[0], []).append((len(words), us, uk))
+        for candidates in self.entries.values():
+            candidates.sort(key=lambda entry: -entry[0])
+
+    def find(self, text, overlapping=True):
+        """
+        Returns (start, end, us, uk) for each dictionary entry found in text.
+        With overlapping=False the longest entry wins at each position and
+        the scan resumes after it, which is what a replacement pass needs.
+        """
+        tokens = [(m.start(), m.end(), m.group().lower()) for m in WORD_RE.finditer(text)]
+        matches = []
+        i = 0
+        while i < len(tokens):
+            start, end, word = tokens[i]
+            step = 1
+            for count, us, uk in self.entries.get(word, ()):
+                if i + count > len(tokens):
+                    continue
+                span_end = tokens[i + count - 1][1]
+                if count > 1 and text[start:span_end].lower() != us.lower():
+                    continue
+                matches.append((start, span_end, us, uk))
+                if not overlapping:
+                    step = count
+                    break
+            i += step
+        return matches
+
+    def detect(self, text):
+        """Distinct US entries present in text, in dictionary order."""
+        found = {us for _, _, us, _ in self.find(text)}
+        return sorted(found, key=self.order.__getitem__)
+
+    def convert(self, text):
+        parts = []
+        last = 0
+        for start, end, _, uk in self.find(text, overlapping=False):
+            parts.append(text[last:start])
+            parts.append(str(uk))
+            last = end
+        parts.append(text[last:])
+        return "".join(parts)
+
+# Compiled matchers for caller-supplied dicts: id -> (dictionary, size, matcher), most recently used last.
+# Each entry holds its dict, so the id cannot be reused by another dict while it is cached.
+_matchers = OrderedDict()
+_matchers_lock = threading.Lock()
+MAX_MATCHERS = 8
+
+def get_matcher(dictionary):
+    """
+    Returns a compiled matcher for dictionary without rescanning it per call.
+    The dictionary service's own dict gets the service's prebuilt matcher;
+    other dicts are compiled once and rebuilt when their size changes, so
+    pass a new dict rather than editing one in place to change a value.
+    """
+    from spelling_dictionary import service_matcher
+    matcher = service_matcher(dictionary)
+    if matcher is not None:
+        return matcher
+    key = id(dictionary)
+    with _matchers_lock:
+        cached = _matchers.get(key)
+        if cached is not None and cached[0] is dictionary and cached[1] == len(dictionary):
+            _matchers.move_to_end(key)
+            return cached[2]
+    matcher = SpellingMatcher(dictionary)
+    with _matchers_lock:
+        _matchers[key] = (dictionary, len(dictionary), matcher)
+        _matchers.move_to_end(key)
+        while len(_matchers) > MAX_MATCHERS:
+            _matchers.popitem(last=False)
+    return matcher
 
 # Replace US words with UK equivalents
 def convert_us_to_uk(text, dictionary):
-    for us, uk in dictionary.items():
-        pattern = r'\b' + re.escape(us) + r'\b'
-        text = re.sub(pattern, uk, text, flags=re.IGNORECASE)
-    return text
+    return get_matcher(dictionary).convert(text)
 
 # Detect presence of US spellings in the text
 def detect_us_words(text, dictionary):
-    found = []
-    for us in dictionary.keys():
-        pattern = r'\b' + re.escape(us) + r'\b'
-        if re.search(pattern, text, flags=re.IGNORECASE):
-            found.append(us)
-    return found
+    return get_matcher(dictionary).detect(text)
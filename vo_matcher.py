@@ -0,0 +1,87 @@
+import math
+import numpy as np
+from metrics import count, measure
+
+STRONG_THRESHOLD = 0.75
+PARTIAL_THRESHOLD = 0.5
+ENCODE_BATCH_SIZE = 64
+
+
+# === SCORING ===
+def classify_match(point, best_match, best_score, best_idx):
+    """Same bands as compare_point_to_vo: returns (match, score, type, comment, idx)."""
+    if point.strip().lower() == best_match.strip().lower():
+        return best_match, 1.0, "Exact Copy", "Perfect match (copied)", best_idx
+    elif best_score >= STRONG_THRESHOLD:
+        return best_match, best_score, "Strong", "Chunked properly", best_idx
+    elif best_score >= PARTIAL_THRESHOLD:
+        return best_match, best_score, "Partial", "Partially matching", best_idx
+    else:
+        return best_match, best_score, "Missing", "No strong match", -1
+
+
+def encode_texts(model, texts, batch_size=ENCODE_BATCH_SIZE):
+    """
+    Encodes each distinct text once, in large batches, and returns a lookup
+    of text -> unit-length embedding so cosine similarity is a dot product.
+    """
+    unique_texts = list(dict.fromkeys(texts))
+    if not unique_texts:
+        return {}
+    embeddings = model.encode(
+        unique_texts,
+        batch_size=batch_size,
+        convert_to_numpy=True,
+        normalize_embeddings=True,
+        show_progress_bar=False,
+    )
+    return dict(zip(unique_texts, np.asarray(embeddings, dtype=np.float32)))
+
+
+def score_matrix(points, vo_lines, embeddings):
+    """points x vo_lines cosine similarity matrix in one matrix product."""
+    point_embs = np.stack([embeddings[p] for p in points])
+    vo_embs = np.stack([embeddings[v] for v in vo_lines])
+    return point_embs @ vo_embs.T
+
+
+def match_slide(points, vo_lines, scores, exclusive=True):
+    """
+    Picks the best VO line for each point in order. With exclusive=True a VO
+    line that was matched by an earlier point is masked out, exactly like the
+    used_vo_indices set in the per-point matcher.
+    """
+    if not points or not vo_lines:
+        return [("", 0.0, "Missing", "No VO content", -1) for _ in points]
+
+    used = np.zeros(len(vo_lines), dtype=bool)
+    results = []
+    for row, point in zip(scores, points):
+        masked = np.where(used, -1.0, row) if exclusive else row
+        best_idx = int(masked.argmax())
+        best_score = float(masked[best_idx])
+        result = classify_match(point, vo_lines[best_idx], best_score, best_idx)
+        if exclusive and result[4] >= 0:
+            used[result[4]] = True
+        results.append(result)
+    return results
+
+
+def match_deck(model, slides, exclusive=True, batch_size=ENCODE_BATCH_SIZE):
+    """
+    slides is a list of (points, vo_lines) pairs. Every point and VO line in the
+    deck is encoded in shared batches, then each slide is scored as a matrix.
+    Returns one list of match tuples per slide.
+    """
+    all_texts = [text for points, vo_lines in slides if vo_lines for text in (*points, *vo_lines)]
+    with measure("chunking.inference"):
+        embeddings = encode_texts(model, all_texts, batch_size=batch_size)
+    count("embedding_texts", len(embeddings))
+    count("embedding_batches", math.ceil(len(embeddings) / batch_size))
+
+    results = []
+    with measure("chunking.matching"):
+        for points, vo_lines in slides:
+            scores = score_matrix(points, vo_lines, embeddings) if points and vo_lines else None
+            results.append(match_slide(points, vo_lines, scores, exclusive))
+    return results
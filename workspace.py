@@ -0,0 +1,262 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from werkzeug.utils import secure_filename
+
+WORKSPACE_ROOT = os.environ.get("QC_WORKSPACE", "workspace")
+MAX_UPLOAD_BYTES = int(float(os.environ.get("QC_MAX_UPLOAD_MB", 200)) * 1024 * 1024)
+# Uploads are held in memory up to this size, then spill to a temp file
+SPOOL_MEMORY_BYTES = 8 * 1024 * 1024
+WORKSPACE_TTL_SECONDS = int(float(os.environ.get("QC_WORKSPACE_TTL_HOURS", 24)) * 3600)
+MAX_STORAGE_BYTES = int(float(os.environ.get("QC_MAX_STORAGE_GB", 10)) * 1024 ** 3)
+CLEAN_INTERVAL_SECONDS = 600
+COPY_CHUNK_BYTES = 1024 * 1024
+# A request in progress keeps a marker file in its workspace, touched every BUSY_REFRESH_SECONDS.
+# Markers live on disk so every server process's cleaner sees them; one left untouched for
+# BUSY_MARKER_TTL_SECONDS belongs to a process that died, and the workspace is fair game again.
+BUSY_MARKER = ".busy"
+BUSY_REFRESH_SECONDS = 60
+BUSY_MARKER_TTL_SECONDS = 5 * BUSY_REFRESH_SECONDS
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+# === CONTENT-ADDRESSED UPLOADS ===
+class BlobStore:
+    """
+    Uploaded decks stored once under their SHA-256, so the same deck uploaded
+    by several jobs (or re-uploaded for every revision round) is written once.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def path_for(self, digest, suffix=""):
+        return os.path.join(self.root, digest[:2], digest + suffix)
+
+    def put_stream(self, stream, suffix="", max_bytes=MAX_UPLOAD_BYTES):
+        """Streams an upload through a spooled temp file, hashing as it goes; returns the blob path."""
+        h = hashlib.sha256()
+        size = 0
+        with tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY_BYTES) as spool:
+            while True:
+                chunk = stream.read(COPY_CHUNK_BYTES)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(f"Upload exceeds {max_bytes / (1024 * 1024):g} MB")
+                h.update(chunk)
+                spool.write(chunk)
+
+            digest = h.hexdigest()
+            path = self.path_for(digest, suffix)
+            if os.path.exists(path):
+                os.utime(path)  # Counts as fresh for the cleaner
+                return path
+
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+            spool.seek(0)
+            with open(tmp_path, "wb") as f:
+                shutil.copyfileobj(spool, f, COPY_CHUNK_BYTES)
+            os.replace(tmp_path, path)
+        return path
+
+
+# === PER-JOB WORKSPACES ===
+class Workspace:
+    """A private directory per job, so concurrent jobs never share an upload or report path."""
+
+    def __init__(self, root, job_id, blobs):
+        self.job_id = job_id
+        self.dir = os.path.abspath(os.path.join(root, "jobs", job_id))
+        self.input_dir = os.path.join(self.dir, "input")
+        self.output_dir = os.path.join(self.dir, "output")
+        self.blobs = blobs
+        os.makedirs(self.input_dir, exist_ok=True)
+        os.makedirs(self.output_dir, exist_ok=True)
+
+    def add_upload(self, upload, max_bytes=MAX_UPLOAD_BYTES):
+        """Stores a werkzeug FileStorage and links it into the job under its (sanitised) name."""
+        filename = secure_filename(upload.filename) or "upload.pptx"
+        blob_path = self.blobs.put_stream(upload.stream, os.path.splitext(filename)[1].lower(), max_bytes)
+        path = os.path.join(self.input_dir, filename)
+        if os.path.exists(path):
+            path = os.path.join(self.input_dir, f"{uuid.uuid4().hex[:8]}_{filename}")
+        try:
+            os.link(blob_path, path)
+        except OSError:
+            shutil.copyfile(blob_path, path)
+        return path
+
+    def output_path(self, filename):
+        return os.path.join(self.output_dir, filename)
+
+    @property
+    def busy_marker(self):
+        return os.path.join(self.dir, BUSY_MARKER)
+
+    def remove(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+
+class WorkspaceManager:
+    def __init__(self, root=WORKSPACE_ROOT):
+        self.root = os.path.abspath(root)
+        self.blobs = BlobStore(os.path.join(self.root, "blobs"))
+        os.makedirs(os.path.join(self.root, "jobs"), exist_ok=True)
+        self._busy = {}  # job_id -> marker path, for the workspaces this process is using
+        self._busy_lock = threading.Lock()
+        self._refresher = None
+
+    def create(self, job_id=None):
+        return Workspace(self.root, job_id or uuid.uuid4().hex, self.blobs)
+
+    # === IN-FLIGHT MARKERS ===
+    def mark_busy(self, workspace):
+        """Protects a workspace from every process's cleaner until release()."""
+        with open(workspace.busy_marker, "a"):
+            pass
+        os.utime(workspace.busy_marker)
+        with self._busy_lock:
+            self._busy[workspace.job_id] = workspace.busy_marker
+            if self._refresher is None:
+                self._refresher = threading.Thread(target=self._refresh_markers, name="workspace-markers", daemon=True)
+                self._refresher.start()
+
+    def release(self, workspace):
+        with self._busy_lock:
+            self._busy.pop(workspace.job_id, None)
+        try:
+            os.remove(workspace.busy_marker)
+        except OSError:
+            pass
+
+    def is_busy(self, job_dir, now=None):
+        try:
+            mtime = os.stat(os.path.join(job_dir, BUSY_MARKER)).st_mtime
+        except OSError:
+            return False
+        return (now or time.time()) - mtime < BUSY_MARKER_TTL_SECONDS
+
+    def _refresh_markers(self):
+        while True:
+            time.sleep(BUSY_REFRESH_SECONDS)
+            with self._busy_lock:
+                markers = list(self._busy.values())
+            for marker in markers:
+                try:
+                    os.utime(marker)
+                except OSError:
+                    pass
+
+    def job_dirs(self):
+        jobs_root = os.path.join(self.root, "jobs")
+        return [os.path.join(jobs_root, name) for name in os.listdir(jobs_root)]
+
+
+# === CLEANER ===
+def _tree_entries(path, seen_inodes):
+    """(newest mtime, size of files not already counted) for a directory; hard links count once."""
+    newest = os.stat(path).st_mtime
+    size = 0
+    for dirpath, _, filenames in os.walk(path):
+        for name in filenames:
+            try:
+                stat = os.stat(os.path.join(dirpath, name))
+            except OSError:
+                continue
+            newest = max(newest, stat.st_mtime)
+            inode = (stat.st_dev, stat.st_ino)
+            if inode not in seen_inodes:
+                seen_inodes.add(inode)
+                size += stat.st_size
+    return newest, size
+
+
+class WorkspaceCleaner:
+    """
+    Deletes job workspaces and blobs older than ttl_seconds, then evicts the
+    oldest ones until everything fits in max_bytes. Workspaces with a fresh
+    in-flight marker (from any process) are skipped, and is_active(job_id)
+    protects jobs that are still queued or running.
+    """
+
+    def __init__(self, manager, ttl_seconds=WORKSPACE_TTL_SECONDS, max_bytes=MAX_STORAGE_BYTES,
+                 interval=CLEAN_INTERVAL_SECONDS, is_active=None):
+        self.manager = manager
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.interval = interval
+        self.is_active = is_active or (lambda job_id: False)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def sweep(self, now=None):
+        now = now or time.time()
+        seen_inodes = set()
+        entries = []  # (mtime, size, path)
+        active_bytes = 0
+        for job_dir in self.manager.job_dirs():
+            # Marker freshness is judged on the wall clock, whatever now the sweep is given
+            if self.manager.is_busy(job_dir) or self.is_active(os.path.basename(job_dir)):
+                # Counts towards the total but is never evicted
+                active_bytes += _tree_entries(job_dir, seen_inodes)[1]
+                continue
+            mtime, size = _tree_entries(job_dir, seen_inodes)
+            entries.append((mtime, size, job_dir))
+        for dirpath, _, filenames in os.walk(self.manager.blobs.root):
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                inode = (stat.st_dev, stat.st_ino)
+                size = 0 if inode in seen_inodes else stat.st_size
+                seen_inodes.add(inode)
+                entries.append((stat.st_mtime, size, path))
+
+        total = active_bytes + sum(size for _, size, _ in entries)
+        removed = freed = 0
+        for mtime, size, path in sorted(entries):
+            expired = now - mtime > self.ttl_seconds
+            if not expired and total <= self.max_bytes:
+                break
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+            total -= size
+            freed += size
+            removed += 1
+        return {"removed": removed, "freed_bytes": freed, "total_bytes": total}
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                stats = self.sweep()
+                if stats["removed"]:
+                    print(f"[Workspace] Removed {stats['removed']} item(s), freed {stats['freed_bytes']} bytes")
+            except Exception as e:
+                print(f"[Workspace] Cleanup failed: {e}")
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="workspace-cleaner", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()